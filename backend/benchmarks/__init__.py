@@ -0,0 +1,5 @@
+"""
+Benchmarks for the HealthHabit backend.
+
+Run from the backend directory, e.g. python -m benchmarks.bench_prompt_encoding
+"""
@@ -0,0 +1,234 @@
+"""
+Load test of every agent endpoint against the local LLM stand-in.
+
+Starts benchmarks.llm_stub and the API (src.api.main) as separate processes,
+with the API pointed at the stub, then drives each agent endpoint at each
+concurrency level. For every endpoint and level it reports p50/p95/p99
+latency, throughput, failed responses and the prompt and completion tokens
+the stub received. Stub behaviour is set with the --stub-* options, and
+already running servers can be used with --api-url and --stub-url.
+
+Usage:
+    python -m benchmarks.bench_agent_load [--concurrency 1,8] [--requests 20]
+        [--endpoints daily-motivation,celebration] [--mode direct]
+        [--stub-latency-ms 300 --stub-latency-dist lognormal --stub-tokens-per-second 80]
+        [--json results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+from benchmarks.data import make_daily_records
+from benchmarks.llm_stub import StubConfig, free_port
+
+WEEK = make_daily_records(7)
+MONTH = make_daily_records(30)
+TODAY = {"exercise": {"completed": True, "duration": 30}, "meditation": {"completed": False},
+         "water": {"completed": True, "liters": 2}, "sleep": {"completed": True, "hours": 7.5}}
+GOALS = {"exercise": "30 minutes daily", "sleep": "8 hours", "meditation": "10 minutes daily"}
+PREFERENCES = {"focus": "fitness", "days_available": 5, "experience": "beginner"}
+PERFORMANCE = {"exercise": {"completion_rate": 0.7}, "meditation": {"completion_rate": 0.4},
+               "nutrition": {"completion_rate": 0.8}, "sleep": {"completion_rate": 0.6}}
+
+# name -> (path, query params, JSON body); bodies follow the route signatures
+ENDPOINTS: Dict[str, Tuple[str, Optional[Dict[str, str]], Callable[[], Any]]] = {
+    "weekly-plan": ("/planner/weekly-plan", None, lambda: PREFERENCES),
+    "adjust-goals": ("/planner/adjust-goals", None,
+                     lambda: {"current_goals": GOALS, "performance_data": PERFORMANCE}),
+    "log-daily": ("/tracker/log-daily", None, lambda: TODAY),
+    "daily-report": ("/tracker/daily-report", {"date": "2024-01-07T00:00:00"}, lambda: TODAY),
+    "check-consistency": ("/tracker/check-consistency", None, lambda: WEEK),
+    "weekly-progress": ("/analyzer/weekly-progress", None, lambda: WEEK),
+    "behavior-patterns": ("/analyzer/behavior-patterns", None, lambda: MONTH),
+    "insights-report": ("/analyzer/insights-report", {"time_period": "month"},
+                        lambda: {"data": MONTH, "goals": GOALS}),
+    "daily-motivation": ("/motivator/daily-motivation", None,
+                         lambda: {"user_data": TODAY, "recent_achievements": ["Exercise: 5-day streak"]}),
+    "suggest-challenges": ("/motivator/suggest-challenges", None,
+                           lambda: {"user_preferences": PREFERENCES, "current_goals": GOALS}),
+    "celebration": ("/motivator/celebration", {"achievement": "Exercise: 7-day streak"}, lambda: TODAY),
+    "daily-digest": ("/workflows/daily-digest", None, lambda: {
+        "preferences": PREFERENCES, "daily_data": TODAY, "weekly_data": WEEK,
+        "achievements": ["Exercise: 5-day streak"], "goals": GOALS}),
+}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+def wait_until_up(url: str, process: Optional[subprocess.Popen] = None, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_servers(args, workdir: str) -> Tuple[str, str, List[subprocess.Popen]]:
+    """Start the stub and the API unless URLs of running ones were given."""
+    processes = []
+    stub_url = args.stub_url
+    if not stub_url:
+        port = free_port()
+        stub_args = [f"--{name.replace('_', '-')}={value}"
+                     for name, value in stub_settings(args).items() if value is not None]
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.llm_stub", f"--port={port}", *stub_args]))
+        stub_url = f"http://127.0.0.1:{port}"
+        wait_until_up(f"{stub_url}/config", processes[-1])
+
+    api_url = args.api_url
+    if not api_url:
+        port = free_port()
+        env = dict(os.environ)
+        env.update({
+            "LLM_BASE_URL": f"{stub_url}/v1",
+            "TOGETHER_API_KEY": env.get("TOGETHER_API_KEY") or "stub-key",
+            "AGENT_EXECUTION_MODE": args.mode,
+            # Measure the agents, not the provider rate limits or local answers
+            "LLM_REQUESTS_PER_MINUTE": env.get("LLM_REQUESTS_PER_MINUTE", "0"),
+            "LLM_TOKENS_PER_MINUTE": env.get("LLM_TOKENS_PER_MINUTE", "0"),
+            "AGENT_FALLBACKS": env.get("AGENT_FALLBACKS", "false"),
+            "JOBS_DB_PATH": os.path.join(workdir, "jobs.db"),
+            "PRECOMPUTE_DB_PATH": os.path.join(workdir, "artifacts.db"),
+        })
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.api.main:app", "--host", "127.0.0.1",
+             "--port", str(port), "--log-level", "warning"], env=env))
+        api_url = f"http://127.0.0.1:{port}"
+        wait_until_up(f"{api_url}/", processes[-1])
+    return api_url, stub_url, processes
+
+
+def stub_settings(args) -> Dict[str, Any]:
+    return {name: getattr(args, f"stub_{name}") for name in StubConfig().as_dict()}
+
+
+async def drive(client: httpx.AsyncClient, api_url: str, name: str, concurrency: int,
+                requests: int) -> Dict[str, Any]:
+    """Send requests to one endpoint from concurrency workers."""
+    path, params, body = ENDPOINTS[name]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = requests
+
+    async def worker(index: int):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{api_url}/api/agents{path}", params=params, json=body(),
+                                             headers={"X-User-ID": f"load-user-{index}"})
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "endpoint": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_rps": len(latencies) / elapsed,
+        "failed": sum(count for status, count in statuses.items() if status != "200"),
+        "statuses": statuses,
+    }
+
+
+async def run_all(api_url: str, stub_url: str, endpoints: List[str], levels: List[int],
+                  requests: int, timeout: float) -> List[Dict[str, Any]]:
+    results = []
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        for name in endpoints:
+            # One request first so agent construction is not measured
+            await drive(client, api_url, name, 1, 1)
+            for level in levels:
+                await client.delete(f"{stub_url}/stats")
+                result = await drive(client, api_url, name, level, max(requests, level))
+                totals = (await client.get(f"{stub_url}/stats")).json()["totals"]
+                result.update({
+                    "llm_requests": totals["requests"],
+                    "prompt_tokens": totals["prompt_tokens"],
+                    "completion_tokens": totals["completion_tokens"],
+                })
+                results.append(result)
+                print_row(result)
+    return results
+
+
+def print_header():
+    print(f"{'endpoint':>19} {'conc':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>7} "
+          f"{'failed':>6} {'llm calls':>9} {'prompt tok':>10} {'compl tok':>9}")
+
+
+def print_row(r: Dict[str, Any]):
+    print(f"{r['endpoint']:>19} {r['concurrency']:>5} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+          f"{r['p99_ms']:>8.1f} {r['throughput_rps']:>7.1f} {r['failed']:>6} {r['llm_requests']:>9} "
+          f"{r['prompt_tokens']:>10} {r['completion_tokens']:>9}", flush=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,8", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint and level")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated names")
+    parser.add_argument("--mode", choices=("crew", "direct"), default="direct",
+                        help="AGENT_EXECUTION_MODE of a started API")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--api-url", help="use a running API instead of starting one")
+    parser.add_argument("--stub-url", help="use a running stub instead of starting one")
+    parser.add_argument("--json", help="also write the results to this file")
+    defaults = StubConfig(latency_ms=300, latency_dist="lognormal", tokens_per_second=80,
+                          completion_tokens=150, seed=0)
+    for name, value in defaults.as_dict().items():
+        parser.add_argument(f"--stub-{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoints.split(",")
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        api_url, stub_url, processes = start_servers(args, workdir)
+        try:
+            print(f"stub: {json.dumps(httpx.get(f'{stub_url}/config').json())}")
+            print_header()
+            results = asyncio.run(run_all(api_url, stub_url, endpoints, levels,
+                                          args.requests, args.timeout))
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait(timeout=10)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-call overhead of the CrewAI task loop versus direct chat completions.
+
+Starts benchmarks.llm_stub on a local port, points the agents at it and runs
+the same tracker prompt through BaseAgent in "crew" and "direct" mode. The
+stub answers instantly, so the difference in wall time is the client-side
+overhead, and the prompt tokens it records are the framework scaffolding.
+
+Usage:
+    python -m benchmarks.bench_direct_completion [--calls 20] [--port 8100]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import time
+
+
+def free_port() -> int:
+    # Not taken from benchmarks.llm_stub: importing it loads src before the
+    # stub URL is configured
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run(calls: int, port: int):
+    # Configuration is read at import time, so point it at the stub first
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ.setdefault("TOGETHER_API_KEY", "stub-key")
+    import httpx
+    from benchmarks.llm_stub import serve_in_thread
+    from benchmarks.data import make_daily_records
+    from src.agents.prompt_encoding import encode_records
+    from src.agents.tracker_agent import TrackerAgent
+
+    server = serve_in_thread(port)
+    agent = TrackerAgent()
+    task = f"Summarize this week's habit log:\n{encode_records(make_daily_records(7))}"
+    stats_url = f"http://127.0.0.1:{port}/stats"
+
+    results = {}
+    for mode in ("crew", "direct"):
+        agent.mode = mode
+        agent.execute(task, method="benchmark")  # warm up imports and connections
+        httpx.delete(stats_url)
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            agent.execute(task, method="benchmark")
+            latencies.append((time.perf_counter() - start) * 1000)
+        sent = httpx.get(stats_url).json()["requests"]
+        results[mode] = {
+            "median_ms": statistics.median(latencies),
+            "p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))],
+            "requests_per_call": len(sent) / calls,
+            "prompt_tokens_per_call": sum(r["prompt_tokens"] for r in sent) / calls,
+        }
+    server.should_exit = True
+
+    print(f"{'mode':>7} {'median ms':>10} {'p95 ms':>8} {'requests':>9} {'prompt tokens':>14}")
+    for mode, r in results.items():
+        print(f"{mode:>7} {r['median_ms']:>10.2f} {r['p95_ms']:>8.2f} "
+              f"{r['requests_per_call']:>9.1f} {r['prompt_tokens_per_call']:>14.0f}")
+    crew, direct = results["crew"], results["direct"]
+    print(f"\ndirect saves {crew['median_ms'] - direct['median_ms']:.2f} ms and "
+          f"{crew['prompt_tokens_per_call'] - direct['prompt_tokens_per_call']:.0f} prompt tokens per call")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--port", type=int, default=None, help="stub port (default: a free one)")
+    args = parser.parse_args()
+    run(args.calls, args.port or free_port())
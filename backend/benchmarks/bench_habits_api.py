@@ -0,0 +1,353 @@
+"""
+Load test of the habits API at different store sizes.
+
+Seeds a synthetic habit store of each size, then runs a mixed read/write
+workload against the habits routes, either in-process through the ASGI app
+(--transport asgi) or over HTTP against uvicorn in a separate process
+(--transport uvicorn). For every size and concurrency level it reports
+latency percentiles per operation, throughput, bytes written per write
+operation and the server's resident memory, and writes everything to a JSON
+file together with the commit it was run on, so runs can be compared.
+
+Bytes written are the server process's write() volume from /proc (wchar),
+so this benchmark needs Linux.
+
+Usage:
+    python -m benchmarks.bench_habits_api [--sizes 10000,100000] [--concurrency 1,8]
+        [--ops 200] [--mix get=60,list=2,create=10,update=12,complete=12,delete=4]
+        [--transport asgi,uvicorn] [--output habits_bench.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+
+DEFAULT_MIX = "get=60,list=2,create=10,update=12,complete=12,delete=4"
+WRITES = ("create", "update", "complete", "delete")
+NAMES = ["Exercise", "Meditation", "Reading", "Water", "Sleep", "Journaling", "Stretching", "Walk"]
+
+
+# Helpers are not taken from the other benchmarks: importing them loads src
+# before the environment below is set
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def seed_store(path: str, size: int, seed: int = 0) -> List[str]:
+    """
+    Write a habit store of the given size in the service's file format.
+
+    Args:
+        path (str): JSON file to write
+        size (int): Number of habits
+        seed (int): Random seed so runs are comparable
+
+    Returns:
+        List[str]: Ids of the seeded habits
+    """
+    rng = random.Random(seed)
+    users = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(max(1, size // 5))]
+    start = datetime(2024, 1, 1)
+    habits = {}
+    for i in range(size):
+        habit_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        created = start + timedelta(minutes=i)
+        streak = rng.randint(0, 60)
+        habits[habit_id] = {
+            "name": f"{rng.choice(NAMES)} {i}",
+            "description": "Synthetic habit for load testing",
+            "frequency": rng.choice(["daily", "daily", "weekly", "monthly"]),
+            "target_value": rng.choice([None, 10.0, 30.0]),
+            "unit": rng.choice([None, "minutes", "pages"]),
+            "reminder_time": rng.choice([None, "07:30", "21:00"]),
+            "id": habit_id,
+            "user_id": rng.choice(users),
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+            "is_active": rng.random() < 0.9,
+            "streak": streak,
+            "last_completed": (created + timedelta(days=streak)).isoformat() if streak else None,
+        }
+    with open(path, "w") as f:
+        json.dump(habits, f)
+    return list(habits)
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        op, _, weight = part.partition("=")
+        if op not in ("get", "list") + WRITES:
+            raise ValueError(f"unknown operation: {op}")
+        weights[op] = int(weight)
+    return weights
+
+
+def proc_stats(pid: int) -> Dict[str, int]:
+    """Resident memory and write() volume of a process, from /proc."""
+    stats = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                stats["rss_bytes"] = int(line.split()[1]) * 1024
+    with open(f"/proc/{pid}/io") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key == "wchar":
+                stats["wchar"] = int(value)
+    return stats
+
+
+class Workload:
+    def __init__(self, ids: List[str], mix: Dict[str, int], seed: int = 0):
+        """
+        Initialize a mixed workload over a seeded store.
+
+        Args:
+            ids (List[str]): Ids of existing habits
+            mix (Dict[str, int]): Relative weight of each operation
+            seed (int): Random seed so runs are comparable
+        """
+        self.ids = list(ids)
+        self.in_flight: Dict[str, int] = {}
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.rng = random.Random(seed)
+
+    def next(self) -> Tuple[str, str, str, Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Pick an operation; returns (op, method, path, body, habit_id).
+
+        A returned habit_id is in flight until passed to done().
+        """
+        op = self.rng.choices(self.ops, self.weights)[0]
+        if op == "list":
+            return op, "GET", "/api/habits/", None, None
+        if op == "create":
+            return op, "POST", "/api/habits/", {"name": "Load test habit", "frequency": "daily"}, None
+        if op == "delete":
+            # Deleted ids are not picked again, and habits other requests
+            # are using are not deleted, so no operation times a 404
+            idle = [habit_id for habit_id in self.ids if habit_id not in self.in_flight]
+            habit_id = self.rng.choice(idle)
+            self.ids.remove(habit_id)
+        else:
+            habit_id = self.rng.choice(self.ids)
+        self.in_flight[habit_id] = self.in_flight.get(habit_id, 0) + 1
+        if op == "get":
+            return op, "GET", f"/api/habits/{habit_id}", None, habit_id
+        if op == "update":
+            body = {"description": f"updated {time.time_ns()}"}
+            return op, "PUT", f"/api/habits/{habit_id}", body, habit_id
+        if op == "complete":
+            return op, "POST", f"/api/habits/{habit_id}/complete", None, habit_id
+        return op, "DELETE", f"/api/habits/{habit_id}", None, habit_id
+
+    def done(self, habit_id: Optional[str]):
+        """Mark a request on habit_id as finished."""
+        if habit_id is None:
+            return
+        self.in_flight[habit_id] -= 1
+        if not self.in_flight[habit_id]:
+            del self.in_flight[habit_id]
+
+
+async def drive(client: httpx.AsyncClient, workload: Workload, concurrency: int,
+                ops: int) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+    remaining = ops
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            op, method, path, body, habit_id = workload.next()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+            finally:
+                workload.done(habit_id)
+            latencies.setdefault(op, []).append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if op == "create" and response.status_code == 200:
+                workload.ids.append(response.json()["id"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def summarize(latencies: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    everything = [sample for samples in latencies.values() for sample in samples]
+    for op, samples in sorted(latencies.items()) + [("all", everything)]:
+        summary[op] = {
+            "count": len(samples),
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+        }
+    return summary
+
+
+async def run_level(base_url: str, transport, pid: int, ids: List[str], mix: Dict[str, int],
+                    concurrency: int, ops: int, timeout: float) -> Tuple[Dict[str, Any], List[str]]:
+    """Drive one concurrency level; returns its results and the ids that still exist."""
+    workload = Workload(ids, mix, seed=concurrency)
+    before = proc_stats(pid)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, timeout=timeout) as client:
+        latencies, statuses, elapsed = await drive(client, workload, concurrency, ops)
+    after = proc_stats(pid)
+    writes = sum(len(latencies.get(op, [])) for op in WRITES)
+    return {
+        "concurrency": concurrency,
+        "ops": ops,
+        "elapsed_s": elapsed,
+        "throughput_ops": ops / elapsed,
+        "statuses": statuses,
+        "latency": summarize(latencies),
+        "bytes_written_per_write_op": (after["wchar"] - before["wchar"]) / writes if writes else 0,
+        "rss_bytes": after["rss_bytes"],
+    }, workload.ids
+
+
+def run_levels(base_url: str, transport, pid: int, ids: List[str], args) -> List[Dict[str, Any]]:
+    """Run every concurrency level against one store, in order."""
+    results = []
+    for level in args.concurrency:
+        # Later levels see the habits earlier ones created and not the
+        # ones they deleted, so gets, updates and deletes never hit a 404
+        result, ids = asyncio.run(run_level(base_url, transport, pid, ids, args.mix,
+                                            level, args.ops, args.timeout))
+        results.append(result)
+    return results
+
+
+def run_asgi(path: str, ids: List[str], args) -> Tuple[List[Dict[str, Any]], float]:
+    from src.api.main import app
+    from src.routes.habits import habit_controller
+    from src.services.habit_service import HabitService
+
+    start = time.perf_counter()
+    habit_controller.habit_service = HabitService(path)
+    load_s = time.perf_counter() - start
+    transport = httpx.ASGITransport(app=app)
+    results = run_levels("http://bench", transport, os.getpid(), ids, args)
+    return results, load_s
+
+
+def run_uvicorn(path: str, ids: List[str], args) -> Tuple[List[Dict[str, Any]], float]:
+    port = free_port()
+    env = dict(os.environ, HABITS_DATA_FILE=path, JOBS_DB_PATH=f"{path}.jobs.db",
+               PRECOMPUTE_DB_PATH=f"{path}.artifacts.db")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"], env=env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        wait_until_up(f"{base_url}/", process, timeout=600)
+        load_s = time.perf_counter() - start
+        results = run_levels(base_url, None, process.pid, ids, args)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results, load_s
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated store sizes")
+    parser.add_argument("--concurrency", default="1,8", help="comma-separated levels")
+    parser.add_argument("--ops", type=int, default=200, help="operations per size and level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="relative weight per operation")
+    parser.add_argument("--transport", default="asgi,uvicorn", help="asgi, uvicorn or both")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout in seconds")
+    parser.add_argument("--output", default="habits_bench.json", help="JSON results file")
+    args = parser.parse_args(argv)
+    # Completions must not trigger LLM calls; set before src is imported
+    os.environ.setdefault("CELEBRATION_PREFETCH", "false")
+    args.mix = parse_mix(args.mix)
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    transports = args.transport.split(",")
+
+    report = {
+        "benchmark": "habits_api",
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "settings": {"mix": args.mix, "ops": args.ops, "concurrency": args.concurrency},
+        "results": [],
+    }
+    print(f"{'transport':>9} {'habits':>8} {'conc':>5} {'load s':>7} {'ops/s':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'KB/write':>9} {'RSS MB':>7}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(size) for size in args.sizes.split(",")):
+            for transport in transports:
+                path = os.path.join(workdir, f"habits-{size}-{transport}.json")
+                ids = seed_store(path, size)
+                run = run_asgi if transport == "asgi" else run_uvicorn
+                results, load_s = run(path, ids, args)
+                for result in results:
+                    result.update({"transport": transport, "habits": size, "load_s": load_s,
+                                   "file_bytes": os.path.getsize(path)})
+                    report["results"].append(result)
+                    overall = result["latency"]["all"]
+                    print(f"{transport:>9} {size:>8} {result['concurrency']:>5} {load_s:>7.2f} "
+                          f"{result['throughput_ops']:>8.1f} {overall['p50_ms']:>8.2f} "
+                          f"{overall['p95_ms']:>8.2f} {overall['p99_ms']:>8.2f} "
+                          f"{result['bytes_written_per_write_op'] / 1024:>9.0f} "
+                          f"{result['rss_bytes'] / 2 ** 20:>7.0f}", flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
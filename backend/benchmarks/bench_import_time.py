@@ -0,0 +1,104 @@
+"""
+Import-time benchmark for the application entry points.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the cumulative import time of each entry point, the slowest
+imports underneath it, and whether any module that must stay lazy
+(crewai, litellm, numpy, httpx) was loaded.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5] [--max-ms 1500] [--json out.json]
+
+Exits with status 1 when an entry point exceeds --max-ms or imports a lazy
+module eagerly, so it can guard startup time in CI.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ENTRY_POINTS = ["src.app", "src.api.main"]
+LAZY_MODULES = ["crewai", "litellm", "numpy", "httpx"]
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse -X importtime output into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.split(":", 1)[1]
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str) -> Dict[str, object]:
+    """Import a module in a fresh interpreter and collect its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    rows = parse_importtime(result.stderr)
+    total_us = next(cumulative for name, _, cumulative in rows if name == module)
+    loaded = {name for name, _, _ in rows}
+    return {
+        "total_ms": total_us / 1000,
+        "slowest": sorted(rows, key=lambda row: row[1], reverse=True)[:10],
+        "lazy_violations": [m for m in LAZY_MODULES if m in loaded],
+    }
+
+
+def run(runs: int) -> Dict[str, Dict[str, object]]:
+    report = {}
+    for module in ENTRY_POINTS:
+        samples = [measure(module) for _ in range(runs)]
+        totals = [sample["total_ms"] for sample in samples]
+        report[module] = {
+            "median_ms": statistics.median(totals),
+            "min_ms": min(totals),
+            "max_ms": max(totals),
+            "lazy_violations": samples[-1]["lazy_violations"],
+            "slowest_self_ms": [(name, self_us / 1000) for name, self_us, _ in samples[-1]["slowest"]],
+        }
+
+    for module, stats in report.items():
+        print(f"\n{module}: median {stats['median_ms']:.1f} ms "
+              f"(min {stats['min_ms']:.1f}, max {stats['max_ms']:.1f}, {runs} runs)")
+        for name, self_ms in stats["slowest_self_ms"]:
+            print(f"    {self_ms:8.2f} ms  {name}")
+        if stats["lazy_violations"]:
+            print(f"    eagerly imported: {', '.join(stats['lazy_violations'])}")
+    return report
+
+
+def check(report: Dict[str, Dict[str, object]], max_ms: float = None) -> List[str]:
+    """Return the regressions found in a report."""
+    failures = []
+    for module, stats in report.items():
+        if stats["lazy_violations"]:
+            failures.append(f"{module} eagerly imports {', '.join(stats['lazy_violations'])}")
+        if max_ms is not None and stats["median_ms"] > max_ms:
+            failures.append(f"{module} takes {stats['median_ms']:.1f} ms to import (budget {max_ms} ms)")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail when an entry point's median import time exceeds this")
+    parser.add_argument("--json", type=Path, default=None, help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.runs)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    failures = check(report, args.max_ms)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,74 @@
+"""
+Steady-state latency of pooled versus per-request LLM connections.
+
+Sends the same chat completion repeatedly, once opening a new connection for
+every request (what happens without a shared client) and once through the
+pooled LLMClient. Against the local stub this isolates TCP setup; pointed at
+a real HTTPS endpoint with --base-url, the gap also includes the TLS handshake.
+
+Usage:
+    python -m benchmarks.bench_llm_client [--requests 50] [--base-url https://api.together.xyz/v1]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from benchmarks.llm_stub import free_port, serve_in_thread
+
+MESSAGES = [{"role": "user", "content": "Say hello in five words."}]
+
+
+def timed(send, requests: int):
+    send()  # warm up; the pooled client opens its connection here
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        send()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(latencies),
+            "p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))]}
+
+
+def run(requests: int, base_url: str = None):
+    server = None
+    if base_url is None:
+        server = serve_in_thread(free_port())
+        base_url = f"http://127.0.0.1:{server.config.port}/v1"
+    api_key = os.getenv("TOGETHER_API_KEY")
+    params = {"model": os.getenv("MODEL_NAME", "stub"), "max_tokens": 16}
+
+    import httpx
+    from src.llm import LLMClient
+
+    def fresh():
+        # A new client per request: new TCP connection and TLS handshake each time
+        client = LLMClient(base_url, api_key)
+        try:
+            client.chat_completion(MESSAGES, **params)
+        finally:
+            client.close()
+
+    pooled_client = LLMClient(base_url, api_key)
+    results = {
+        "fresh": timed(fresh, requests),
+        "pooled": timed(lambda: pooled_client.chat_completion(MESSAGES, **params), requests),
+    }
+    pooled_client.close()
+    if server:
+        server.should_exit = True
+
+    print(f"target {base_url} (http2: {pooled_client.http2}, httpx {httpx.__version__})")
+    print(f"{'mode':>7} {'median ms':>10} {'p95 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:>7} {r['median_ms']:>10.2f} {r['p95_ms']:>8.2f}")
+    print(f"\nconnection reuse saves {results['fresh']['median_ms'] - results['pooled']['median_ms']:.2f} ms per request")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--base-url", default=None, help="endpoint to test instead of the local stub")
+    args = parser.parse_args()
+    run(args.requests, args.base_url)
@@ -0,0 +1,297 @@
+"""
+Microbenchmarks of the service, model and serialization hot paths.
+
+Each case is timed in-process: calibrated so one round takes at least
+--min-round-ms, warmed up, then repeated, with the garbage collector off
+while timing like timeit. Reported per call are the median, mean, standard
+deviation, minimum and p95 over the rounds, and from one extra round under
+tracemalloc the memory allocated at peak and the blocks still allocated
+afterwards.
+
+Cases:
+- habit.validate / habit.dump: Habit(**v) from the stored form and
+  model_dump + UUIDEncoder of one habit
+- store.load.<n> / store.save.<n>: HabitService._load_data and _save_data
+  for a store of n habits
+- service.update_habit: applying a HabitUpdate, without the save and the
+  worker thread writes run in
+- prompt.<agent>.<method>: building the task text of every agent method,
+  with the LLM call replaced by returning the task
+- asgi.bare / asgi.metrics: a minimal ASGI request without and with
+  RequestMetricsMiddleware; the difference is the middleware's overhead
+
+Usage:
+    python -m benchmarks.bench_micro [--filter store.] [--sizes 100,1000,10000]
+        [--rounds 15] [--warmup 3] [--json micro.json]
+
+The same cases run under pytest with `pytest -m benchmark`; the regular
+test run deselects them.
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from benchmarks.data import make_daily_records
+
+DEFAULT_SIZES = (100, 1000, 10000)
+TODAY = {"exercise": {"completed": True, "duration": 30}, "meditation": {"completed": False},
+         "water": {"completed": True, "liters": 2}, "sleep": {"completed": True, "hours": 7.5}}
+GOALS = {"exercise": "30 minutes daily", "sleep": "8 hours", "meditation": "10 minutes daily"}
+PREFERENCES = {"focus": "fitness", "days_available": 5, "experience": "beginner"}
+HEADERS = [(b"host", b"localhost"), (b"user-agent", b"bench"), (b"accept", b"*/*"),
+           (b"x-user-id", b"bench-user")]
+PERFORMANCE = {"exercise": 0.8, "meditation": 0.5, "nutrition": 0.7, "sleep": 0.9}
+
+
+def run_sync(coro):
+    """Run a coroutine that never suspends, without an event loop."""
+    # The service coroutines do no I/O of their own, so driving them by hand
+    # keeps event loop overhead out of the numbers
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def measure(fn: Callable[[], Any], rounds: int = 15, warmup: int = 3,
+            min_round_ms: float = 20.0, number: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Time a callable and count what it allocates.
+
+    Args:
+        fn (Callable): Operation to measure, called without arguments
+        rounds (int): Timed rounds the statistics are taken over
+        warmup (int): Untimed rounds run first
+        min_round_ms (float): Calls per round are doubled until a round takes
+            at least this long
+        number (int, optional): Fixed calls per round instead of calibrating
+
+    Returns:
+        Dict[str, Any]: Per-call times in microseconds, calls per round,
+        and peak allocated bytes and retained blocks per call
+    """
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            if (time.perf_counter() - start) * 1000 >= min_round_ms or number >= 1 << 20:
+                break
+            number *= 2
+
+    for _ in range(warmup * number):
+        fn()
+
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            times.append((time.perf_counter() - start) / number * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # Allocations are measured separately, tracemalloc slows every allocation
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(number):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    ordered = sorted(times)
+    return {
+        "number": number,
+        "rounds": rounds,
+        "median_us": statistics.median(times),
+        "mean_us": statistics.fmean(times),
+        "stdev_us": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "min_us": ordered[0],
+        "p95_us": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "peak_bytes": max(0, peak - base),
+        "retained_blocks": retained / number,
+    }
+
+
+# Case factories take the work directory and return the operation to time
+
+
+def habit_validate(workdir: str) -> Callable[[], Any]:
+    from src.models.habit import Habit
+    from src.services.habit_service import UUIDEncoder
+    stored = json.loads(json.dumps(Habit(name="Exercise", frequency="daily",
+                                         description="30 minutes", target_value=30,
+                                         unit="minutes", reminder_time="07:00").model_dump(),
+                                   cls=UUIDEncoder))
+    return lambda: Habit(**stored)
+
+
+def habit_dump(workdir: str) -> Callable[[], Any]:
+    from src.models.habit import Habit
+    from src.services.habit_service import UUIDEncoder
+    habit = Habit(name="Exercise", frequency="daily", description="30 minutes", target_value=30,
+                  unit="minutes", reminder_time="07:00", streak=12)
+    return lambda: json.dumps(habit.model_dump(), cls=UUIDEncoder)
+
+
+def _service(workdir: str, size: int):
+    from benchmarks.bench_habits_api import seed_store
+    from src.services.habit_service import HabitService
+    path = os.path.join(workdir, f"habits-{size}.json")
+    if not os.path.exists(path):
+        seed_store(path, size)
+    return HabitService(path)
+
+
+def store_load(size: int) -> Callable[[str], Callable[[], Any]]:
+    return lambda workdir: _service(workdir, size)._load_data
+
+
+def store_save(size: int) -> Callable[[str], Callable[[], Any]]:
+    def factory(workdir: str):
+        # Saved to a copy so the seeded store of the load case stays as is
+        service = _service(workdir, size)
+        service.data_file = service.data_file.with_suffix(".save.json")
+        return service._save_data
+    return factory
+
+
+def service_update(workdir: str) -> Callable[[], Any]:
+    from src.models.habit import HabitUpdate
+    service = _service(workdir, 100)
+    service._save_data = lambda: None
+
+    async def write_inline(change):
+        # Skips the worker thread writes run in; only the update is timed
+        return change()
+    service._write = write_inline
+    habit_id = next(iter(service.habits))
+    update = HabitUpdate(name="Evening walk", target_value=45, reminder_time="19:30")
+    return lambda: run_sync(service.update_habit(habit_id, update))
+
+
+def _asgi(with_metrics: bool) -> Callable[[str], Callable[[], Any]]:
+    def factory(workdir: str):
+        from src.observability import MetricsRegistry, RequestMetricsMiddleware
+
+        class Route:
+            path = "/api/habits/{habit_id}"
+
+        async def app(scope, receive, send):
+            await receive()
+            scope["route"] = Route
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b'{"ok": true}'})
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        handler = RequestMetricsMiddleware(app, MetricsRegistry()) if with_metrics else app
+        return lambda: run_sync(handler({"type": "http", "method": "GET", "path": "/api/habits/1",
+                                                 "headers": HEADERS},
+                                        receive, send))
+    return factory
+
+
+def _prompt(agent_class: str, method: str, *args, **kwargs) -> Callable[[str], Callable[[], Any]]:
+    def factory(workdir: str):
+        import src.agents
+        agent = getattr(src.agents, agent_class)()
+        # The task text is returned instead of being sent
+        agent.execute = lambda task, **_: task
+        bound = getattr(agent, method)
+        return lambda: bound(*args, **kwargs)
+    return factory
+
+
+def build_cases(sizes=DEFAULT_SIZES) -> Dict[str, Callable[[str], Callable[[], Any]]]:
+    week, month = make_daily_records(7), make_daily_records(30)
+    cases = {"habit.validate": habit_validate, "habit.dump": habit_dump}
+    for size in sizes:
+        cases[f"store.load.{size}"] = store_load(size)
+        cases[f"store.save.{size}"] = store_save(size)
+    cases["service.update_habit"] = service_update
+    cases["asgi.bare"] = _asgi(False)
+    cases["asgi.metrics"] = _asgi(True)
+    cases.update({
+        "prompt.planner.create_daily_plan": _prompt("PlannerAgent", "create_daily_plan", PREFERENCES),
+        "prompt.planner.adjust_plan": _prompt("PlannerAgent", "adjust_plan", PERFORMANCE),
+        "prompt.tracker.log_daily_data": _prompt("TrackerAgent", "log_daily_data", TODAY),
+        "prompt.tracker.generate_daily_report": _prompt("TrackerAgent", "generate_daily_report", TODAY),
+        "prompt.tracker.check_consistency": _prompt("TrackerAgent", "check_consistency", week),
+        "prompt.analyzer.analyze_weekly_progress": _prompt(
+            "AnalyzerAgent", "analyze_weekly_progress", week),
+        "prompt.analyzer.identify_behavior_patterns": _prompt(
+            "AnalyzerAgent", "identify_behavior_patterns", month),
+        "prompt.analyzer.generate_insights_report": _prompt(
+            "AnalyzerAgent", "generate_insights_report", month, GOALS),
+        "prompt.motivator.provide_daily_motivation": _prompt(
+            "MotivatorAgent", "provide_daily_motivation", TODAY, ["Exercise: 5-day streak"]),
+        "prompt.motivator.suggest_challenges": _prompt("MotivatorAgent", "suggest_challenges", week, GOALS),
+        "prompt.motivator.generate_celebration_message": _prompt(
+            "MotivatorAgent", "generate_celebration_message", "Exercise: 7-day streak", week),
+    })
+    return cases
+
+
+def print_header():
+    print(f"{'case':>45} {'calls':>7} {'median us':>10} {'mean us':>10} {'stdev':>8} "
+          f"{'min us':>10} {'p95 us':>10} {'peak KB':>8} {'blocks':>7}")
+
+
+def print_row(name: str, r: Dict[str, Any]):
+    print(f"{name:>45} {r['number']:>7} {r['median_us']:>10.2f} {r['mean_us']:>10.2f} "
+          f"{r['stdev_us']:>8.2f} {r['min_us']:>10.2f} {r['p95_us']:>10.2f} "
+          f"{r['peak_bytes'] / 1024:>8.1f} {r['retained_blocks']:>7.1f}", flush=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated store sizes")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--min-round-ms", type=float, default=20.0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    cases = build_cases([int(size) for size in args.sizes.split(",")])
+    results = {}
+    print_header()
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, factory in cases.items():
+            if args.filter not in name:
+                continue
+            results[name] = measure(factory(workdir), args.rounds, args.warmup, args.min_round_ms)
+            print_row(name, results[name])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Token-count benchmark of record encodings used in agent prompts.
+
+Compares the Python repr previously embedded in prompts with the tabular
+encoding from src.agents.prompt_encoding at 7, 30 and 90 days.
+
+Usage:
+    python -m benchmarks.bench_prompt_encoding [--days 7 30 90]
+"""
+
+import argparse
+import timeit
+from src.agents.prompt_encoding import encode_records
+from src.agents.token_budget import estimate_tokens
+from benchmarks.data import make_daily_records
+
+
+def run(days_list):
+    print(f"{'days':>5} {'repr tokens':>12} {'table tokens':>13} {'saved':>7} "
+          f"{'repr chars':>11} {'table chars':>12} {'encode us':>10}")
+    results = []
+    for days in days_list:
+        records = make_daily_records(days)
+        legacy = str(records)
+        table = encode_records(records)
+        legacy_tokens = estimate_tokens(legacy)
+        table_tokens = estimate_tokens(table)
+        encode_us = min(timeit.repeat(lambda: encode_records(records), number=20, repeat=5)) / 20 * 1e6
+        saved = 1 - table_tokens / legacy_tokens
+        print(f"{days:>5} {legacy_tokens:>12} {table_tokens:>13} {saved:>6.0%} "
+              f"{len(legacy):>11} {len(table):>12} {encode_us:>10.1f}")
+        results.append({"days": days, "repr_tokens": legacy_tokens,
+                        "table_tokens": table_tokens, "encode_us": encode_us})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90])
+    run(parser.parse_args().days)
@@ -0,0 +1,121 @@
+"""
+Interactive latency under batch overload, with and without admission control.
+
+Simulates a provider that serves 4 requests at a time at full speed, slows
+down linearly beyond that and answers 429 above 8 concurrent requests.
+A few interactive clients send requests with think time while many batch
+workers send back to back. Without the scheduler every request goes straight
+to the provider; with it, requests pass through AdmissionScheduler first.
+
+Usage:
+    python -m benchmarks.bench_scheduler [--seconds 5] [--batch-workers 16]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from src.llm import AdmissionScheduler
+
+CAPACITY = 4
+REJECT_ABOVE = 8
+BASE_SECONDS = 0.02
+
+
+class SimulatedProvider:
+    def __init__(self):
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def send(self, timeout=None):
+        with self._lock:
+            self.in_flight += 1
+            in_flight = self.in_flight
+        try:
+            if in_flight > REJECT_ABOVE:
+                with self._lock:
+                    self.rejected += 1
+                return False
+            time.sleep(BASE_SECONDS * max(1.0, in_flight / CAPACITY))
+            return True
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def run_scenario(seconds: float, batch_workers: int, scheduler=None):
+    provider = SimulatedProvider()
+    stop = time.monotonic() + seconds
+    interactive, batch = [], []
+
+    def send(timeout=None):
+        if not provider.send(timeout):
+            raise RateLimited()
+        return True
+
+    def call(priority, user):
+        # Like the agents, retry 429s after a short backoff until they succeed
+        while time.monotonic() < stop:
+            try:
+                if scheduler is None:
+                    return send()
+                return scheduler.call(send, 500, priority, user)
+            except RateLimited:
+                time.sleep(0.05)
+        return False
+
+    def interactive_client(user):
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            if call("interactive", user):
+                interactive.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.05)
+
+    def batch_worker(user):
+        while time.monotonic() < stop:
+            if call("batch", user):
+                batch.append(1)
+
+    threads = [threading.Thread(target=interactive_client, args=(f"user-{i}",)) for i in range(3)]
+    threads += [threading.Thread(target=batch_worker, args=(f"job-{i % 4}",))
+                for i in range(batch_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ordered = sorted(interactive)
+    return {
+        "interactive_p50_ms": statistics.median(ordered),
+        "interactive_p95_ms": ordered[int(0.95 * (len(ordered) - 1))],
+        "interactive_done": len(ordered),
+        "batch_per_s": len(batch) / seconds,
+        "rejected_429": provider.rejected,
+    }
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def run(seconds: float, batch_workers: int):
+    results = {
+        "direct": run_scenario(seconds, batch_workers),
+        "scheduled": run_scenario(seconds, batch_workers, AdmissionScheduler(
+            requests_per_minute=0, tokens_per_minute=0,
+            initial_concurrency=CAPACITY, max_concurrency=2 * REJECT_ABOVE)),
+    }
+    print(f"{'mode':>10} {'int p50 ms':>11} {'int p95 ms':>11} {'int calls':>10} "
+          f"{'batch/s':>8} {'429s':>6}")
+    for mode, r in results.items():
+        print(f"{mode:>10} {r['interactive_p50_ms']:>11.1f} {r['interactive_p95_ms']:>11.1f} "
+              f"{r['interactive_done']:>10} {r['batch_per_s']:>8.1f} {r['rejected_429']:>6}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--batch-workers", type=int, default=16)
+    args = parser.parse_args()
+    run(args.seconds, args.batch_workers)
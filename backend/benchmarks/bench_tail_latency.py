@@ -0,0 +1,67 @@
+"""
+Tail latency of LLM calls with and without hedging and deadlines.
+
+Simulates a provider whose latencies are mostly fast with a heavy tail
+(5% of requests are 10x slower) and runs the same calls through
+call_with_policy with hedging off and on. Reports p50/p95/p99 and how many
+extra requests hedging sent.
+
+Usage:
+    python -m benchmarks.bench_tail_latency [--calls 400] [--base-ms 20]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from src.llm import CallPolicy, LatencyTracker, call_with_policy
+
+
+def provider(base_ms: float, rng: random.Random, sent: list):
+    def attempt(timeout):
+        sent.append(1)
+        slow = rng.random() < 0.05
+        latency = rng.lognormvariate(0, 0.25) * base_ms / 1000 * (10 if slow else 1)
+        time.sleep(min(latency, timeout))
+        return "ok"
+    return attempt
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(calls: int, base_ms: float):
+    print(f"{'policy':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'requests':>9}")
+    results = {}
+    for name, hedge in (("plain", False), ("hedged", True)):
+        rng = random.Random(0)
+        sent = []
+        attempt = provider(base_ms, rng, sent)
+        policy = CallPolicy(deadline=base_ms * 20 / 1000, hedge=hedge, hedge_min_samples=20)
+        latencies = LatencyTracker()
+        observed = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            call_with_policy(attempt, policy, latencies=latencies)
+            observed.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "p50_ms": statistics.median(observed),
+            "p95_ms": percentile(observed, 0.95),
+            "p99_ms": percentile(observed, 0.99),
+            "max_ms": max(observed),
+            "requests": len(sent),
+        }
+        r = results[name]
+        print(f"{name:>8} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['max_ms']:>8.1f} {r['requests']:>9}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--base-ms", type=float, default=20)
+    args = parser.parse_args()
+    run(args.calls, args.base_ms)
@@ -0,0 +1,39 @@
+"""
+Synthetic data shared by the benchmarks.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+
+def make_daily_records(days: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build realistic daily tracking records.
+
+    Args:
+        days (int): Number of consecutive days
+        seed (int): Random seed so runs are comparable
+
+    Returns:
+        List[Dict[str, Any]]: Records shaped like the agent example data
+    """
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    records = []
+    for i in range(days):
+        exercised = rng.random() < 0.8
+        records.append({
+            "date": (start + timedelta(days=i)).isoformat(),
+            "exercise": {
+                "completed": exercised,
+                "duration": f"{rng.randint(20, 45) if exercised else 0} minutes",
+                "type": rng.choice(["running", "cycling", "yoga", "swimming"]),
+            },
+            "sleep": {"hours": round(rng.uniform(6, 9), 1),
+                      "quality": rng.choice(["good", "fair", "poor"])},
+            "nutrition": {"vegetables": rng.randint(1, 6),
+                          "water_intake": f"{rng.choice([1.5, 2, 2.5])}L"},
+            "meditation": {"completed": rng.random() < 0.7, "duration": "10 minutes"},
+        })
+    return records
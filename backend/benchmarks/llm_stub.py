@@ -0,0 +1,314 @@
+"""
+Local stand-in for an OpenAI-compatible chat completion API.
+
+Answers POST /v1/chat/completions with a CrewAI-compatible reply and usage
+counts, and records what it was sent. By default it answers immediately, so
+benchmarks can measure client-side overhead without network or provider
+latency. For load tests it can behave like a real provider:
+
+- latency before the first token from a fixed, uniform, lognormal or
+  exponential distribution, with an optional heavy tail
+- completion tokens generated at a fixed rate, capped by max_tokens
+- injected 500 errors and 429 responses with Retry-After, at a given rate
+  or above a number of concurrent requests
+- streamed responses (server-sent events) when the request sets "stream"
+
+Settings are given on the command line and can be changed at runtime with
+PUT /config; GET /stats reports what was received and sent.
+
+Usage:
+    python -m benchmarks.llm_stub --port 8100 --latency-ms 400 \\
+        --latency-dist lognormal --tokens-per-second 80 --completion-tokens 150
+    uvicorn benchmarks.llm_stub:app --port 8100   # instant replies
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.agents.token_budget import estimate_tokens
+
+REPLY = "Thought: I now can give a great answer\nFinal Answer: Keep going, you are on track."
+FILLER = ("Small consistent steps add up, so keep your routine simple and repeatable. "
+          "Celebrate progress, plan for busy days and rest when you need it. ").split()
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+
+class StubConfig:
+    def __init__(self, latency_ms: float = 0.0, latency_dist: str = "fixed", jitter: float = 0.25,
+                 tail_rate: float = 0.0, tail_factor: float = 10.0, tokens_per_second: float = 0.0,
+                 completion_tokens: Optional[int] = None, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, max_concurrency: int = 0, retry_after: float = 1.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize the stand-in's behaviour.
+
+        Args:
+            latency_ms (float): Typical time to first token
+            latency_dist (str): fixed, uniform (+-jitter), lognormal (sigma
+                jitter) or exponential (mean latency_ms)
+            jitter (float): Spread of the uniform and lognormal distributions
+            tail_rate (float): Share of requests whose latency is multiplied
+                by tail_factor
+            tail_factor (float): Slowdown of tail requests
+            tokens_per_second (float): Completion generation rate, 0 for instant
+            completion_tokens (int, optional): Reply length; the short fixed
+                reply when None
+            error_rate (float): Share of requests answered 500
+            rate_limit_rate (float): Share of requests answered 429
+            max_concurrency (int): Requests in flight above which 429 is
+                answered, 0 for no limit
+            retry_after (float): Retry-After seconds sent with 429
+            seed (int, optional): Seed for reproducible runs
+        """
+        if latency_dist not in DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_factor = tail_factor
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in vars(self).items() if key != "rng"}
+
+    def first_token_seconds(self) -> float:
+        """Sample the latency before the first token."""
+        base = self.latency_ms / 1000
+        if self.latency_dist == "uniform":
+            seconds = base * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+        elif self.latency_dist == "lognormal":
+            # Median base, mean slightly above it
+            seconds = base * self.rng.lognormvariate(0, self.jitter)
+        elif self.latency_dist == "exponential":
+            seconds = self.rng.expovariate(1 / base) if base else 0.0
+        else:
+            seconds = base
+        if self.rng.random() < self.tail_rate:
+            seconds *= self.tail_factor
+        return max(0.0, seconds)
+
+    def reply(self, max_tokens: Optional[int]) -> Dict[str, Any]:
+        """Build the reply text, truncated to max_tokens like a real model."""
+        words = REPLY.split(" ")
+        target = self.completion_tokens or estimate_tokens(REPLY)
+        if max_tokens:
+            target = min(target, max_tokens)
+        i = 0
+        while estimate_tokens(" ".join(words)) < target:
+            words.append(FILLER[i % len(FILLER)])
+            i += 1
+        while len(words) > 1 and estimate_tokens(" ".join(words)) > target:
+            words.pop()
+        text = " ".join(words)
+        truncated = bool(max_tokens) and (self.completion_tokens or 0) > max_tokens
+        return {"text": text, "tokens": estimate_tokens(text),
+                "finish_reason": "length" if truncated else "stop"}
+
+
+app = FastAPI(title="LLM stub")
+config = StubConfig()
+_lock = threading.Lock()
+_requests: List[Dict[str, Any]] = []
+_totals: Dict[str, int] = {}
+_in_flight = 0
+
+
+def _reset_totals():
+    _totals.update({"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "streamed": 0,
+                    "prompt_tokens": 0, "completion_tokens": 0, "max_in_flight": 0})
+
+
+_reset_totals()
+
+
+def _error(status_code: int, message: str, kind: str, headers: Optional[Dict[str, str]] = None):
+    return JSONResponse({"error": {"message": message, "type": kind}},
+                        status_code=status_code, headers=headers)
+
+
+def _chunk(body_id: str, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None,
+           usage: Optional[Dict[str, int]] = None) -> str:
+    chunk = {"id": body_id, "object": "chat.completion.chunk", "created": int(time.time()),
+             "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+    if usage:
+        chunk["usage"] = usage
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: Dict[str, Any]):
+    global _in_flight
+    messages = body.get("messages", [])
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    prompt_tokens = estimate_tokens(prompt)
+    model = body.get("model", "stub")
+    with _lock:
+        _requests.append({"messages": len(messages), "prompt_chars": len(prompt),
+                          "prompt_tokens": prompt_tokens, "model": model,
+                          "max_tokens": body.get("max_tokens"), "stream": bool(body.get("stream"))})
+        _totals["requests"] += 1
+        overloaded = bool(config.max_concurrency) and _in_flight >= config.max_concurrency
+        roll = config.rng.random()
+
+    retry_after = {"Retry-After": f"{config.retry_after:g}"}
+    if overloaded or roll < config.rate_limit_rate:
+        with _lock:
+            _totals["rate_limited"] += 1
+        return _error(429, "Rate limit exceeded", "rate_limit_error", retry_after)
+    if roll < config.rate_limit_rate + config.error_rate:
+        with _lock:
+            _totals["errors"] += 1
+        return _error(500, "Injected server error", "server_error")
+
+    reply = config.reply(body.get("max_tokens"))
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": reply["tokens"],
+             "total_tokens": prompt_tokens + reply["tokens"]}
+    first_token = config.first_token_seconds()
+    per_token = 1 / config.tokens_per_second if config.tokens_per_second else 0.0
+    body_id = f"stub-{time.time_ns()}"
+
+    with _lock:
+        _in_flight += 1
+        _totals["max_in_flight"] = max(_totals["max_in_flight"], _in_flight)
+        _totals["ok"] += 1
+        _totals["prompt_tokens"] += prompt_tokens
+        _totals["completion_tokens"] += reply["tokens"]
+
+    def done():
+        global _in_flight
+        with _lock:
+            _in_flight -= 1
+
+    if body.get("stream"):
+        with _lock:
+            _totals["streamed"] += 1
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        async def events():
+            try:
+                await asyncio.sleep(first_token)
+                yield _chunk(body_id, model, {"role": "assistant", "content": ""})
+                words = reply["text"].split(" ")
+                for i, word in enumerate(words):
+                    piece = word if i == 0 else f" {word}"
+                    # Each word is paced by the tokens it takes
+                    await asyncio.sleep(per_token * estimate_tokens(piece))
+                    yield _chunk(body_id, model, {"content": piece})
+                yield _chunk(body_id, model, {}, reply["finish_reason"],
+                             usage if include_usage else None)
+                yield "data: [DONE]\n\n"
+            finally:
+                done()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    try:
+        await asyncio.sleep(first_token + per_token * reply["tokens"])
+    finally:
+        done()
+    return {
+        "id": body_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": reply["text"]},
+            "finish_reason": reply["finish_reason"],
+        }],
+        "usage": usage,
+    }
+
+
+@app.get("/config")
+def get_config():
+    return config.as_dict()
+
+
+@app.put("/config")
+def put_config(changes: Dict[str, Any]):
+    """Change settings for the following requests; unknown names answer 422."""
+    global config
+    settings = config.as_dict()
+    unknown = set(changes) - set(settings)
+    if unknown:
+        return _error(422, f"Unknown settings: {', '.join(sorted(unknown))}", "invalid_request_error")
+    settings.update(changes)
+    try:
+        config = StubConfig(**settings)
+    except ValueError as e:
+        return _error(422, str(e), "invalid_request_error")
+    return config.as_dict()
+
+
+@app.get("/stats")
+def stats():
+    with _lock:
+        return {"requests": list(_requests), "totals": dict(_totals), "in_flight": _in_flight}
+
+
+@app.delete("/stats")
+def reset_stats():
+    with _lock:
+        _requests.clear()
+        _reset_totals()
+    return {"requests": []}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(port: int):
+    """Run the stub in a daemon thread and wait until it accepts requests."""
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    defaults = StubConfig()
+    for name, value in defaults.as_dict().items():
+        kind = type(value) if value is not None else int
+        parser.add_argument(f"--{name.replace('_', '-')}", type=kind, default=value,
+                            choices=DISTRIBUTIONS if name == "latency_dist" else None)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    import uvicorn
+    global config
+    args = vars(parse_args(argv))
+    host, port = args.pop("host"), args.pop("port")
+    config = StubConfig(**args)
+    # One event loop serves every simulated request, so concurrency is only
+    # limited by max_concurrency
+    uvicorn.run(app, host=host, port=port, log_level="warning", backlog=4096,
+                timeout_keep_alive=60)
+
+
+if __name__ == "__main__":
+    main()
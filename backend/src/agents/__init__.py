@@ -3,11 +3,19 @@ from .planner_agent import PlannerAgent
 from .tracker_agent import TrackerAgent
 from .analyzer_agent import AnalyzerAgent
 from .motivator_agent import MotivatorAgent
+from .registry import Lazy, build_agents, get_agent
+from .prefetch import CelebrationPrefetcher
+from .fallback import FallbackTier
 
 __all__ = [
     'BaseAgent',
     'PlannerAgent',
     'TrackerAgent',
     'AnalyzerAgent',
-    'MotivatorAgent'
+    'MotivatorAgent',
+    'Lazy',
+    'build_agents',
+    'get_agent',
+    'CelebrationPrefetcher',
+    'FallbackTier'
 ]
@@ -0,0 +1,188 @@
+"""
+Local numeric pre-aggregation of health records.
+
+Averages, completion rates and trends are computed here with numpy so that
+agents can send the model a compact statistics block instead of asking it
+to do arithmetic over raw daily records.
+"""
+
+import re
+from collections import Counter
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def flatten_record(record: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """
+    Flatten nested dicts into dotted keys.
+
+    Args:
+        record (Dict[str, Any]): Possibly nested record
+        prefix (str): Key prefix for nested values
+
+    Returns:
+        Dict[str, Any]: e.g. {"exercise.duration": 30, "exercise.completed": True}
+    """
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_record(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Return the numeric part of a value such as 30, 7.5 or "35 minutes"."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER_PATTERN.search(value)
+        if match:
+            return float(match.group())
+    return None
+
+
+def _day_offsets(records: List[Dict[str, Any]]) -> "np.ndarray":
+    """Day index of each record, from its date when every record has one."""
+    import numpy as np
+    days = []
+    for record in records:
+        value = record.get("date")
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                value = None
+        if isinstance(value, datetime):
+            value = value.date()
+        if not isinstance(value, date):
+            return np.arange(len(records), dtype=float)
+        days.append(value.toordinal())
+    offsets = np.array(days, dtype=float)
+    return offsets - offsets.min()
+
+
+def compute_metric_stats(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute per-metric statistics over a list of daily records.
+
+    Boolean metrics get a completion ratio and missed-day count (a missing
+    value counts as missed). Numeric metrics, including strings such as
+    "35 minutes", get mean, variance, min, max and a least-squares trend
+    slope per day. Other values get their most common categories.
+
+    Args:
+        records (List[Dict[str, Any]]): Daily records in chronological order
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Statistics keyed by dotted metric name
+    """
+    # numpy is only needed once statistics are computed, not at import time
+    import numpy as np
+
+    flat = [flatten_record(record) for record in records]
+    names = []
+    for row in flat:
+        for name in row:
+            if name != "date" and name not in names:
+                names.append(name)
+
+    days = len(flat)
+    stats: Dict[str, Dict[str, Any]] = {}
+    numeric_names = []
+    numeric_columns = []
+    for name in names:
+        values = [row.get(name) for row in flat]
+        present = [v for v in values if v is not None]
+        if present and all(isinstance(v, bool) for v in present):
+            completed = np.fromiter((v is True for v in values), dtype=bool, count=days)
+            stats[name] = {
+                "type": "completion",
+                "days": days,
+                "completion_ratio": float(completed.mean()),
+                "missed_days": int(days - completed.sum()),
+            }
+            continue
+        numbers = [parse_number(v) for v in values]
+        if any(n is not None for n in numbers):
+            numeric_names.append(name)
+            numeric_columns.append([np.nan if n is None else n for n in numbers])
+            continue
+        counts = Counter(str(v) for v in present)
+        stats[name] = {
+            "type": "category",
+            "days": days,
+            "top": counts.most_common(3),
+        }
+
+    if numeric_columns:
+        # One days x metrics matrix, reduced column-wise
+        matrix = np.array(numeric_columns, dtype=float).T
+        valid = ~np.isnan(matrix)
+        counts = valid.sum(axis=0)
+        x = np.broadcast_to(_day_offsets(records)[:, None], matrix.shape)
+        x_mean = np.where(valid, x, 0).sum(axis=0) / counts
+        y_mean = np.nanmean(matrix, axis=0)
+        dx = np.where(valid, x - x_mean, 0)
+        dy = np.where(valid, matrix - y_mean, 0)
+        denominator = (dx * dx).sum(axis=0)
+        slope = np.divide((dx * dy).sum(axis=0), denominator,
+                          out=np.zeros_like(denominator), where=denominator > 0)
+        variance = np.nanvar(matrix, axis=0)
+        minimum = np.nanmin(matrix, axis=0)
+        maximum = np.nanmax(matrix, axis=0)
+        for i, name in enumerate(numeric_names):
+            stats[name] = {
+                "type": "numeric",
+                "days": days,
+                "count": int(counts[i]),
+                "missed_days": int(days - counts[i]),
+                "mean": float(y_mean[i]),
+                "variance": float(variance[i]),
+                "min": float(minimum[i]),
+                "max": float(maximum[i]),
+                "trend_per_day": float(slope[i]),
+            }
+
+    return {name: stats[name] for name in names}
+
+
+def format_stats_block(stats: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Render statistics as one compact line per metric.
+
+    Args:
+        stats (Dict[str, Dict[str, Any]]): Output of compute_metric_stats
+
+    Returns:
+        str: Statistics block for a prompt
+    """
+    lines = []
+    for name, s in stats.items():
+        if s["type"] == "completion":
+            lines.append(
+                f"{name}: completed {s['days'] - s['missed_days']}/{s['days']} days "
+                f"({s['completion_ratio']:.0%}), missed {s['missed_days']}")
+        elif s["type"] == "numeric":
+            lines.append(
+                f"{name}: mean {s['mean']:.4g}, var {s['variance']:.4g}, "
+                f"range {s['min']:.4g}-{s['max']:.4g}, trend {s['trend_per_day']:+.3g}/day, "
+                f"logged {s['count']}/{s['days']} days")
+        else:
+            top = ", ".join(f"{value} x{count}" for value, count in s["top"])
+            lines.append(f"{name}: {top}")
+    return "\n".join(lines)
+
+
+def summarize_records(records: List[Dict[str, Any]]) -> str:
+    """Compute and render the statistics block for a list of records."""
+    return format_stats_block(compute_metric_stats(records))
@@ -1,11 +1,18 @@
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 from .base_agent import BaseAgent
-from crewai import Agent
+from .analytics import summarize_records
+from .prompt_encoding import encode_records
+from .summarization import ChunkSummaryCache, chunk_by_week, summarize_chunks
+from src.config.ai_config import MAP_REDUCE_CONFIG
+
+if TYPE_CHECKING:
+    from crewai import Agent
 
 
 class AnalyzerAgent(BaseAgent):
-    def __init__(self, agent: Agent = None):
+    def __init__(self, agent: "Agent" = None):
         if agent is None:
+            from crewai import Agent
             agent = Agent(
                 name="Analyzer",
                 role="Health Data Analyzer",
@@ -13,36 +20,94 @@ class AnalyzerAgent(BaseAgent):
                 backstory="An experienced health data analyst with expertise in identifying patterns and trends in health-related activities.",
                 verbose=True
             )
-        super().__init__(agent)
+        super().__init__("analyzer", agent)
+        self.chunk_summaries = ChunkSummaryCache()
+
+    def _use_map_reduce(self, data: List[Dict[str, Any]], map_reduce: Optional[bool]) -> bool:
+        if map_reduce is None:
+            return len(data) > MAP_REDUCE_CONFIG["min_records"]
+        return map_reduce
+
+    def summarize_week(self, label: str, records: List[Dict[str, Any]]) -> str:
+        """Summarize one week of health data for later analysis."""
+        return self.execute_records(
+            "summarize_week", records,
+            lambda chunk: f"""Summarize this week ({label}) of health data:
+        {encode_records(chunk)}
+        Report completion, durations and notable changes in a few concise sentences.""")
+
+    def _weekly_summaries(self, data: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        return summarize_chunks(chunk_by_week(data), self.summarize_week, self.chunk_summaries)
+
+    @staticmethod
+    def _format_summaries(summaries: List[Tuple[str, str]]) -> str:
+        return "\n".join(f"{label}: {summary}" for label, summary in summaries)
 
     def analyze_weekly_progress(self, weekly_data: List[Dict[str, Any]]) -> str:
         """Analyze weekly progress and provide insights."""
         if not weekly_data:
             raise ValueError("Weekly data cannot be empty")
 
-        task = f"""Analyze this weekly health data: {weekly_data}
+        task = f"""Analyze this weekly health data ({len(weekly_data)} days).
+        Statistics per metric:
+        {summarize_records(weekly_data)}
         Provide insights about progress, achievements, and areas for improvement."""
-        return self.execute(task)
+        return self.execute(task, method="analyze_weekly_progress")
+
+    def identify_behavior_patterns(self, monthly_data: List[Dict[str, Any]], *,
+                                   map_reduce: Optional[bool] = None) -> str:
+        """Identify patterns in monthly health behavior data.
 
-    def identify_behavior_patterns(self, monthly_data: List[Dict[str, Any]]) -> str:
-        """Identify patterns in monthly health behavior data."""
+        Long histories are summarized week by week first unless map_reduce is False.
+        """
         if not monthly_data:
             raise ValueError("Monthly data cannot be empty")
 
-        task = f"""Analyze these monthly health patterns: {monthly_data}
-        Identify trends, correlations, and behavioral patterns."""
-        return self.execute(task)
+        if self._use_map_reduce(monthly_data, map_reduce):
+            stats = summarize_records(monthly_data)
+            return self.execute_records(
+                "identify_behavior_patterns", self._weekly_summaries(monthly_data),
+                lambda summaries: f"""Analyze these weekly summaries of health behavior:
+        {self._format_summaries(summaries)}
+        Statistics per metric over all {len(monthly_data)} days:
+        {stats}
+        Identify trends, correlations, and behavioral patterns.""")
 
-    def generate_insights_report(self, data: List[Dict[str, Any]], goals: Dict[str, Any]) -> str:
-        """Generate a comprehensive insights report."""
+        return self.execute_records(
+            "identify_behavior_patterns", monthly_data,
+            lambda records: f"""Analyze these monthly health patterns:
+        {encode_records(records)}
+        Identify trends, correlations, and behavioral patterns.""")
+
+    def generate_insights_report(self, data: List[Dict[str, Any]], goals: Dict[str, Any], *,
+                                 map_reduce: Optional[bool] = None) -> str:
+        """Generate a comprehensive insights report.
+
+        Long histories are summarized week by week first unless map_reduce is False.
+        """
         if not data:
             raise ValueError("Data cannot be empty")
         if not goals:
             raise ValueError("Goals cannot be empty")
 
-        task = f"""Generate an insights report based on this data and goals:
-        Data: {data}
+        if self._use_map_reduce(data, map_reduce):
+            stats = summarize_records(data)
+            return self.execute_records(
+                "generate_insights_report", self._weekly_summaries(data),
+                lambda summaries: f"""Generate an insights report based on these weekly summaries and goals:
+        Weekly Summaries:
+        {self._format_summaries(summaries)}
+        Statistics per metric over all {len(data)} days:
+        {stats}
+        Goals: {goals}
+        
+        Provide detailed analysis and recommendations.""")
+
+        return self.execute_records(
+            "generate_insights_report", data,
+            lambda records: f"""Generate an insights report based on this data and goals:
+        Data:
+        {encode_records(records)}
         Goals: {goals}
         
-        Provide detailed analysis and recommendations."""
-        return self.execute(task)
+        Provide detailed analysis and recommendations.""")
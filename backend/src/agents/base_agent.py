@@ -2,13 +2,28 @@
 Base agent implementation using TogetherAI.
 """
 
-from crewai import Task, Agent, Crew
-from typing import Optional, Dict, Any
-from src.config.ai_config import MODEL_CONFIG, SYSTEM_PROMPTS
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Iterator, List, Sequence
+from src.config.ai_config import (
+    MODEL_CONFIG, SYSTEM_PROMPTS, TOKEN_BUDGET_CONFIG, AGENT_EXECUTION_CONFIG, LLM_BASE_URL
+)
+from src.agents.token_budget import TokenBudget, estimate_tokens
+from src.llm import (
+    CallPolicy, LatencyTracker, LLMClient, LLMTimeout, ModelRoute, call_with_policy,
+    current_priority, current_user, get_llm_client, get_model_router, get_scheduler, policy_for,
+    provider_breaker, record_call, route_for
+)
+from src.observability.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from crewai import Agent
 
 
 class BaseAgent:
-    def __init__(self, agent_type: str, agent: Agent):
+    def __init__(self, agent_type: str, agent: "Agent"):
         """
         Initialize a base agent with TogetherAI configuration.
 
@@ -18,37 +33,292 @@ class BaseAgent:
         """
         self.agent_type = agent_type
         self.agent = agent
+        self.mode = AGENT_EXECUTION_CONFIG["default_mode"]
         self.system_prompt = SYSTEM_PROMPTS.get(agent_type, "")
+        # One budget for every call instead of the one of its model route
+        self.token_budget: Optional[TokenBudget] = None
+        # Token counts of recent calls, newest last
+        self.usage_history = deque(maxlen=100)
+        # Recent latencies per method, used to decide when to hedge
+        self.latencies: Dict[str, LatencyTracker] = {}
+
+        # crewai pulls in litellm and friends, so it is only imported once an
+        # agent is actually built
+        import litellm
+
+        # Direct calls fetch the process-wide client on each call, so they
+        # follow it when it is closed and rebuilt; tests may replace it
+        self._llm_client: Optional[LLMClient] = None
+        # The CrewAI path reuses the same connection pool as direct calls
+        litellm.client_session = get_llm_client().http
 
         # Configure agent with TogetherAI settings
-        self.agent.llm_config = {
-            "config_list": [{
-                "model": MODEL_CONFIG["model"],
-                "api_key": MODEL_CONFIG.get("api_key"),
-                "base_url": "https://api.together.xyz/v1",
-                "api_type": "together",
-                "max_tokens": MODEL_CONFIG["max_tokens"],
-                "temperature": MODEL_CONFIG["temperature"],
-                "top_p": MODEL_CONFIG["top_p"],
-                "top_k": MODEL_CONFIG["top_k"],
-                "repetition_penalty": MODEL_CONFIG["repetition_penalty"],
-                "stop": MODEL_CONFIG["stop"]
-            }]
+        self.agent.llm = self._crew_llm(MODEL_CONFIG["model"], MODEL_CONFIG["max_tokens"],
+                                        MODEL_CONFIG["temperature"])
+        # Idle CrewAI agents per model settings. An agent keeps the running
+        # task's messages on its executor, so each concurrent call checks out
+        # its own copy and returns it afterwards
+        self._crew_agents: Dict[tuple, List["Agent"]] = {
+            (MODEL_CONFIG["model"], MODEL_CONFIG["max_tokens"], MODEL_CONFIG["temperature"]): [self.agent]
         }
+        self._crew_agents_lock = threading.Lock()
+
+    @property
+    def llm_client(self) -> LLMClient:
+        """Client direct calls are sent through."""
+        return self._llm_client or get_llm_client()
+
+    @llm_client.setter
+    def llm_client(self, client: LLMClient):
+        self._llm_client = client
+
+    @staticmethod
+    def _crew_llm(model: str, max_tokens: int, temperature: float):
+        from crewai import LLM
+        return LLM(
+            model=f"together_ai/{model}",
+            api_key=MODEL_CONFIG.get("api_key"),
+            base_url=LLM_BASE_URL,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=MODEL_CONFIG["top_p"],
+            top_k=MODEL_CONFIG["top_k"],
+            repetition_penalty=MODEL_CONFIG["repetition_penalty"],
+            stop=MODEL_CONFIG["stop"],
+            # Attempts are retried by call_with_policy; a client retry would
+            # run past the attempt's timeout
+            max_retries=0
+        )
+
+    @contextmanager
+    def crew_agent(self, route: ModelRoute) -> Iterator["Agent"]:
+        """Check out a CrewAI agent configured for a model route, copying one when none is idle."""
+        key = (route.model, route.max_tokens, route.temperature)
+        with self._crew_agents_lock:
+            idle = self._crew_agents.setdefault(key, [])
+            agent = idle.pop() if idle else None
+        if agent is None:
+            agent = self.agent.copy()
+            agent.llm = self._crew_llm(*key)
+        try:
+            yield agent
+        finally:
+            with self._crew_agents_lock:
+                self._crew_agents[key].append(agent)
+
+    @property
+    def last_usage(self) -> Optional[Dict[str, Any]]:
+        """Token counts of the most recent call, if any."""
+        return self.usage_history[-1] if self.usage_history else None
 
-    def execute(self, task: str) -> str:
+    def budget(self, route: ModelRoute) -> TokenBudget:
+        """Return the prompt budget of a call on a model route."""
+        if self.token_budget is not None:
+            return self.token_budget
+        return TokenBudget(
+            context_window=route.context_window,
+            reserved_output_tokens=route.max_tokens,
+            overhead_tokens=TOKEN_BUDGET_CONFIG["overhead_tokens"]
+        )
+
+    def budget_policy(self, method: str) -> str:
+        """Return the token budget policy configured for an agent method."""
+        return TOKEN_BUDGET_CONFIG["policies"].get(
+            f"{self.agent_type}.{method}", TOKEN_BUDGET_CONFIG["default_policy"])
+
+    def execution_mode(self, method: Optional[str]) -> str:
+        """Return "crew" or "direct" for an agent method."""
+        return AGENT_EXECUTION_CONFIG["methods"].get(f"{self.agent_type}.{method}", self.mode)
+
+    def call_policy(self, method: Optional[str]) -> CallPolicy:
+        """Return the deadline, retry and hedging policy for an agent method."""
+        policy = policy_for(f"{self.agent_type}.{method}")
+        if self.execution_mode(method) != "direct":
+            # A CrewAI call may send several requests, each allowed the time
+            # left when the attempt started, so a losing one can hold its pool
+            # thread and CrewAI agent past the deadline; only direct requests,
+            # which end at their timeout, are hedged
+            policy.hedge = False
+        return policy
+
+    def model_route(self, method: Optional[str]) -> ModelRoute:
+        """Return the model, max_tokens and temperature configured for an agent method."""
+        return route_for(f"{self.agent_type}.{method}")
+
+    def messages(self, task: str) -> List[Dict[str, str]]:
+        """Build the chat messages sent in direct mode."""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": task},
+        ]
+
+    def execute(self, task: str, method: Optional[str] = None,
+                records: Optional[Dict[str, int]] = None) -> str:
         """
         Execute a task using the agent with TogetherAI.
 
         Args:
             task (str): Task description
+            method (str, optional): Agent method issuing the call
+            records (Dict[str, int], optional): Record counts before and after
+                budget trimming, reported with the token counts
 
         Returns:
             str: Agent's response
+
+        Raises:
+            TokenBudgetExceeded: If the prompt does not fit the context window
+            DeadlineExceeded: If the call does not finish within its deadline
+            CircuitOpenError: If the provider is failing and calls are short-circuited
         """
-        crewai_task = Task(
-            description=f"{self.system_prompt}\n\nTask: {task}",
-            expected_output="A detailed response based on the task description",
-            agent=self.agent
+        key = f"{self.agent_type}.{method}"
+        router = get_model_router()
+        route = router.choose(key)
+        budget = self.budget(route)
+        if route.rerouted and not budget.fits(self.system_prompt, task):
+            # Too long for the fallback model; the configured route fits it
+            route = self.model_route(method)
+            budget = self.budget(route)
+        usage = budget.measure(self.system_prompt, task)
+        usage["method"] = method
+        usage["model"] = route.model
+        if route.rerouted:
+            usage["rerouted"] = True
+        if records:
+            usage.update(records)
+        self.usage_history.append(usage)
+        budget.ensure_fits(self.system_prompt, task)
+
+        if self.execution_mode(method) == "direct":
+            def call(timeout):
+                return self._execute_direct(task, usage, timeout, route)
+        else:
+            def call(timeout):
+                return self._execute_crew(task, route, usage, timeout)
+
+        tracer = get_tracer()
+        parent = None
+
+        def send(timeout):
+            # Provider time only, without queueing, feeds latency routing
+            started = time.monotonic()
+            with tracer.span("llm.request", parent=parent, model=route.model):
+                result = call(timeout)
+            router.record(key, route.model, time.monotonic() - started)
+            return result
+
+        # Attempts run on other threads, so the caller's context is read here
+        priority, user = current_priority.get(), current_user.get()
+        scheduler = get_scheduler()
+
+        def attempt(timeout):
+            # Every attempt, retries and hedges included, waits for admission
+            return scheduler.call(send, usage["prompt_tokens"], priority, user,
+                                  timeout=timeout, usage=usage)
+
+        started = time.monotonic()
+        error = None
+        with tracer.span(f"agent {key}", model=route.model,
+                         prompt_tokens=usage["prompt_tokens"]) as span:
+            # Attempts run on other threads, their spans name the parent
+            parent = span
+            try:
+                return call_with_policy(
+                    attempt,
+                    self.call_policy(method),
+                    breaker=provider_breaker,
+                    latencies=self.latencies.setdefault(str(method), LatencyTracker()),
+                    stats=usage
+                )
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                record_call(key, usage, time.monotonic() - started, user, error)
+                if span is not None:
+                    span.set(**{name: usage[name] for name in
+                                ("attempts", "hedged", "queued_ms", "completion_tokens")
+                                if usage.get(name) is not None})
+
+    def _execute_crew(self, task: str, route: Optional[ModelRoute] = None,
+                      usage: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> str:
+        """Run the task through the CrewAI agent loop."""
+        from crewai import Task
+        from litellm.exceptions import Timeout
+        with self.crew_agent(route or self.model_route(None)) as agent:
+            # The agent is checked out, so the timeout applies to this call
+            # only. A request still running at the deadline ends there and
+            # frees its pool thread and admission slot for the next attempt
+            agent.llm.timeout = timeout
+            crewai_task = Task(
+                description=f"{self.system_prompt}\n\nTask: {task}",
+                expected_output="A detailed response based on the task description",
+                agent=agent
+            )
+            # The agent sums the usage the provider reports for each call of
+            # its loop; it is checked out, so the difference is this task's
+            before = agent._token_process.get_summary()
+            try:
+                result = agent.execute_task(crewai_task)
+            except Timeout as e:
+                # Retried like a timed out direct request
+                raise LLMTimeout(f"Completion request timed out: {e}") from e
+            after = agent._token_process.get_summary()
+        if usage is not None:
+            if after.successful_requests > before.successful_requests:
+                usage["provider_prompt_tokens"] = after.prompt_tokens - before.prompt_tokens
+                usage["completion_tokens"] = after.completion_tokens - before.completion_tokens
+            else:
+                # No usage reported, e.g. by a provider that omits it
+                usage["completion_tokens"] = estimate_tokens(str(result))
+        return result
+
+    def _execute_direct(self, task: str, usage: Dict[str, Any],
+                        timeout: Optional[float] = None,
+                        route: Optional[ModelRoute] = None) -> str:
+        """Send the task as a single chat completion, bypassing CrewAI."""
+        route = route or self.model_route(usage.get("method"))
+        completion = self.llm_client.chat_completion(
+            self.messages(task),
+            timeout=timeout,
+            model=route.model,
+            max_tokens=route.max_tokens,
+            temperature=route.temperature,
+            top_p=MODEL_CONFIG["top_p"],
+            top_k=MODEL_CONFIG["top_k"],
+            repetition_penalty=MODEL_CONFIG["repetition_penalty"],
+            stop=MODEL_CONFIG["stop"],
+            # Attempts are retried by call_with_policy; a client retry would
+            # run past the attempt's timeout
+            max_retries=0
         )
-        return self.agent.execute_task(crewai_task)
+        usage["provider_prompt_tokens"] = completion.prompt_tokens
+        usage["completion_tokens"] = completion.completion_tokens
+        if completion.first_token is not None:
+            usage["first_token_ms"] = round(completion.first_token * 1000, 1)
+        return completion.content
+
+    def execute_records(self, method: str, records: Sequence[Any],
+                        render: Callable[[List[Any]], str]) -> str:
+        """
+        Execute a task built from a list of records within the token budget.
+
+        Oversized record lists are reduced according to the method's policy
+        before anything is sent.
+
+        Args:
+            method (str): Agent method issuing the call
+            records (Sequence[Any]): Records in chronological order
+            render (Callable): Builds the task text from a list of records
+
+        Returns:
+            str: Agent's response
+        """
+        if isinstance(records, dict):
+            # A single record passed where a list is expected
+            records = [records]
+        task, kept = self.budget(self.model_route(method)).fit_records(
+            self.system_prompt, records, render, self.budget_policy(method))
+        return self.execute(task, method=method, records={
+            "records_in": len(records), "records_kept": kept})
@@ -0,0 +1,216 @@
+"""
+Deadline-aware fallback responses for short-form agent routes.
+
+A route wrapped by the fallback tier waits for the LLM only up to its own
+deadline. After that, or right away if the provider fails, it answers
+locally: with an earlier LLM result for the same request, with the user's
+last result for the method where a stale answer is acceptable and the
+request names its user, or with a
+template filled in from the request data. A call that timed out keeps
+running in the background and its result is cached for the next request.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.config.ai_config import FALLBACK_CONFIG
+from src.llm import LLMError, current_user, record_cache_hit
+
+CACHED = "cached"
+TEMPLATE = "template"
+
+
+def _completed(value: Any) -> bool:
+    """Whether a habit entry from request data counts as done."""
+    if isinstance(value, dict):
+        return bool(value.get("completed"))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value > 0
+    return bool(value)
+
+
+def _split(data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    done = [str(name) for name, value in data.items() if _completed(value)]
+    open_ = [str(name) for name, value in data.items() if not _completed(value)]
+    return done, open_
+
+
+def motivation_template(daily_data: Dict[str, Any], achievements: List[str]) -> str:
+    done, open_ = _split(daily_data)
+    if done:
+        text = (f"You've completed {len(done)} of {len(daily_data)} habits today "
+                f"({', '.join(done)}). Nice work!")
+    else:
+        text = f"Today is a fresh start: {len(open_)} habits are waiting, and the first one is the hardest."
+    if achievements:
+        text += f" Remember what you've already achieved: {'; '.join(achievements[:3])}."
+    else:
+        text += " Every check-in builds the streak you'll be proud of next week."
+    return text + " Keep going!"
+
+
+def celebration_template(achievement: str, context: Any = None) -> str:
+    return (f"Congratulations on {achievement}! Consistency like this is what turns effort "
+            "into habit. Take a moment to enjoy it, then keep the streak alive tomorrow.")
+
+
+def log_template(data: Dict[str, Any]) -> str:
+    entries = ", ".join(f"{name} ({'done' if _completed(value) else 'not done'})"
+                        for name, value in data.items())
+    return f"Logged {len(data)} entries for today: {entries}."
+
+
+def report_template(data: Dict[str, Any]) -> str:
+    done, open_ = _split(data)
+    lines = [f"Daily report: {len(done)} of {len(data)} habits completed."]
+    if done:
+        lines.append(f"Completed: {', '.join(done)}.")
+    if open_:
+        lines.append(f"Still open: {', '.join(open_)}.")
+    return "\n".join(lines)
+
+
+# Local answers keyed "agenttype.method"; called with the route's inputs
+TEMPLATES: Dict[str, Callable[..., str]] = {
+    "motivator.provide_daily_motivation": motivation_template,
+    "motivator.generate_celebration_message": celebration_template,
+    "tracker.log_daily_data": log_template,
+    "tracker.generate_daily_report": report_template,
+}
+
+
+def fingerprint(inputs: Dict[str, Any]) -> str:
+    """Content hash identifying a request's inputs."""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class FallbackTier:
+    def __init__(self, routes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 templates: Optional[Dict[str, Callable[..., str]]] = None,
+                 cache_size: int = FALLBACK_CONFIG["cache_size"],
+                 workers: int = FALLBACK_CONFIG["workers"],
+                 enabled: bool = FALLBACK_CONFIG["enabled"]):
+        """
+        Initialize a fallback tier.
+
+        Args:
+            routes (Dict, optional): Deadline and "cached" flag per method,
+                defaults to FALLBACK_CONFIG["routes"]
+            templates (Dict, optional): Local answer per method, defaults to TEMPLATES
+            cache_size (int): LLM results kept for fallbacks
+            workers (int): Agent calls running at once
+            enabled (bool): Whether routes fall back at all
+        """
+        self.routes = routes if routes is not None else FALLBACK_CONFIG["routes"]
+        self.templates = templates if templates is not None else TEMPLATES
+        self.cache_size = cache_size
+        self.workers = workers
+        self.enabled = enabled
+        self._cache: "OrderedDict[Tuple[str, ...], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.counters = {"live": 0, CACHED: 0, TEMPLATE: 0, "warmed": 0}
+
+    def _submit(self, generate: Callable[[], str]) -> Future:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix="agent-fallback")
+        # The call is scheduled with the route's priority and user
+        return self._executor.submit(contextvars.copy_context().run, generate)
+
+    def _put(self, keys: List[Tuple[str, ...]], content: str):
+        with self._lock:
+            for key in keys:
+                self._cache[key] = content
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _get(self, key: Tuple[str, ...]) -> Optional[str]:
+        with self._lock:
+            content = self._cache.get(key)
+            if content is not None:
+                self._cache.move_to_end(key)
+            return content
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counters[outcome] += 1
+
+    async def call(self, method: str, generate: Callable[[], str], inputs: Dict[str, Any],
+                   variant: str = "") -> Tuple[str, Optional[str]]:
+        """
+        Run an agent call, answering locally if it misses its deadline.
+
+        Args:
+            method (str): "agenttype.method" of the call
+            generate (Callable): Makes the agent call
+            inputs (Dict[str, Any]): Request data, passed to the template
+            variant (str): Distinguishes results of the method that must not
+                stand in for each other, e.g. the achievement celebrated
+
+        Returns:
+            Tuple[str, Optional[str]]: The response and None, "cached" or
+            "template" for how it was produced
+
+        Raises:
+            Exception: Errors other than LLM failures, e.g. invalid input
+        """
+        route = self.routes.get(method)
+        if not self.enabled or route is None:
+            # Still off the event loop; agent calls block
+            return await asyncio.wrap_future(self._submit(generate)), None
+
+        user = current_user.get()
+        exact = (method, user or "", fingerprint(inputs))
+        # Without a user id, requests cannot be told apart, and the last
+        # result names another caller's habits
+        keys = [exact, (method, user, variant)] if user else [exact]
+        fell_back = threading.Event()
+
+        def store(future: Future):
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._put(keys, future.result())
+            if fell_back.is_set():
+                self._count("warmed")
+
+        future = self._submit(generate)
+        future.add_done_callback(store)
+        try:
+            # shield keeps the call running after the deadline to warm the cache
+            content = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                             route["deadline"])
+            self._count("live")
+            return content, None
+        except (asyncio.TimeoutError, LLMError):
+            fell_back.set()
+
+        content = self._get(exact)
+        if content is None and route.get("cached") and user:
+            content = self._get(keys[1])
+        if content is not None:
+            self._count(CACHED)
+            record_cache_hit(method, "fallback")
+            return content, CACHED
+        self._count(TEMPLATE)
+        return self.templates[method](**inputs), TEMPLATE
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            cached = len(self._cache)
+        served = counters["live"] + counters[CACHED] + counters[TEMPLATE]
+        return {
+            **counters,
+            "cache_entries": cached,
+            "fallback_rate": (counters[CACHED] + counters[TEMPLATE]) / served if served else None,
+        }
@@ -1,11 +1,15 @@
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List
 from .base_agent import BaseAgent
-from crewai import Agent
+from .prompt_encoding import encode_records
+
+if TYPE_CHECKING:
+    from crewai import Agent
 
 
 class MotivatorAgent(BaseAgent):
-    def __init__(self, agent: Agent = None):
+    def __init__(self, agent: "Agent" = None):
         if agent is None:
+            from crewai import Agent
             agent = Agent(
                 name="Motivator",
                 role="Health Motivation Specialist",
@@ -13,7 +17,7 @@ class MotivatorAgent(BaseAgent):
                 backstory="An experienced health coach with expertise in motivating individuals to achieve their health and wellness goals.",
                 verbose=True
             )
-        super().__init__(agent)
+        super().__init__("motivator", agent)
 
     def provide_daily_motivation(self, daily_data: Dict[str, Any], achievements: List[str]) -> str:
         """Provide daily motivation based on progress and achievements."""
@@ -25,7 +29,7 @@ class MotivatorAgent(BaseAgent):
         Recent Achievements: {achievements}
         
         Offer encouragement and celebrate progress."""
-        return self.execute(task)
+        return self.execute(task, method="provide_daily_motivation")
 
     def suggest_challenges(self, weekly_data: List[Dict[str, Any]], goals: Dict[str, Any]) -> str:
         """Suggest new challenges based on progress and goals."""
@@ -34,21 +38,25 @@ class MotivatorAgent(BaseAgent):
         if not goals:
             raise ValueError("Goals cannot be empty")
 
-        task = f"""Suggest new challenges based on this progress and goals:
-        Weekly Data: {weekly_data}
+        return self.execute_records(
+            "suggest_challenges", weekly_data,
+            lambda records: f"""Suggest new challenges based on this progress and goals:
+        Weekly Data:
+        {encode_records(records)}
         Current Goals: {goals}
         
-        Propose engaging challenges that align with current progress."""
-        return self.execute(task)
+        Propose engaging challenges that align with current progress.""")
 
     def generate_celebration_message(self, achievement: str, context: List[Dict[str, Any]]) -> str:
         """Generate a celebration message for a specific achievement."""
         if not achievement:
             raise ValueError("Achievement cannot be empty")
 
-        task = f"""Generate a celebration message for this achievement:
+        return self.execute_records(
+            "generate_celebration_message", context or [],
+            lambda records: f"""Generate a celebration message for this achievement:
         Achievement: {achievement}
-        Context: {context}
+        Context:
+        {encode_records(records)}
         
-        Create an inspiring and personalized celebration message."""
-        return self.execute(task)
+        Create an inspiring and personalized celebration message.""")
@@ -1,11 +1,14 @@
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any
 from .base_agent import BaseAgent
-from crewai import Agent
+
+if TYPE_CHECKING:
+    from crewai import Agent
 
 
 class PlannerAgent(BaseAgent):
-    def __init__(self, agent: Agent = None):
+    def __init__(self, agent: "Agent" = None):
         if agent is None:
+            from crewai import Agent
             agent = Agent(
                 name="Planner",
                 role="Health and Wellness Planner",
@@ -13,7 +16,7 @@ class PlannerAgent(BaseAgent):
                 backstory="An experienced health and wellness planner with expertise in creating balanced, achievable plans.",
                 verbose=True
             )
-        super().__init__(agent)
+        super().__init__("planner", agent)
 
     def create_daily_plan(self, preferences: Dict[str, Any]) -> str:
         """Create a daily plan based on user preferences."""
@@ -22,7 +25,7 @@ class PlannerAgent(BaseAgent):
 
         task = f"""Create a daily plan based on these preferences: {preferences}
         The plan should include specific times and activities for exercise, meditation, nutrition, and sleep."""
-        return self.execute(task)
+        return self.execute(task, method="create_daily_plan")
 
     def adjust_plan(self, performance: Dict[str, Any]) -> str:
         """Adjust the plan based on performance data."""
@@ -31,4 +34,4 @@ class PlannerAgent(BaseAgent):
 
         task = f"""Analyze this performance data and suggest plan adjustments: {performance}
         Consider completion rates and durations to optimize the plan."""
-        return self.execute(task)
+        return self.execute(task, method="adjust_plan")
@@ -0,0 +1,168 @@
+"""
+Speculative prefetch of celebration messages.
+
+When a habit completion pushes a streak across a milestone, the client
+usually asks for a celebration message right away. The prefetcher starts
+generating it in the background as soon as the completion is recorded and
+parks the result for a short time, so the celebration request can return
+the finished (or already running) generation instead of starting a new one.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from src.config.ai_config import PREFETCH_CONFIG
+from src.llm import BATCH, llm_context, record_cache_hit
+
+
+def milestone_achievement(habit_name: str, streak: int) -> str:
+    """Achievement text used for a streak milestone, as clients send it."""
+    return f"{habit_name}: {streak}-day streak"
+
+
+def celebration_key(user_id: Optional[str], achievement: str) -> Tuple[str, str]:
+    return (user_id or "", " ".join(achievement.lower().split()))
+
+
+def _generate_celebration(achievement: str, context: List[Dict[str, Any]]) -> str:
+    from .registry import get_agent
+    return get_agent("motivator").generate_celebration_message(achievement, context)
+
+
+class _Entry:
+    def __init__(self, future: Future, created_at: float):
+        self.future = future
+        self.created_at = created_at
+
+
+class CelebrationPrefetcher:
+    def __init__(self, generate: Callable[[str, List[Dict[str, Any]]], str] = _generate_celebration,
+                 milestones: Sequence[int] = PREFETCH_CONFIG["milestones"],
+                 ttl_seconds: float = PREFETCH_CONFIG["ttl_seconds"],
+                 max_entries: int = PREFETCH_CONFIG["max_entries"],
+                 workers: int = PREFETCH_CONFIG["workers"],
+                 enabled: bool = PREFETCH_CONFIG["enabled"],
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a celebration prefetcher.
+
+        Args:
+            generate (Callable): Produces a celebration from achievement and context
+            milestones (Sequence[int]): Streak lengths that trigger a prefetch
+            ttl_seconds (float): Seconds a result is kept before it counts as wasted
+            max_entries (int): Parked results kept at most; oldest are dropped
+            workers (int): Celebrations generated at once
+            enabled (bool): Whether completions trigger prefetches at all
+            clock (Callable): Monotonic time source
+        """
+        self.generate = generate
+        self.milestones = sorted(milestones)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.workers = workers
+        self.enabled = enabled
+        self._clock = clock
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.counters = {"triggered": 0, "hits": 0, "in_flight_hits": 0,
+                         "misses": 0, "wasted": 0, "failed": 0}
+
+    def crossed_milestone(self, previous_streak: int, streak: int) -> Optional[int]:
+        """Return the highest milestone in (previous_streak, streak], if any."""
+        crossed = [m for m in self.milestones if previous_streak < m <= streak]
+        return crossed[-1] if crossed else None
+
+    def on_habit_completed(self, event: Dict[str, Any]):
+        """Event handler: prefetch a celebration when a milestone is crossed."""
+        habit = event["habit"]
+        # Keyed by the X-User-ID of the completion, which the same client
+        # sends with its celebration request; without it nothing could claim
+        # the result
+        user_id = event.get("user_id")
+        milestone = self.crossed_milestone(event["previous_streak"], habit.streak)
+        if not self.enabled or milestone is None or not user_id:
+            return
+        context = [{
+            "habit": habit.name,
+            "frequency": habit.frequency,
+            "streak": habit.streak,
+            "last_completed": habit.last_completed.isoformat() if habit.last_completed else None,
+        }]
+        self.prefetch(user_id, milestone_achievement(habit.name, habit.streak), context)
+
+    def _run(self, user_id: str, achievement: str, context: List[Dict[str, Any]]) -> str:
+        # Speculative work must never delay requests users are waiting on
+        with llm_context(priority=BATCH, user_id=user_id):
+            return self.generate(achievement, context)
+
+    def _sweep(self):
+        """Drop expired and excess entries, counting them as wasted."""
+        now = self._clock()
+        for key in [k for k, e in self._entries.items() if now - e.created_at > self.ttl_seconds]:
+            del self._entries[key]
+            self.counters["wasted"] += 1
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+            self.counters["wasted"] += 1
+
+    def prefetch(self, user_id: str, achievement: str, context: List[Dict[str, Any]]) -> bool:
+        """
+        Start generating a celebration in the background.
+
+        Returns:
+            bool: False if one is already parked or running for this key
+        """
+        key = celebration_key(user_id, achievement)
+        with self._lock:
+            self._sweep()
+            if key in self._entries:
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="celebration-prefetch")
+            future = self._executor.submit(self._run, user_id, achievement, context)
+            self._entries[key] = _Entry(future, self._clock())
+            self.counters["triggered"] += 1
+        return True
+
+    def take(self, user_id: Optional[str], achievement: str) -> Optional[Future]:
+        """
+        Claim the prefetched celebration for a request.
+
+        Returns:
+            Optional[Future]: The generation, finished or still running, or
+            None on a miss
+        """
+        with self._lock:
+            self._sweep()
+            entry = self._entries.pop(celebration_key(user_id, achievement), None)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            if not entry.future.done():
+                self.counters["in_flight_hits"] += 1
+        record_cache_hit("motivator.generate_celebration_message", "prefetch")
+        return entry.future
+
+    def record_failure(self):
+        """Count a claimed prefetch that failed and had to be regenerated."""
+        with self._lock:
+            self.counters["failed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._sweep()
+            counters = dict(self.counters)
+            parked = len(self._entries)
+        requests = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "parked": parked,
+            "hit_rate": counters["hits"] / requests if requests else None,
+            "waste_rate": counters["wasted"] / counters["triggered"] if counters["triggered"] else None,
+            "milestones": self.milestones,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,50 @@
+"""
+Compact tabular encoding of record lists for prompts.
+
+Python repr repeats every key name on every day. The table encoding
+flattens nested records into dotted column names written once in a header,
+followed by one pipe-separated row per record.
+"""
+
+from typing import Any, Dict, List
+from .analytics import flatten_record
+
+
+def _encode_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (list, tuple)):
+        return ";".join(_encode_value(v) for v in value)
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def encode_records(records: List[Any]) -> str:
+    """
+    Encode a list of records as a header-plus-rows table.
+
+    Args:
+        records (List[Any]): Records, usually nested dicts of daily data.
+            Non-dict items are written one per line.
+
+    Returns:
+        str: e.g. "date|exercise.completed|exercise.duration" followed by
+            rows such as "2024-03-20|yes|30". Missing values are left empty.
+    """
+    if not records:
+        return "(no records)"
+    if not all(isinstance(record, dict) for record in records):
+        return "\n".join(_encode_value(record) for record in records)
+
+    rows = [flatten_record(record) for record in records]
+    columns: Dict[str, None] = {}
+    for row in rows:
+        for name in row:
+            columns.setdefault(name, None)
+
+    lines = ["|".join(columns)]
+    lines.extend("|".join(_encode_value(row.get(name)) for name in columns) for row in rows)
+    return "\n".join(lines)
@@ -0,0 +1,91 @@
+"""
+Lazily constructed, process-wide agent instances.
+
+Building an agent imports crewai (and through it litellm), which dominates
+startup time. Agents are therefore created on first use instead of at
+import time, so processes that never serve an agent route never pay for it.
+"""
+
+import threading
+from typing import Callable, Dict, Generic, Optional, TypeVar
+from src.observability import register_footprint
+from .base_agent import BaseAgent
+from .planner_agent import PlannerAgent
+from .tracker_agent import TrackerAgent
+from .analyzer_agent import AnalyzerAgent
+from .motivator_agent import MotivatorAgent
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    def __init__(self, factory: Callable[[], T]):
+        """
+        Initialize a thread-safe lazily built value.
+
+        Args:
+            factory (Callable): Builds the value on first access
+        """
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        # Double-checked locking: the lock is only taken until the value exists
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    @property
+    def built(self) -> bool:
+        return self._value is not None
+
+    def reset(self):
+        """Drop the value so the next access builds a new one."""
+        with self._lock:
+            self._value = None
+
+
+_agents: Dict[str, Lazy[BaseAgent]] = {
+    "planner": Lazy(PlannerAgent),
+    "tracker": Lazy(TrackerAgent),
+    "analyzer": Lazy(AnalyzerAgent),
+    "motivator": Lazy(MotivatorAgent),
+}
+
+
+def get_agent(agent_type: str) -> BaseAgent:
+    """
+    Return the shared agent of the given type, building it on first use.
+
+    Args:
+        agent_type (str): planner, tracker, analyzer or motivator
+
+    Returns:
+        BaseAgent: The process-wide agent instance
+
+    Raises:
+        KeyError: If the agent type is unknown
+    """
+    return _agents[agent_type]()
+
+
+def build_agents() -> Dict[str, BaseAgent]:
+    """Build every shared agent, e.g. while a worker warms up."""
+    return {name: lazy() for name, lazy in _agents.items()}
+
+
+def built_agents() -> Dict[str, BaseAgent]:
+    """Return the agents that have been built so far."""
+    return {name: lazy() for name, lazy in _agents.items() if lazy.built}
+
+
+register_footprint("agents", lambda: built_agents() or None)
+
+
+def reset_agents():
+    """Drop all shared agents, e.g. between tests."""
+    for lazy in _agents.values():
+        lazy.reset()
@@ -0,0 +1,153 @@
+"""
+Hierarchical map-reduce summarization of long record histories.
+
+Records are split into calendar weeks, each week is summarized on its own
+(concurrently, and memoized by content), and the final analysis runs over
+the weekly summaries instead of the raw history. Appending a day only
+changes the hash of its own week, so only that chunk is summarized again.
+"""
+
+import contextvars
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.config.ai_config import MAP_REDUCE_CONFIG
+from src.llm import record_cache_hit
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAP_REDUCE_CONFIG["max_workers"],
+                    thread_name_prefix="summary-chunk"
+                )
+    return _executor
+
+
+def _record_date(record: Dict[str, Any]) -> Optional[date]:
+    value = record.get("date") if isinstance(record, dict) else None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            return None
+    return None
+
+
+def chunk_by_week(records: List[Dict[str, Any]]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Split records into calendar weeks.
+
+    Records carrying a "date" are grouped by ISO week; records without one
+    are grouped into consecutive runs of seven.
+
+    Args:
+        records (List[Dict[str, Any]]): Records in chronological order
+
+    Returns:
+        List[Tuple[str, List[Dict[str, Any]]]]: (week label, records) pairs
+            in chronological order
+    """
+    chunks: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    undated = 0
+    for record in records:
+        day = _record_date(record)
+        if day is None:
+            label = f"days {undated // 7 * 7 + 1}-{undated // 7 * 7 + 7}"
+            undated += 1
+        else:
+            year, week, _ = day.isocalendar()
+            label = f"{year}-W{week:02d}"
+        chunks.setdefault(label, []).append(record)
+    return list(chunks.items())
+
+
+def chunk_key(label: str, records: List[Dict[str, Any]]) -> str:
+    """Content hash identifying a chunk and its records."""
+    payload = json.dumps([label, records], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ChunkSummaryCache:
+    def __init__(self, max_size: int = MAP_REDUCE_CONFIG["cache_size"],
+                 method: str = "analyzer.summarize_week"):
+        """
+        Initialize a thread-safe LRU cache of chunk summaries.
+
+        Args:
+            max_size (int): Maximum number of summaries kept
+            method (str): "agenttype.method" producing the summaries, counted
+                in the LLM cache hit metrics
+        """
+        self.max_size = max_size
+        self.method = method
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        record_cache_hit(self.method, "summary")
+        return summary
+
+    def put(self, key: str, summary: str):
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def summarize_chunks(chunks: List[Tuple[str, List[Dict[str, Any]]]],
+                     summarize: Callable[[str, List[Dict[str, Any]]], str],
+                     cache: ChunkSummaryCache) -> List[Tuple[str, str]]:
+    """
+    Summarize chunks concurrently, reusing memoized summaries.
+
+    Args:
+        chunks (List[Tuple[str, List]]): (label, records) pairs
+        summarize (Callable): Produces the summary of one chunk
+        cache (ChunkSummaryCache): Memoized summaries keyed by chunk content
+
+    Returns:
+        List[Tuple[str, str]]: (label, summary) pairs in chunk order
+    """
+    keys = [chunk_key(label, records) for label, records in chunks]
+    summaries: List[Optional[str]] = [cache.get(key) for key in keys]
+
+    executor = _get_executor()
+    futures = {
+        # Each chunk inherits the caller's context, e.g. its LLM priority
+        index: executor.submit(contextvars.copy_context().run, summarize, label, records)
+        for index, (label, records) in enumerate(chunks)
+        if summaries[index] is None
+    }
+    for index, future in futures.items():
+        summaries[index] = future.result()
+        cache.put(keys[index], summaries[index])
+
+    return [(label, summary) for (label, _), summary in zip(chunks, summaries)]
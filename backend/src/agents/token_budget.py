@@ -0,0 +1,151 @@
+"""
+Local token estimation and prompt budget planning.
+
+The estimator is a fast approximation of a BPE tokenizer: it never loads a
+vocabulary and is tuned to slightly overestimate, so a prompt that fits
+the estimate also fits the model's context window.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+TRIM_OLDEST = "trim_oldest"
+COMPACT = "compact"
+REJECT = "reject"
+POLICIES = (TRIM_OLDEST, COMPACT, REJECT)
+
+# Letter runs, digit runs and single symbols roughly match BPE boundaries
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+class TokenBudgetExceeded(ValueError):
+    """Raised when a prompt cannot be made to fit the context window."""
+
+    def __init__(self, message: str, prompt_tokens: int, budget: int):
+        super().__init__(message)
+        self.prompt_tokens = prompt_tokens
+        self.budget = budget
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece[0].isdigit():
+            # Numbers are split into groups of up to three digits
+            tokens += (len(piece) + 2) // 3
+        elif piece[0].isalpha():
+            # Common words are one token, long words split every ~6 letters
+            tokens += 1 + (len(piece) - 1) // 6
+        else:
+            tokens += 1
+    return tokens
+
+
+class TokenBudget:
+    def __init__(self, context_window: int, reserved_output_tokens: int, overhead_tokens: int = 0):
+        """
+        Initialize a prompt budget.
+
+        Args:
+            context_window (int): Model context window in tokens
+            reserved_output_tokens (int): Tokens kept free for the completion
+            overhead_tokens (int): Tokens added around the prompt by the caller
+                (chat template, framework scaffolding, safety margin)
+        """
+        self.context_window = context_window
+        self.reserved_output_tokens = reserved_output_tokens
+        self.overhead_tokens = overhead_tokens
+
+    @property
+    def prompt_budget(self) -> int:
+        """Tokens available for the system prompt and the task."""
+        return self.context_window - self.reserved_output_tokens - self.overhead_tokens
+
+    def measure(self, system_prompt: str, task: str) -> Dict[str, int]:
+        """Measure the system prompt and task against the budget."""
+        system_tokens = estimate_tokens(system_prompt)
+        task_tokens = estimate_tokens(task)
+        return {
+            "system_tokens": system_tokens,
+            "task_tokens": task_tokens,
+            "prompt_tokens": system_tokens + task_tokens + self.overhead_tokens,
+            "budget": self.prompt_budget,
+        }
+
+    def fits(self, system_prompt: str, task: str) -> bool:
+        usage = self.measure(system_prompt, task)
+        return usage["system_tokens"] + usage["task_tokens"] <= self.prompt_budget
+
+    def fit_records(self, system_prompt: str, records: Sequence[Any],
+                    render: Callable[[List[Any]], str], policy: str) -> Tuple[str, int]:
+        """
+        Render a task from records, reducing the records until it fits.
+
+        Args:
+            system_prompt (str): System prompt sent with the task
+            records (Sequence[Any]): Records in chronological order
+            render (Callable): Builds the task text from a list of records
+            policy (str): trim_oldest drops the oldest records, compact keeps an
+                evenly spaced sample across the whole window, reject refuses
+                oversized inputs
+
+        Returns:
+            Tuple[str, int]: The task text and the number of records it contains
+
+        Raises:
+            TokenBudgetExceeded: If no reduction allowed by the policy fits
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown token budget policy '{policy}'")
+
+        records = list(records)
+        task = render(records)
+        if self.fits(system_prompt, task) or not records:
+            return task, len(records)
+        if policy == REJECT:
+            self.ensure_fits(system_prompt, task)
+
+        select = _select_recent if policy == TRIM_OLDEST else _select_spread
+        # Largest record count that fits, found by binary search
+        low, high, best = 1, len(records) - 1, None
+        while low <= high:
+            count = (low + high) // 2
+            candidate = render(select(records, count))
+            if self.fits(system_prompt, candidate):
+                best = (candidate, count)
+                low = count + 1
+            else:
+                high = count - 1
+        if best is None:
+            self.ensure_fits(system_prompt, render(select(records, 1)))
+        return best
+
+    def ensure_fits(self, system_prompt: str, task: str):
+        """Raise TokenBudgetExceeded if the prompt does not fit."""
+        usage = self.measure(system_prompt, task)
+        used = usage["system_tokens"] + usage["task_tokens"]
+        if used <= self.prompt_budget:
+            return
+        raise TokenBudgetExceeded(
+            f"Prompt needs ~{used} tokens but only {self.prompt_budget} are available",
+            used, self.prompt_budget)
+
+
+def _select_recent(records: List[Any], count: int) -> List[Any]:
+    return records[-count:]
+
+
+def _select_spread(records: List[Any], count: int) -> List[Any]:
+    if count == 1:
+        return records[-1:]
+    last = len(records) - 1
+    return [records[round(i * last / (count - 1))] for i in range(count)]
@@ -1,11 +1,15 @@
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List
 from .base_agent import BaseAgent
-from crewai import Agent
+from .analytics import summarize_records
+
+if TYPE_CHECKING:
+    from crewai import Agent
 
 
 class TrackerAgent(BaseAgent):
-    def __init__(self, agent: Agent = None):
+    def __init__(self, agent: "Agent" = None):
         if agent is None:
+            from crewai import Agent
             agent = Agent(
                 name="Tracker",
                 role="Health Habit Tracker",
@@ -13,7 +17,7 @@ class TrackerAgent(BaseAgent):
                 backstory="An experienced health habit tracker with expertise in monitoring and analyzing health-related activities.",
                 verbose=True
             )
-        super().__init__(agent)
+        super().__init__("tracker", agent)
 
     def log_daily_data(self, data: Dict[str, Any]) -> str:
         """Log daily health and wellness data."""
@@ -22,7 +26,7 @@ class TrackerAgent(BaseAgent):
 
         task = f"""Log and analyze this daily health data: {data}
         Provide a summary of the logged activities and their completion status."""
-        return self.execute(task)
+        return self.execute(task, method="log_daily_data")
 
     def generate_daily_report(self, data: Dict[str, Any]) -> str:
         """Generate a daily report based on logged data."""
@@ -31,13 +35,15 @@ class TrackerAgent(BaseAgent):
 
         task = f"""Generate a detailed daily report for this data: {data}
         Include insights about exercise, meditation, nutrition, and sleep patterns."""
-        return self.execute(task)
+        return self.execute(task, method="generate_daily_report")
 
     def check_consistency(self, weekly_data: List[Dict[str, Any]]) -> str:
         """Check consistency of weekly health data."""
         if not weekly_data:
             raise ValueError("Weekly data cannot be empty")
 
-        task = f"""Analyze the consistency of this weekly health data: {weekly_data}
+        task = f"""Analyze the consistency of this weekly health data ({len(weekly_data)} days).
+        Statistics per metric:
+        {summarize_records(weekly_data)}
         Identify patterns, trends, and areas for improvement."""
-        return self.execute(task)
+        return self.execute(task, method="check_consistency")
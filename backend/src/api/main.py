@@ -1,8 +1,44 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routes import habits, agents
+from fastapi.responses import PlainTextResponse
+from src.routes import habits, agents, jobs, admin, health
+from src.agents import build_agents
+from src.batch import get_artifact_store
+from src.jobs import get_job_runner
+from src.llm import close_llm_client, get_llm_client
+from src.config.ai_config import LOOP_MONITOR_CONFIG, SERVER_CONFIG
+from src.observability import (
+    RequestMetricsMiddleware, TracingMiddleware, get_loop_monitor, registry
+)
+from src.server.warmup import Warmup
+
+# Cold-start work done before GET /ready reports the worker ready
+WARMUP_STEPS = {
+    "habit_store": habits.habit_controller.habit_service.refresh,
+    "artifact_store": get_artifact_store,
+    "agents": build_agents,
+    "llm_connection": lambda: get_llm_client().connect(),
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    runner = get_job_runner()
+    runner.start()
+    if LOOP_MONITOR_CONFIG["enabled"]:
+        get_loop_monitor().start()
+    app.state.warmup = Warmup(WARMUP_STEPS if SERVER_CONFIG["warmup"] else {})
+    app.state.warmup.start()
+    yield
+    app.state.warmup.stop()
+    get_loop_monitor().stop()
+    runner.stop(timeout=5)
+    # Release pooled LLM connections on shutdown
+    close_llm_client()
 
-app = FastAPI(title="HealthHabit API")
+
+app = FastAPI(title="HealthHabit API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -12,12 +48,24 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
+# Outermost, so it measures the whole request
+app.add_middleware(RequestMetricsMiddleware)
 
 # Include routers
 app.include_router(habits.router, prefix="/api/habits", tags=["habits"])
 app.include_router(agents.router, prefix="/api/agents", tags=["agents"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(health.router, tags=["health"])
 
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to HealthHabit API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Metrics of this process in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
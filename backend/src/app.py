@@ -1,11 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routes import habits
+from fastapi.responses import PlainTextResponse
+from src.config.ai_config import LOOP_MONITOR_CONFIG, SERVER_CONFIG
+from src.observability import (
+    RequestMetricsMiddleware, TracingMiddleware, get_loop_monitor, registry
+)
+from src.routes import admin, habits, health
+from src.server.warmup import Warmup
+
+# Cold-start work done before GET /ready reports the worker ready
+WARMUP_STEPS = {
+    "habit_store": habits.habit_controller.habit_service.refresh,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if LOOP_MONITOR_CONFIG["enabled"]:
+        get_loop_monitor().start()
+    app.state.warmup = Warmup(WARMUP_STEPS if SERVER_CONFIG["warmup"] else {})
+    app.state.warmup.start()
+    yield
+    app.state.warmup.stop()
+    get_loop_monitor().stop()
+
 
 app = FastAPI(
     title="HealthHabit API",
     description="AI-powered health habit tracking system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -16,11 +41,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
+# Outermost, so it measures the whole request
+app.add_middleware(RequestMetricsMiddleware)
 
 # Include routers
 app.include_router(habits.router, prefix="/api/habits", tags=["habits"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(health.router, tags=["health"])
 
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to HealthHabit API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Metrics of this process in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
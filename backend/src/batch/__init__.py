@@ -0,0 +1,12 @@
+from .artifacts import ArtifactStore, get_artifact_store
+from .precompute import ARTIFACTS, Artifact, PrecomputeRunner, habits_fingerprint, precompute_all
+
+__all__ = [
+    'ARTIFACTS',
+    'Artifact',
+    'ArtifactStore',
+    'PrecomputeRunner',
+    'get_artifact_store',
+    'habits_fingerprint',
+    'precompute_all'
+]
@@ -0,0 +1,21 @@
+"""
+Precompute agent outputs for all users, e.g. from a nightly cron job.
+
+Usage:
+    python -m src.batch [--date 2024-01-02] [--artifact daily-motivation] [--force]
+"""
+
+import argparse
+import json
+import logging
+from .precompute import ARTIFACTS, precompute_all
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--date", default=None, help="ISO date to generate for (default: today)")
+    parser.add_argument("--artifact", action="append", choices=sorted(ARTIFACTS),
+                        help="artifact to generate; repeat for several (default: all)")
+    parser.add_argument("--force", action="store_true", help="regenerate stored artifacts")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(precompute_all(args.date, args.artifact, args.force), indent=2))
@@ -0,0 +1,116 @@
+"""
+Storage of precomputed agent outputs.
+
+Artifacts are keyed by (user, artifact, day), where day is the date the
+output is meant for: the calendar day for daily artifacts and the Monday of
+the week for weekly ones. Each also records a fingerprint of the user's
+habits at generation time, so it is not served once they have changed.
+"""
+
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+from src.config.ai_config import PRECOMPUTE_CONFIG
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    user_id TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    day TEXT NOT NULL,
+    content TEXT NOT NULL,
+    inputs TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, artifact, day)
+);
+"""
+
+
+class ArtifactStore:
+    def __init__(self, path: str, max_age_hours: float = 24.0):
+        """
+        Initialize the artifact store.
+
+        Args:
+            path (str): SQLite database file, created if missing
+            max_age_hours (float): Age after which an artifact is no longer fresh
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = timedelta(hours=max_age_hours)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(artifacts)")}
+            if "inputs" not in columns:
+                # Stores created before fingerprints; their rows never match
+                self._conn.execute("ALTER TABLE artifacts ADD COLUMN inputs TEXT")
+
+    def put(self, user_id: str, artifact: str, day: date, content: str,
+            inputs: Optional[str] = None):
+        """
+        Store an artifact.
+
+        Args:
+            user_id (str): User the artifact is for
+            artifact (str): Artifact name
+            day (date): Date the artifact is for
+            content (str): Generated output
+            inputs (str, optional): Fingerprint of the habits it was generated from
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts "
+                "(user_id, artifact, day, content, inputs, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, artifact, day.isoformat(), content, inputs, datetime.utcnow().isoformat()))
+
+    def get(self, user_id: str, artifact: str, day: date) -> Optional[Dict[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, inputs, created_at FROM artifacts "
+                "WHERE user_id = ? AND artifact = ? AND day = ?",
+                (user_id, artifact, day.isoformat())).fetchone()
+        return {"content": row[0], "inputs": row[1], "created_at": row[2]} if row else None
+
+    def get_fresh(self, user_id: str, artifact: str, day: date,
+                  inputs: Optional[str] = None) -> Optional[str]:
+        """
+        Return the stored content if it exists and is within max_age.
+
+        With inputs given, the artifact must also have been generated from
+        habits with that fingerprint.
+        """
+        stored = self.get(user_id, artifact, day)
+        if stored is None:
+            return None
+        if inputs is not None and stored["inputs"] != inputs:
+            return None
+        if datetime.utcnow() - datetime.fromisoformat(stored["created_at"]) > self.max_age:
+            return None
+        return stored["content"]
+
+    def has(self, user_id: str, artifact: str, day: date, inputs: Optional[str] = None) -> bool:
+        return self.get_fresh(user_id, artifact, day, inputs) is not None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide artifact store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore(PRECOMPUTE_CONFIG["db_path"],
+                                       PRECOMPUTE_CONFIG["max_age_hours"])
+    return _store
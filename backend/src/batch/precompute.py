@@ -0,0 +1,203 @@
+"""
+Off-peak precomputation of predictable agent outputs.
+
+Daily motivation, daily reports and weekly analyses depend only on data
+that is already known the night before. This runner generates them for
+every user in the habit store, a few users at a time, as batch LLM work.
+Agent routes then serve the stored output instead of calling the model.
+
+Usage:
+    python -m src.batch [--date 2024-01-02] [--artifact daily-motivation] [--force]
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from src.agents import get_agent
+from src.agents.fallback import fingerprint
+from src.config.ai_config import PRECOMPUTE_CONFIG
+from src.llm import BATCH, llm_context
+from src.models.habit import Habit
+from src.services.habit_service import HabitService
+from .artifacts import ArtifactStore, get_artifact_store
+
+logger = logging.getLogger(__name__)
+
+DAILY = "daily"
+WEEKLY = "weekly"
+
+
+class Artifact:
+    def __init__(self, name: str, generate: Callable[[Dict[str, Any]], str], period: str = DAILY,
+                 method: Optional[str] = None):
+        """
+        Initialize a precomputable artifact.
+
+        Args:
+            name (str): Artifact name used as part of the storage key
+            generate (Callable): Produces the output from a user's inputs
+            period (str): "daily" or "weekly"
+            method (str, optional): "agenttype.method" the artifact stands in
+                for, counted in the LLM cache hit metrics
+        """
+        self.name = name
+        self.generate = generate
+        self.period = period
+        self.method = method
+
+    def day(self, day: date) -> date:
+        """Storage date of the artifact covering day."""
+        return day - timedelta(days=day.weekday()) if self.period == WEEKLY else day
+
+
+ARTIFACTS: Dict[str, Artifact] = {
+    artifact.name: artifact for artifact in (
+        Artifact("daily-motivation", lambda inputs: get_agent("motivator").provide_daily_motivation(
+            inputs["daily_data"], inputs["achievements"]),
+            method="motivator.provide_daily_motivation"),
+        Artifact("daily-report", lambda inputs: get_agent("tracker").generate_daily_report(
+            inputs["daily_data"]), method="tracker.generate_daily_report"),
+        Artifact("weekly-analysis", lambda inputs: get_agent("analyzer").analyze_weekly_progress(
+            inputs["weekly_data"]), period=WEEKLY, method="analyzer.analyze_weekly_progress"),
+    )
+}
+
+
+def group_by_user(habits: Iterable[Habit]) -> Dict[str, List[Habit]]:
+    users: Dict[str, List[Habit]] = {}
+    for habit in habits:
+        if habit.is_active:
+            users.setdefault(str(habit.user_id), []).append(habit)
+    return users
+
+
+def habits_fingerprint(habits: Iterable[Habit]) -> str:
+    """
+    Fingerprint of the habits a user tracks.
+
+    Completions are left out: outputs are made from the data up to the day
+    before, so they stay valid while the user completes habits during the
+    day. Adding, removing or changing an active habit invalidates them.
+    """
+    return fingerprint({"habits": sorted(
+        [str(habit.id), habit.name, habit.frequency, habit.target_value, habit.unit]
+        for habit in habits if habit.is_active)})
+
+
+def user_inputs(habits: List[Habit], day: date) -> Dict[str, Any]:
+    """
+    Build the agent inputs for one user from their habits.
+
+    Args:
+        habits (List[Habit]): The user's active habits
+        day (date): Day the outputs are for; data up to the day before is used
+
+    Returns:
+        Dict[str, Any]: daily_data, achievements and weekly_data
+    """
+    yesterday = day - timedelta(days=1)
+    daily_data = {}
+    weekly_data = []
+    for habit in habits:
+        completed = habit.last_completed is not None and habit.last_completed.date() >= yesterday
+        daily_data[habit.name] = {
+            "completed": completed,
+            "streak": habit.streak,
+            "frequency": habit.frequency,
+        }
+        if habit.target_value is not None:
+            daily_data[habit.name]["target"] = f"{habit.target_value:g} {habit.unit or ''}".strip()
+        weekly_data.append({
+            "habit": habit.name,
+            "frequency": habit.frequency,
+            "streak": habit.streak,
+            "last_completed": habit.last_completed.date().isoformat() if habit.last_completed else None,
+        })
+    achievements = [f"{habit.name}: {habit.streak}-day streak" for habit in habits if habit.streak >= 3]
+    return {"daily_data": daily_data, "achievements": achievements, "weekly_data": weekly_data}
+
+
+class PrecomputeRunner:
+    def __init__(self, habit_service: HabitService, store: ArtifactStore,
+                 artifacts: Optional[Dict[str, Artifact]] = None, parallelism: int = 4):
+        """
+        Initialize a precompute runner.
+
+        Args:
+            habit_service (HabitService): Source of users and their habits
+            store (ArtifactStore): Where outputs are stored
+            artifacts (Dict[str, Artifact], optional): Artifacts to generate, defaults to ARTIFACTS
+            parallelism (int): Users processed at once
+        """
+        self.habit_service = habit_service
+        self.store = store
+        self.artifacts = artifacts if artifacts is not None else ARTIFACTS
+        self.parallelism = parallelism
+
+    def _run_user(self, user_id: str, habits: List[Habit], day: date,
+                  artifacts: List[Artifact], force: bool) -> Dict[str, int]:
+        counts = {"generated": 0, "skipped": 0, "failed": 0}
+        inputs = user_inputs(habits, day)
+        key_inputs = habits_fingerprint(habits)
+        # Batch priority: the scheduler serves interactive requests first
+        with llm_context(priority=BATCH, user_id=user_id):
+            for artifact in artifacts:
+                key_day = artifact.day(day)
+                if not force and self.store.has(user_id, artifact.name, key_day, key_inputs):
+                    counts["skipped"] += 1
+                    continue
+                try:
+                    content = artifact.generate(inputs)
+                except Exception:
+                    logger.exception("Precomputing %s for user %s failed", artifact.name, user_id)
+                    counts["failed"] += 1
+                    continue
+                self.store.put(user_id, artifact.name, key_day, str(content), key_inputs)
+                counts["generated"] += 1
+        return counts
+
+    def run(self, day: Optional[date] = None, users: Optional[Iterable[str]] = None,
+            artifacts: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Generate artifacts for all (or the given) users.
+
+        Artifacts already stored and fresh are skipped unless force is set,
+        so an interrupted run can simply be started again.
+
+        Args:
+            day (date, optional): Day to generate for, defaults to today
+            users (Iterable[str], optional): Restrict to these user ids
+            artifacts (Iterable[str], optional): Restrict to these artifact names
+            force (bool): Regenerate artifacts that are already stored
+
+        Returns:
+            Dict[str, Any]: Counts of users and generated, skipped and failed artifacts
+        """
+        day = day or date.today()
+        selected = [self.artifacts[name] for name in (artifacts or self.artifacts)]
+        by_user = group_by_user(asyncio.run(self.habit_service.get_all_habits()))
+        if users is not None:
+            wanted = set(users)
+            by_user = {user: habits for user, habits in by_user.items() if user in wanted}
+
+        report = {"day": day.isoformat(), "users": len(by_user),
+                  "generated": 0, "skipped": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=self.parallelism,
+                                thread_name_prefix="precompute") as executor:
+            futures = [executor.submit(self._run_user, user, habits, day, selected, force)
+                       for user, habits in by_user.items()]
+            for future in futures:
+                for key, count in future.result().items():
+                    report[key] += count
+        return report
+
+
+def precompute_all(day: Optional[str] = None, artifacts: Optional[List[str]] = None,
+                   force: bool = False) -> Dict[str, Any]:
+    """Run the precomputation over the process-wide habit and artifact stores."""
+    runner = PrecomputeRunner(HabitService(), get_artifact_store(),
+                              parallelism=PRECOMPUTE_CONFIG["parallelism"])
+    return runner.run(date.fromisoformat(day) if day else None, artifacts=artifacts, force=force)
+
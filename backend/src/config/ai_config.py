@@ -9,24 +9,54 @@ load_dotenv()
 
 # TogetherAI Configuration
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
+# Any OpenAI-compatible endpoint can stand in for TogetherAI
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.together.xyz/v1")
 MODEL_NAME = os.getenv(
     "MODEL_NAME", "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
+# Smaller, faster model for short-form output and latency fallbacks
+SMALL_MODEL_NAME = os.getenv(
+    "SMALL_MODEL_NAME", "meta-llama/Llama-3.2-3B-Instruct-Turbo")
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "4096"))
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
 
 # Model Configuration
 MODEL_CONFIG = {
     "model": MODEL_NAME,
+    "api_key": TOGETHER_API_KEY,
     "max_tokens": MAX_TOKENS,
     "temperature": TEMPERATURE,
     "top_p": 0.95,
     "top_k": 40,
     "repetition_penalty": 1.1,
     "stop": ["</s>", "Human:", "Assistant:", "User:", "System:"],
-    "context_window": 8192,
+    "context_window": int(os.getenv("CONTEXT_WINDOW", "8192")),
     "stream": False,
 }
 
+# Token Budget Configuration
+# Each call's prompt budget is the context window of its route's model
+# (MODEL_ROUTES_CONFIG["context_windows"]) less the route's max_tokens
+TOKEN_BUDGET_CONFIG = {
+    # Prompt scaffolding added around the task plus a safety margin
+    "overhead_tokens": 400,
+    # How oversized record lists are reduced: trim_oldest, compact or reject
+    "default_policy": "trim_oldest",
+    "policies": {
+        "analyzer.identify_behavior_patterns": "compact",
+        "analyzer.generate_insights_report": "compact",
+    },
+}
+
+# Map-Reduce Summarization Configuration
+MAP_REDUCE_CONFIG = {
+    # Histories longer than this are summarized week by week first
+    "min_records": int(os.getenv("MAP_REDUCE_MIN_RECORDS", "14")),
+    # Weekly chunks summarized at once
+    "max_workers": int(os.getenv("MAP_REDUCE_MAX_WORKERS", "8")),
+    # Memoized chunk summaries kept per agent
+    "cache_size": 512,
+}
+
 # System Prompts
 SYSTEM_PROMPTS = {
     "planner": """You are a health and fitness planning expert. Your role is to help users create and adapt personalized health plans.
@@ -45,3 +75,245 @@ SYSTEM_PROMPTS = {
     Help users stay motivated and engaged with their health goals.
     Use positive reinforcement and celebrate small victories."""
 }
+
+# Agent Execution Configuration
+AGENT_EXECUTION_CONFIG = {
+    # "crew" runs each call as a CrewAI task, "direct" sends one chat completion
+    "default_mode": os.getenv("AGENT_EXECUTION_MODE", "crew"),
+    # Per-method overrides, e.g. {"analyzer.generate_insights_report": "crew"}
+    "methods": {},
+}
+
+# Model Routing Configuration
+MODEL_ROUTES_CONFIG = {
+    # Applied to every agent call unless a method overrides a field
+    "default": {
+        "model": MODEL_NAME,
+        "max_tokens": MAX_TOKENS,
+        "temperature": TEMPERATURE,
+        # Seconds of primary-model p95 latency after which calls move to
+        # fallback_model; None keeps the primary model regardless
+        "latency_budget": None,
+        "fallback_model": SMALL_MODEL_NAME,
+    },
+    # Per-method overrides, keyed "agenttype.method"; long analyses keep
+    # the large model and the full completion budget
+    "methods": {
+        "motivator.generate_celebration_message": {
+            "model": SMALL_MODEL_NAME, "max_tokens": 256, "temperature": 0.8},
+        "motivator.provide_daily_motivation": {
+            "max_tokens": 512, "temperature": 0.8, "latency_budget": 8.0},
+        "motivator.suggest_challenges": {"max_tokens": 1024},
+        "tracker.log_daily_data": {"model": SMALL_MODEL_NAME, "max_tokens": 512, "temperature": 0.3},
+        "tracker.generate_daily_report": {"max_tokens": 1024, "latency_budget": 10.0},
+        "tracker.check_consistency": {"max_tokens": 1024, "temperature": 0.4},
+        "analyzer.summarize_week": {"model": SMALL_MODEL_NAME, "max_tokens": 256, "temperature": 0.3},
+        "planner.create_daily_plan": {"max_tokens": 1536},
+        "planner.adjust_plan": {"max_tokens": 1536},
+    },
+    # Context window per model, which sizes the prompt budget of calls routed
+    # to it; models not listed use MODEL_CONFIG["context_window"]
+    "context_windows": {
+        MODEL_NAME: MODEL_CONFIG["context_window"],
+        SMALL_MODEL_NAME: int(os.getenv("SMALL_MODEL_CONTEXT_WINDOW", "8192")),
+    },
+    "latency_routing": {
+        "enabled": os.getenv("LLM_LATENCY_ROUTING", "false").lower() == "true",
+        "quantile": 0.95,
+        "min_samples": 20,
+        # Share of calls still sent to the primary model while rerouted, so
+        # its latency keeps being measured and routing can switch back
+        "probe_rate": 0.1,
+    },
+}
+
+# LLM Client Configuration
+LLM_CLIENT_CONFIG = {
+    "base_url": LLM_BASE_URL,
+    # Connection pool shared by every agent in the process
+    "max_connections": int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+    "max_keepalive_connections": int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10")),
+    "keepalive_expiry": float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60")),
+    "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+    "read_timeout": float(os.getenv("LLM_REQUEST_TIMEOUT", "60")),
+    # Needs the h2 package, which is not a requirement: pip install "httpx[http2]"
+    "http2": os.getenv("LLM_HTTP2", "false").lower() == "true",
+    # Streamed responses report time to first token for direct calls
+    "stream": os.getenv("LLM_STREAM", "false").lower() == "true",
+}
+
+# Resilience Configuration
+RESILIENCE_CONFIG = {
+    # Applied to every agent call unless a method overrides a field
+    "default": {
+        # Seconds from the start of a call until it fails, retries included
+        "deadline": float(os.getenv("LLM_DEADLINE", "45")),
+        "max_retries": int(os.getenv("LLM_MAX_RETRIES", "2")),
+        # Full-jitter exponential backoff: uniform(0, min(max, base * 2^attempt))
+        "backoff_base": 0.5,
+        "backoff_max": 8.0,
+        # Send a duplicate request once the first is slower than this quantile
+        # of recent latencies, and keep whichever answers first; direct mode only
+        "hedge": False,
+        "hedge_quantile": 0.95,
+        "hedge_min_samples": 20,
+    },
+    # Per-method overrides, keyed "agenttype.method"
+    "methods": {
+        "motivator.provide_daily_motivation": {"deadline": 20.0, "hedge": True},
+        "motivator.generate_celebration_message": {"deadline": 20.0, "hedge": True},
+        "analyzer.identify_behavior_patterns": {"deadline": 90.0},
+        "analyzer.generate_insights_report": {"deadline": 90.0},
+    },
+    # Shared by all agents, since they all call the same provider
+    "circuit_breaker": {
+        "failure_threshold": int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        "reset_timeout": float(os.getenv("LLM_BREAKER_RESET", "30")),
+    },
+    # Threads running LLM attempts, including hedged duplicates
+    "max_workers": int(os.getenv("LLM_MAX_WORKERS", "32")),
+}
+
+# Admission Scheduler Configuration
+SCHEDULER_CONFIG = {
+    # Provider limits enforced before requests are sent; 0 disables a limit
+    "requests_per_minute": int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+    "tokens_per_minute": int(os.getenv("LLM_TOKENS_PER_MINUTE", "60000")),
+    # Completion tokens reserved per request on top of the prompt
+    "expected_completion_tokens": 512,
+    # Adaptive concurrency: additive increase, multiplicative decrease on
+    # 429/503 or when latency exceeds latency_tolerance x its baseline
+    "min_concurrency": 1,
+    "initial_concurrency": int(os.getenv("LLM_INITIAL_CONCURRENCY", "4")),
+    "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+    "latency_tolerance": 2.0,
+    "backoff_factor": 0.5,
+}
+
+# Habit Storage Configuration
+STORAGE_CONFIG = {
+    # JSON file holding every habit, rewritten on each change
+    "habits_file": os.getenv("HABITS_DATA_FILE", "data/habits.json"),
+    # Several processes (e.g. uvicorn workers) share the file: writes take a
+    # file lock and reads reload the file once another process changed it
+    "shared": os.getenv("HABITS_SHARED", "true").lower() == "true",
+}
+
+# Background Job Configuration
+JOBS_CONFIG = {
+    # SQLite file holding queued, running and finished jobs
+    "db_path": os.getenv("JOBS_DB_PATH", "data/jobs.db"),
+    # Jobs worked on at once per process
+    "workers": int(os.getenv("JOB_WORKERS", "2")),
+    # Longest a client may long-poll for a job result, in seconds
+    "max_wait": 60.0,
+}
+
+# Batch Precomputation Configuration
+PRECOMPUTE_CONFIG = {
+    # SQLite file holding precomputed agent outputs
+    "db_path": os.getenv("PRECOMPUTE_DB_PATH", "data/artifacts.db"),
+    # Users whose artifacts are generated at once
+    "parallelism": int(os.getenv("PRECOMPUTE_PARALLELISM", "4")),
+    # Stored outputs older than this are not served
+    "max_age_hours": float(os.getenv("PRECOMPUTE_MAX_AGE_HOURS", "24")),
+}
+
+# Celebration Prefetch Configuration
+PREFETCH_CONFIG = {
+    "enabled": os.getenv("CELEBRATION_PREFETCH", "true").lower() == "true",
+    # Streak lengths whose crossing triggers a speculative celebration
+    "milestones": [int(m) for m in os.getenv(
+        "CELEBRATION_MILESTONES", "3,7,14,21,30,60,100,365").split(",")],
+    # Seconds a prefetched message waits to be asked for before it is wasted
+    "ttl_seconds": float(os.getenv("CELEBRATION_PREFETCH_TTL", "300")),
+    "max_entries": 1000,
+    # Celebrations generated at once in the background
+    "workers": 2,
+}
+
+# Fallback Response Configuration
+FALLBACK_CONFIG = {
+    "enabled": os.getenv("AGENT_FALLBACKS", "true").lower() == "true",
+    # Seconds a route waits for the LLM before answering locally, keyed
+    # "agenttype.method"; "cached" also allows the user's last result for the
+    # method instead of a template
+    "routes": {
+        "motivator.provide_daily_motivation": {
+            "deadline": float(os.getenv("FALLBACK_DEADLINE", "5")), "cached": True},
+        "motivator.generate_celebration_message": {
+            "deadline": float(os.getenv("FALLBACK_DEADLINE", "5")), "cached": True},
+        "tracker.log_daily_data": {
+            "deadline": float(os.getenv("FALLBACK_DEADLINE", "5")), "cached": False},
+        "tracker.generate_daily_report": {"deadline": 10.0, "cached": False},
+    },
+    # Recent LLM results kept for fallbacks
+    "cache_size": 2000,
+    # Agent calls running at once behind fallback routes
+    "workers": 16,
+}
+
+# Workflow Configuration
+WORKFLOW_CONFIG = {
+    # Upper bound on agent steps running at once across all workflow runs
+    "max_concurrency": int(os.getenv("WORKFLOW_MAX_CONCURRENCY", "4")),
+}
+
+# Tracing Configuration
+TRACING_CONFIG = {
+    "enabled": os.getenv("TRACING", "true").lower() == "true",
+    # Share of requests whose trace is always exported
+    "sample_rate": float(os.getenv("TRACE_SAMPLE_RATE", "0")),
+    # Traces of requests slower than this are exported regardless of sampling
+    "slow_ms": float(os.getenv("TRACE_SLOW_MS", "1000")),
+    # Exported traces are appended here as OTLP-JSON, one trace per line
+    "file": os.getenv("TRACE_FILE", "data/traces.jsonl"),
+    # Spans kept per trace; later ones are counted but dropped
+    "max_spans": 500,
+    "service_name": "healthhabit-api",
+}
+
+# Event Loop Monitor Configuration
+LOOP_MONITOR_CONFIG = {
+    "enabled": os.getenv("LOOP_MONITOR", "true").lower() == "true",
+    # Seconds between heartbeats scheduled on the event loop
+    "interval": float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05")),
+    # A heartbeat late by more than this counts as a blocked loop; the
+    # blocking stack is captured and logged
+    "block_threshold_ms": float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100")),
+    # Recent blocks kept with their stacks
+    "history": 50,
+}
+
+# Diagnostics Configuration
+DIAGNOSTICS_CONFIG = {
+    # X-Admin-Token required by the /api/admin endpoints; unset disables them
+    "admin_token": os.getenv("ADMIN_TOKEN", ""),
+    # Longest CPU profile a request may ask for, in seconds
+    "max_profile_seconds": 60.0,
+    # Default time between profiler samples
+    "profile_interval_ms": float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+    # Stack depth recorded per allocation while tracemalloc is on
+    "tracemalloc_frames": int(os.getenv("TRACEMALLOC_FRAMES", "25")),
+    # Memory snapshots kept; the oldest is dropped beyond this
+    "max_snapshots": 10,
+}
+
+# Server Configuration
+SERVER_CONFIG = {
+    # "full" serves src.api.main:app, "habits" the habits-only src.app:app
+    "app": os.getenv("SERVER_APP", "full"),
+    "host": os.getenv("HOST", "0.0.0.0"),
+    "port": int(os.getenv("PORT", "8000")),
+    # Worker processes; 0 uses one per available CPU
+    "workers": int(os.getenv("WEB_CONCURRENCY", "0")),
+    # Processes sharing the LLM provider limits; the launcher sets this to
+    # its worker count, and each process enforces its share of the limits
+    "processes": 1,
+    # Import the app and its heavy dependencies once, before forking workers
+    "preload": os.getenv("SERVER_PRELOAD", "true").lower() == "true",
+    # Workers warm up before GET /ready reports them ready
+    "warmup": os.getenv("WARMUP", "true").lower() == "true",
+    # Seconds workers get to finish requests on shutdown
+    "graceful_timeout": float(os.getenv("GRACEFUL_TIMEOUT", "30")),
+}
@@ -0,0 +1,8 @@
+from .store import JobStore
+from .runner import JobRunner, get_job_runner
+
+__all__ = [
+    'JobStore',
+    'JobRunner',
+    'get_job_runner'
+]
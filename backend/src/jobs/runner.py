@@ -0,0 +1,186 @@
+"""
+Bounded worker pool for background jobs.
+
+Submitting a job only writes it to the store. A fixed number of worker
+threads claim queued jobs and run their handlers as batch work, so the
+scheduler serves interactive routes first. Clients waiting on a job
+are woken through asyncio futures, so a long-poll holds a thread only
+while it reads the store.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.config.ai_config import JOBS_CONFIG
+from src.llm import BATCH, llm_context
+from src.models.job import Job
+from src.observability import register_footprint
+from .store import JobStore
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    def __init__(self, store: JobStore, handlers: Dict[str, Callable[..., Any]],
+                 workers: int = 2, poll_interval: float = 1.0):
+        """
+        Initialize a job runner.
+
+        Args:
+            store (JobStore): Persistent job store
+            handlers (Dict[str, Callable]): Job kind to blocking handler; the
+                job params are passed as keyword arguments
+            workers (int): Jobs run at once
+            poll_interval (float): Seconds idle workers wait before checking
+                the store for jobs submitted by other processes
+        """
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Condition()
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._waiters_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        """Requeue jobs orphaned by a previous process and start the workers."""
+        if self.running:
+            return
+        requeued = self.store.requeue_orphans()
+        if requeued:
+            logger.info("Requeued %d interrupted jobs", requeued)
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the workers once their current jobs finish."""
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, kind: str, params: Dict[str, Any], user_id: Optional[str] = None) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            kind (str): Registered job kind
+            params (Dict[str, Any]): Keyword arguments of the handler
+            user_id (str, optional): User the job runs for
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            KeyError: If the kind is unknown
+            TypeError: If the params do not match the handler
+        """
+        handler = self.handlers[kind]
+        # Reject bad params now rather than when a worker picks the job up
+        inspect.signature(handler).bind(**params)
+        job = self.store.create(kind, params, user_id)
+        with self._wake:
+            self._wake.notify()
+        return job
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.store.claim_next()
+            if job is None:
+                with self._wake:
+                    self._wake.wait(self.poll_interval)
+                continue
+            self._notify(self._run(job))
+
+    def _run(self, job: Job) -> Job:
+        try:
+            with llm_context(priority=BATCH, user_id=job.user_id):
+                result = self.handlers[job.kind](**job.params)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            return self.store.finish(job.id, error=str(e) or type(e).__name__)
+        return self.store.finish(job.id, result=result)
+
+    def _notify(self, job: Job):
+        with self._waiters_lock:
+            waiters = self._waiters.pop(job.id, [])
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, job)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        Return a job once it has finished or the timeout passes.
+
+        Args:
+            job_id (str): Job to wait for
+            timeout (float): Seconds to wait; 0 returns the current state
+
+        Returns:
+            Optional[Job]: The job, or None if it does not exist
+        """
+        # SQLite blocks and shares the store lock with the worker threads
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job.finished or timeout <= 0:
+            return job
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._waiters_lock:
+            self._waiters.setdefault(job_id, []).append((loop, future))
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                # The job may have finished before the waiter was registered,
+                # or in another worker process, which cannot resolve the future
+                job = await asyncio.to_thread(self.store.get, job_id)
+                remaining = deadline - loop.time()
+                if job.finished or remaining <= 0:
+                    return job
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future),
+                                                  min(remaining, self.poll_interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._waiters_lock:
+                waiters = self._waiters.get(job_id, [])
+                if (loop, future) in waiters:
+                    waiters.remove((loop, future))
+                if not waiters:
+                    self._waiters.pop(job_id, None)
+
+
+def _resolve(future: asyncio.Future, job: Job):
+    if not future.done():
+        future.set_result(job)
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+register_footprint("job_runner", lambda: _runner)
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner, building it on first use."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                from .tasks import JOB_HANDLERS
+                _runner = JobRunner(JobStore(JOBS_CONFIG["db_path"]), JOB_HANDLERS,
+                                    workers=JOBS_CONFIG["workers"])
+    return _runner
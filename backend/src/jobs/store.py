@@ -0,0 +1,194 @@
+"""
+SQLite persistence for background jobs.
+
+Jobs survive restarts: queued jobs stay queued, and jobs that were running
+in a process that no longer exists are put back in the queue. Running jobs
+record their owner as process id plus process start time, since after a
+container restart the new process usually gets the old id (often 1).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+from src.models.job import Job
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    user_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created_at);
+"""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_start(pid: int) -> Optional[str]:
+    """Start time of a process in clock ticks since boot, where /proc has it."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name in parentheses may hold spaces; starttime is the
+    # 20th field after it
+    return stat.rsplit(")", 1)[1].split()[19]
+
+
+_owner: Optional[Tuple[int, str]] = None
+
+
+def process_owner() -> str:
+    """
+    Identify this process start as "pid:start".
+
+    Without /proc the start is a random id, so a restarted process that
+    got the old pid still tells its previous jobs apart from its own.
+    """
+    global _owner
+    pid = os.getpid()
+    # Recomputed after a fork, which keeps the parent's module state
+    if _owner is None or _owner[0] != pid:
+        _owner = (pid, f"{pid}:{_process_start(pid) or uuid4().hex}")
+    return _owner[1]
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    if owner is None:
+        return False
+    pid, _, start = str(owner).partition(":")
+    if int(pid) == os.getpid():
+        return owner == process_owner()
+    if not _pid_alive(int(pid)):
+        return False
+    if not start:
+        # Claimed before owners carried the start time
+        return True
+    current = _process_start(int(pid))
+    # Without /proc another live process with that id is given the benefit
+    # of the doubt
+    return current is None or current == start
+
+
+class JobStore:
+    def __init__(self, path: str):
+        """
+        Initialize the job store.
+
+        Args:
+            path (str): SQLite database file, created if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the worker threads, serialized by a lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        data = dict(row)
+        data.pop("owner")
+        data["params"] = json.loads(data["params"])
+        data["result"] = json.loads(data["result"]) if data["result"] is not None else None
+        return Job(**data)
+
+    def create(self, kind: str, params: Dict[str, Any], user_id: Optional[str] = None) -> Job:
+        """Insert a queued job and return it."""
+        job_id = str(uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, user_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params, default=str), user_id,
+                 datetime.utcnow().isoformat()))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def claim_next(self) -> Optional[Job]:
+        """Mark the oldest queued job as running by this process and return it."""
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes
+            # sharing the file cannot claim the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, owner = ?, started_at = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (RUNNING, process_owner(), datetime.utcnow().isoformat(), row["id"]))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None) -> Job:
+        """Record the outcome of a running job."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (FAILED if error is not None else SUCCEEDED,
+                 json.dumps(result, default=str) if error is None else None,
+                 error, datetime.utcnow().isoformat(), job_id))
+        return self.get(job_id)
+
+    def requeue_orphans(self) -> int:
+        """Queue again the running jobs whose process has exited or restarted; return how many."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, owner FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+            orphans = [row["id"] for row in rows if not _owner_alive(row["owner"])]
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, owner = NULL WHERE id = ?",
+                [(QUEUED, job_id) for job_id in orphans])
+        return len(orphans)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,35 @@
+"""
+Long-running agent tasks that can be run as background jobs.
+
+Each handler takes the job params as keyword arguments and returns a
+JSON-serializable result.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from src.agents import get_agent
+from src.batch import precompute_all
+
+
+def insights_report(data: List[Dict[str, Any]], goals: Dict[str, Any]) -> str:
+    return get_agent("analyzer").generate_insights_report(data, goals)
+
+
+def behavior_patterns(historical_data: List[Dict[str, Any]]) -> str:
+    return get_agent("analyzer").identify_behavior_patterns(historical_data)
+
+
+def weekly_progress(weekly_data: List[Dict[str, Any]]) -> str:
+    return get_agent("analyzer").analyze_weekly_progress(weekly_data)
+
+
+def precompute(day: Optional[str] = None, artifacts: Optional[List[str]] = None,
+               force: bool = False) -> Dict[str, Any]:
+    return precompute_all(day, artifacts, force)
+
+
+JOB_HANDLERS: Dict[str, Callable[..., Any]] = {
+    "insights-report": insights_report,
+    "behavior-patterns": behavior_patterns,
+    "weekly-progress": weekly_progress,
+    "precompute": precompute,
+}
@@ -0,0 +1,49 @@
+from .client import (
+    Completion, LLMClient, LLMError, LLMTimeout, RateLimitError, chat_completion,
+    close_llm_client, get_llm_client
+)
+from .scheduler import (
+    BATCH, INTERACTIVE, AdmissionScheduler, AdmissionTimeout, current_priority, current_user,
+    get_scheduler, llm_context
+)
+from .resilience import (
+    CallPolicy, CircuitBreaker, CircuitOpenError, DeadlineExceeded, LatencyTracker,
+    call_with_policy, policy_for, provider_breaker
+)
+from .routing import ModelRoute, ModelRouter, get_model_router, route_for
+from .instrumentation import TokenLedger, record_cache_hit, record_call, token_ledger
+
+__all__ = [
+    'AdmissionScheduler',
+    'AdmissionTimeout',
+    'BATCH',
+    'CallPolicy',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'Completion',
+    'DeadlineExceeded',
+    'INTERACTIVE',
+    'LLMClient',
+    'LLMError',
+    'LLMTimeout',
+    'LatencyTracker',
+    'ModelRoute',
+    'ModelRouter',
+    'RateLimitError',
+    'TokenLedger',
+    'call_with_policy',
+    'chat_completion',
+    'close_llm_client',
+    'current_priority',
+    'current_user',
+    'get_llm_client',
+    'get_model_router',
+    'get_scheduler',
+    'llm_context',
+    'policy_for',
+    'provider_breaker',
+    'record_cache_hit',
+    'record_call',
+    'route_for',
+    'token_ledger'
+]
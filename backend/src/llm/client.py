@@ -0,0 +1,295 @@
+"""
+Minimal client for OpenAI-compatible chat completion APIs.
+
+TogetherAI, and any local stand-in for it, expose POST /chat/completions.
+This client sends a single request and returns the first choice, without
+any agent framework around it. One pooled client is shared by every agent
+in the process, and litellm is pointed at the same connection pool.
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from src.config.ai_config import LLM_CLIENT_CONFIG, MODEL_CONFIG
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class LLMError(Exception):
+    """Raised when the completion API returns an error or an invalid response."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitError(LLMError):
+    """Raised when the completion API answers 429 Too Many Requests."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+class LLMTimeout(LLMError):
+    """Raised when the completion API does not answer within the timeout."""
+
+
+class Completion:
+    def __init__(self, content: str, model: str, prompt_tokens: Optional[int],
+                 completion_tokens: Optional[int], latency: float,
+                 first_token: Optional[float] = None):
+        """
+        Initialize a completion result.
+
+        Args:
+            content (str): Text of the first choice
+            model (str): Model that produced the completion
+            prompt_tokens (int, optional): Prompt tokens reported by the provider
+            completion_tokens (int, optional): Completion tokens reported by the provider
+            latency (float): Wall time of the request in seconds
+            first_token (float, optional): Seconds until the first content
+                token, known for streamed requests
+        """
+        self.content = content
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.latency = latency
+        self.first_token = first_token
+
+
+def _raise_for_status(response: "httpx.Response"):
+    if response.status_code == 429:
+        retry_after = response.headers.get("retry-after")
+        raise RateLimitError(
+            "Rate limited by completion API",
+            retry_after=float(retry_after) if retry_after else None)
+    if response.status_code >= 400:
+        raise LLMError(
+            f"Completion API returned {response.status_code}: {response.text[:200]}",
+            status_code=response.status_code)
+
+
+def parse_completion(payload: Dict[str, Any], latency: float) -> Completion:
+    """Build a Completion from a chat completion response body."""
+    try:
+        content = payload["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        raise LLMError("Completion API returned no choices")
+    usage = payload.get("usage") or {}
+    return Completion(
+        content=content or "",
+        model=payload.get("model", ""),
+        prompt_tokens=usage.get("prompt_tokens"),
+        completion_tokens=usage.get("completion_tokens"),
+        latency=latency
+    )
+
+
+class LLMClient:
+    def __init__(self, base_url: str, api_key: Optional[str] = None, *,
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 60.0, connect_timeout: float = 5.0,
+                 read_timeout: float = 60.0, http2: bool = False, stream: bool = False,
+                 transport: Optional["httpx.BaseTransport"] = None):
+        """
+        Initialize a pooled completion client.
+
+        Connections are kept alive between requests, so only the first
+        request to the API pays for the TCP and TLS handshakes.
+
+        Args:
+            base_url (str): API root, e.g. https://api.together.xyz/v1
+            api_key (str, optional): Bearer token
+            max_connections (int): Upper bound on open connections
+            max_keepalive_connections (int): Idle connections kept for reuse
+            keepalive_expiry (float): Seconds an idle connection is kept
+            connect_timeout (float): Seconds allowed to establish a connection
+            read_timeout (float): Seconds allowed between response bytes
+            http2 (bool): Multiplex requests over HTTP/2 when h2 is installed
+            stream (bool): Stream responses, which measures time to first token
+            transport (httpx.BaseTransport, optional): Custom transport, e.g. for tests
+        """
+        # httpx is only imported once a client is actually built
+        import httpx
+
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.http2 = http2 and _h2_available()
+        self.stream = stream
+        self.http = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            http2=self.http2,
+            transport=transport
+        )
+
+    def chat_completion(self, messages: List[Dict[str, str]], *,
+                        timeout: Optional[float] = None, **params: Any) -> Completion:
+        """
+        Send one chat completion request.
+
+        Args:
+            messages (List[Dict[str, str]]): Chat messages with role and content
+            timeout (float, optional): Read timeout for this request only
+            **params: Sampling parameters (model, max_tokens, temperature, ...)
+
+        Returns:
+            Completion: The first choice and token usage
+
+        Raises:
+            RateLimitError: If the API answers 429
+            LLMError: If the API answers with another error or cannot be reached
+        """
+        import httpx
+
+        # Headers are set per request so the pool can also serve litellm,
+        # which sends its own
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        extra = {"timeout": timeout} if timeout is not None else {}
+        start = time.perf_counter()
+        if self.stream:
+            return self._stream_completion(messages, params, headers, extra, start)
+        try:
+            response = self.http.post(
+                f"{self.base_url}/chat/completions",
+                json={"messages": messages, **params},
+                headers=headers,
+                **extra
+            )
+        except httpx.TimeoutException as e:
+            raise LLMTimeout(f"Completion request timed out: {e}") from e
+        except httpx.HTTPError as e:
+            raise LLMError(f"Completion request failed: {e}") from e
+        _raise_for_status(response)
+        return parse_completion(response.json(), time.perf_counter() - start)
+
+    def connect(self, timeout: Optional[float] = None):
+        """
+        Open a pooled connection to the API ahead of the first completion.
+
+        Raises:
+            LLMError: If the API cannot be reached
+        """
+        import httpx
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        extra = {"timeout": timeout} if timeout is not None else {}
+        try:
+            # Any answer will do, the connection stays in the pool
+            self.http.get(f"{self.base_url}/models", headers=headers, **extra)
+        except httpx.HTTPError as e:
+            raise LLMError(f"Could not connect to the completion API: {e}") from e
+
+    def _stream_completion(self, messages: List[Dict[str, str]], params: Dict[str, Any],
+                           headers: Dict[str, str], extra: Dict[str, Any], start: float) -> Completion:
+        """Send a streamed request and assemble the reply from its chunks."""
+        import httpx
+
+        body = {"messages": messages, **params, "stream": True,
+                "stream_options": {"include_usage": True}}
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        model = ""
+        first_token = None
+        try:
+            with self.http.stream("POST", f"{self.base_url}/chat/completions", json=body,
+                                  headers=headers, **extra) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    _raise_for_status(response)
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        raise LLMError("Completion API sent an invalid stream chunk")
+                    model = chunk.get("model") or model
+                    usage = chunk.get("usage") or usage
+                    for choice in chunk.get("choices") or []:
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            if first_token is None:
+                                first_token = time.perf_counter() - start
+                            parts.append(content)
+        except httpx.TimeoutException as e:
+            raise LLMTimeout(f"Completion request timed out: {e}") from e
+        except httpx.HTTPError as e:
+            raise LLMError(f"Completion request failed: {e}") from e
+        return Completion(
+            content="".join(parts),
+            model=model,
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            latency=time.perf_counter() - start,
+            first_token=first_token
+        )
+
+    def close(self):
+        """Close all pooled connections."""
+        self.http.close()
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def _share_with_litellm(client: Optional[LLMClient]):
+    """Point litellm, used by the CrewAI path, at a client's pool if litellm is loaded."""
+    litellm = sys.modules.get("litellm")
+    if litellm is not None:
+        litellm.client_session = client.http if client is not None else None
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Return the process-wide LLM client, building it on first use.
+
+    Returns:
+        LLMClient: Client configured from LLM_CLIENT_CONFIG
+    """
+    global _client
+    # Double-checked locking: the lock is only taken until the client exists
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient(api_key=MODEL_CONFIG.get("api_key"), **LLM_CLIENT_CONFIG)
+                _share_with_litellm(_client)
+    return _client
+
+
+def close_llm_client():
+    """Close the process-wide client; the next call builds a new one."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+            # litellm would otherwise keep sending CrewAI calls through the
+            # closed pool
+            _share_with_litellm(None)
+
+
+def chat_completion(messages: List[Dict[str, str]], **params: Any) -> Completion:
+    """Send one chat completion request through the process-wide client."""
+    return get_llm_client().chat_completion(messages, **params)
@@ -0,0 +1,114 @@
+"""
+Metrics of agent LLM calls per agent type and method.
+
+Every call made through BaseAgent.execute records its wall time (queueing
+and retries included), the time it waited for admission, the time to the
+first token when responses are streamed, prompt and completion tokens,
+retries, hedges and errors. Answers served without an LLM call are counted
+as cache hits by the cache that served them. Token totals are also kept
+per user, for finding heavy users and enforcing budgets; they are served
+as JSON rather than as metric labels, which would be unbounded.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+from src.observability import register_footprint, registry
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 45.0, 90.0)
+QUEUE_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ANONYMOUS = "anonymous"
+
+LABELS = ("agent", "method")
+call_seconds = registry.histogram(
+    "llm_call_duration_seconds", "Wall time of agent LLM calls, queueing and retries included",
+    LABELS, LATENCY_BUCKETS)
+queue_seconds = registry.histogram(
+    "llm_queue_wait_seconds", "Time agent LLM calls waited for admission", LABELS, QUEUE_BUCKETS)
+first_token_seconds = registry.histogram(
+    "llm_time_to_first_token_seconds", "Time to the first streamed token of direct calls",
+    LABELS, LATENCY_BUCKETS)
+calls_total = registry.counter("llm_calls_total", "Agent LLM calls by outcome", LABELS + ("outcome",))
+errors_total = registry.counter("llm_errors_total", "Failed agent LLM calls by error", LABELS + ("error",))
+retries_total = registry.counter("llm_retries_total", "Retried attempts of agent LLM calls", LABELS)
+hedged_total = registry.counter("llm_hedged_total", "Hedged duplicate requests of agent LLM calls", LABELS)
+prompt_tokens_total = registry.counter("llm_prompt_tokens_total", "Prompt tokens sent", LABELS)
+completion_tokens_total = registry.counter("llm_completion_tokens_total", "Completion tokens received", LABELS)
+cache_hits_total = registry.counter(
+    "llm_cache_hits_total", "Agent answers served without an LLM call, by cache", LABELS + ("cache",))
+
+
+def split_key(key: str) -> Dict[str, str]:
+    """Labels of an "agenttype.method" key."""
+    agent, _, method = key.partition(".")
+    return {"agent": agent, "method": method or "unknown"}
+
+
+class TokenLedger:
+    def __init__(self):
+        """Initialize empty per-user token totals."""
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, user: Optional[str], prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            totals = self._totals.setdefault(
+                user or ANONYMOUS, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+
+    def totals(self, user: Optional[str] = None) -> Dict[str, Any]:
+        """Totals of one user, or of every user keyed by user id."""
+        with self._lock:
+            if user is not None:
+                return dict(self._totals.get(user, {"calls": 0, "prompt_tokens": 0,
+                                                    "completion_tokens": 0}))
+            return {name: dict(totals) for name, totals in self._totals.items()}
+
+
+token_ledger = TokenLedger()
+register_footprint("token_ledger", lambda: token_ledger)
+
+
+def record_call(key: str, usage: Dict[str, Any], seconds: float, user: Optional[str] = None,
+                error: Optional[BaseException] = None):
+    """
+    Record one agent LLM call.
+
+    Args:
+        key (str): "agenttype.method" of the call
+        usage (Dict[str, Any]): Usage filled in by the call: prompt_tokens,
+            provider_prompt_tokens, completion_tokens, queued_ms,
+            first_token_ms, attempts and hedged, as far as known
+        seconds (float): Wall time of the call
+        user (str, optional): User the call was made for
+        error (BaseException, optional): Why the call failed
+    """
+    labels = split_key(key)
+    call_seconds.observe(seconds, **labels)
+    if usage.get("queued_ms") is not None:
+        queue_seconds.observe(usage["queued_ms"] / 1000, **labels)
+    if usage.get("first_token_ms") is not None:
+        first_token_seconds.observe(usage["first_token_ms"] / 1000, **labels)
+    if usage.get("attempts", 1) > 1:
+        retries_total.inc(usage["attempts"] - 1, **labels)
+    if usage.get("hedged"):
+        hedged_total.inc(usage["hedged"], **labels)
+
+    if error is not None:
+        calls_total.inc(outcome="error", **labels)
+        errors_total.inc(error=type(error).__name__, **labels)
+        return
+    calls_total.inc(outcome="ok", **labels)
+
+    # Provider counts are exact; the local estimate covers CrewAI calls
+    prompt = usage.get("provider_prompt_tokens") or usage.get("prompt_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    prompt_tokens_total.inc(prompt, **labels)
+    completion_tokens_total.inc(completion, **labels)
+    token_ledger.record(user, prompt, completion)
+
+
+def record_cache_hit(key: str, cache: str):
+    """Count an answer for "agenttype.method" served from cache without an LLM call."""
+    cache_hits_total.inc(cache=cache, **split_key(key))
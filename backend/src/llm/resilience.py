@@ -0,0 +1,346 @@
+"""
+Tail-latency controls for LLM calls.
+
+Every agent call runs under a policy with a deadline covering all attempts,
+retries with full-jitter exponential backoff for transient failures, optional
+hedging (a duplicate request once the first is slower than a recent latency
+quantile) and a process-wide circuit breaker that fails fast while the
+provider keeps failing.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, TypeVar
+from src.config.ai_config import RESILIENCE_CONFIG
+from .client import LLMError
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Attempts run on a process-wide pool so the caller can stop waiting at the
+# deadline and hedged duplicates can run alongside the first request.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=RESILIENCE_CONFIG["max_workers"],
+                    thread_name_prefix="llm-call"
+                )
+    return _executor
+
+
+class DeadlineExceeded(LLMError):
+    """Raised when a call does not complete within its deadline."""
+
+    def __init__(self, message: str, deadline: float):
+        super().__init__(message)
+        self.deadline = deadline
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CallPolicy:
+    def __init__(self, deadline: float = 45.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 hedge: bool = False, hedge_quantile: float = 0.95,
+                 hedge_min_samples: int = 20):
+        """
+        Initialize a call policy.
+
+        Args:
+            deadline (float): Seconds until the call fails, retries included
+            max_retries (int): Attempts after the first one
+            backoff_base (float): Upper bound of the first backoff in seconds
+            backoff_max (float): Cap on the backoff upper bound
+            hedge (bool): Whether to send hedged duplicate requests
+            hedge_quantile (float): Latency quantile after which to hedge
+            hedge_min_samples (int): Latencies needed before hedging starts
+        """
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+
+
+def policy_for(key: str) -> CallPolicy:
+    """Return the policy configured for an "agenttype.method" key."""
+    settings = dict(RESILIENCE_CONFIG["default"])
+    settings.update(RESILIENCE_CONFIG["methods"].get(key, {}))
+    return CallPolicy(**settings)
+
+
+class LatencyTracker:
+    def __init__(self, size: int = 200):
+        """
+        Initialize a window of recent successful call latencies.
+
+        Args:
+            size (int): Number of latencies kept
+        """
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the q-quantile of the window, or None when it is empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a circuit breaker.
+
+        After failure_threshold consecutive failures the circuit opens and
+        calls fail immediately. Once reset_timeout has passed a single trial
+        call is let through: success closes the circuit, failure reopens it.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open
+            clock (Callable): Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = 0.0
+            self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a trial call through."""
+        with self._lock:
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        """Return whether a call may be sent now."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._current_state() == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+    def release(self):
+        """End a call that says nothing about provider health."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+provider_breaker = CircuitBreaker(**RESILIENCE_CONFIG["circuit_breaker"])
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Return whether an error is transient.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried; other
+    4xx responses and errors raised by our own code are not. Errors from the
+    CrewAI path (litellm exceptions) are classified by their status_code.
+    Errors may also decide for themselves with a retryable attribute.
+    """
+    retryable = getattr(error, "retryable", None)
+    if retryable is not None:
+        return retryable
+    status = getattr(error, "status_code", None)
+    if isinstance(error, LLMError) or status is not None:
+        return status is None or status == 429 or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+
+def backoff_delay(attempt: int, policy: CallPolicy, error: Optional[Exception] = None,
+                  rng: random.Random = random) -> float:
+    """Full-jitter backoff before retry number attempt + 1, honouring Retry-After."""
+    delay = rng.uniform(0, min(policy.backoff_max, policy.backoff_base * 2 ** attempt))
+    retry_after = getattr(error, "retry_after", None)
+    return max(delay, retry_after) if retry_after else delay
+
+
+def _first_success(futures, timeout: float, deadline: float):
+    """
+    Wait for the first future that succeeds; raise the last error if all fail.
+
+    Futures still pending at the end are cancelled if they have not started.
+    A running request cannot be interrupted, but it was given the time left
+    until the deadline as its timeout, so it ends by then.
+    """
+    error = None
+    end = time.monotonic() + timeout
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded(f"LLM call exceeded its {deadline:g}s deadline", deadline)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _run_attempt(attempt: Callable[[float], T], remaining: float, policy: CallPolicy,
+                 latencies: Optional[LatencyTracker], stats: Dict[str, Any]) -> T:
+    executor = _get_executor()
+    primary: Future = executor.submit(attempt, remaining)
+    hedge_after = None
+    if policy.hedge and latencies is not None and len(latencies) >= policy.hedge_min_samples:
+        hedge_after = latencies.quantile(policy.hedge_quantile)
+    if hedge_after is None or hedge_after >= remaining:
+        return _first_success([primary], remaining, policy.deadline)
+
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+    # The first request is slower than usual: race a duplicate against it.
+    # Only abandon-safe calls hedge (see BaseAgent.call_policy); the loser's
+    # result is dropped.
+    stats["hedged"] = stats.get("hedged", 0) + 1
+    backup = executor.submit(attempt, remaining - hedge_after)
+    return _first_success([primary, backup], remaining - hedge_after, policy.deadline)
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def call_with_policy(attempt: Callable[[float], T], policy: CallPolicy,
+                     breaker: Optional[CircuitBreaker] = None,
+                     latencies: Optional[LatencyTracker] = None,
+                     stats: Optional[Dict[str, Any]] = None,
+                     sleep: Callable[[float], None] = time.sleep) -> T:
+    """
+    Run a blocking LLM call under a policy.
+
+    Args:
+        attempt (Callable[[float], T]): Makes one request; receives the
+            seconds left until the deadline to use as its timeout
+        policy (CallPolicy): Deadline, retry and hedging settings
+        breaker (CircuitBreaker, optional): Breaker guarding the provider
+        latencies (LatencyTracker, optional): Recent latencies for hedging,
+            updated with each successful attempt
+        stats (Dict[str, Any], optional): Receives attempts and hedged counts
+        sleep (Callable): Used for backoff, replaceable in tests
+
+    Returns:
+        T: Result of the first successful attempt
+
+    Raises:
+        RuntimeError: If called on a thread running an event loop, which
+            waiting and backoff would block
+        CircuitOpenError: If the breaker is open
+        DeadlineExceeded: If the deadline passes first
+        Exception: The last error when it is not retryable or retries run out
+    """
+    if _in_event_loop():
+        raise RuntimeError("LLM calls block; run them in a worker thread, e.g. asyncio.to_thread")
+    stats = stats if stats is not None else {}
+    deadline_at = time.monotonic() + policy.deadline
+    error: Optional[Exception] = None
+    for attempt_number in range(policy.max_retries + 1):
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError("LLM provider circuit is open", breaker.retry_after())
+        remaining = deadline_at - time.monotonic()
+        stats["attempts"] = attempt_number + 1
+        started = time.monotonic()
+        try:
+            result = _run_attempt(attempt, remaining, policy, latencies, stats)
+        except Exception as e:
+            if not is_retryable(e):
+                if breaker is not None:
+                    breaker.release()
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            if isinstance(e, DeadlineExceeded):
+                raise
+            error = e
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            if latencies is not None:
+                latencies.record(time.monotonic() - started)
+            return result
+
+        if attempt_number == policy.max_retries:
+            break
+        delay = backoff_delay(attempt_number, policy, error)
+        if time.monotonic() + delay >= deadline_at:
+            raise DeadlineExceeded(
+                f"LLM call exceeded its {policy.deadline:g}s deadline", policy.deadline) from error
+        sleep(delay)
+    raise error
@@ -0,0 +1,144 @@
+"""
+Per-method model selection.
+
+Each agent method is routed to a model with its own completion budget and
+temperature, so short-form output such as celebration messages does not pay
+for the large model. With latency routing enabled, a method that has a
+latency budget moves to its fallback model while the primary model's recent
+latency for that method is over budget. A small share of calls keeps probing
+the primary model so the method moves back once it recovers.
+"""
+
+import random
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from src.config.ai_config import MODEL_CONFIG, MODEL_ROUTES_CONFIG
+from src.observability import register_footprint
+from .resilience import LatencyTracker
+
+
+class ModelRoute:
+    def __init__(self, model: str, max_tokens: int, temperature: float,
+                 latency_budget: Optional[float] = None, fallback_model: Optional[str] = None,
+                 rerouted: bool = False):
+        """
+        Initialize a model route.
+
+        Args:
+            model (str): Model the call is sent to
+            max_tokens (int): Completion token limit
+            temperature (float): Sampling temperature
+            latency_budget (float, optional): Primary-model latency quantile in
+                seconds above which calls move to the fallback model
+            fallback_model (str, optional): Model used while over budget
+            rerouted (bool): Whether this route replaced the primary model
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.latency_budget = latency_budget
+        self.fallback_model = fallback_model
+        self.rerouted = rerouted
+
+    @property
+    def context_window(self) -> int:
+        """Context window of the route's model in tokens."""
+        return MODEL_ROUTES_CONFIG["context_windows"].get(self.model, MODEL_CONFIG["context_window"])
+
+    def fallback(self) -> "ModelRoute":
+        """The same route sent to the fallback model."""
+        return ModelRoute(self.fallback_model, self.max_tokens, self.temperature,
+                          self.latency_budget, self.fallback_model, rerouted=True)
+
+
+def route_for(key: str) -> ModelRoute:
+    """Return the route configured for an "agenttype.method" key."""
+    settings = dict(MODEL_ROUTES_CONFIG["default"])
+    settings.update(MODEL_ROUTES_CONFIG["methods"].get(key, {}))
+    return ModelRoute(**settings)
+
+
+class ModelRouter:
+    def __init__(self, enabled: bool = False, quantile: float = 0.95, min_samples: int = 20,
+                 probe_rate: float = 0.1, rng: Callable[[], float] = random.random):
+        """
+        Initialize a latency-aware model router.
+
+        Args:
+            enabled (bool): Whether calls may move to their fallback model
+            quantile (float): Latency quantile compared with a route's budget
+            min_samples (int): Latencies needed before a route can move
+            probe_rate (float): Share of calls still sent to an over-budget
+                primary model
+            rng (Callable): Source of uniform random numbers in [0, 1)
+        """
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.probe_rate = probe_rate
+        self._rng = rng
+        self._latencies: Dict[Tuple[str, str], LatencyTracker] = {}
+        self._rerouted: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def latencies(self, key: str, model: str) -> LatencyTracker:
+        """Recent latencies of a method on a model."""
+        with self._lock:
+            return self._latencies.setdefault((key, model), LatencyTracker())
+
+    def record(self, key: str, model: str, seconds: float):
+        self.latencies(key, model).record(seconds)
+
+    def over_budget(self, key: str, route: ModelRoute) -> bool:
+        """Whether the primary model is currently too slow for the route."""
+        if route.latency_budget is None:
+            return False
+        tracker = self.latencies(key, route.model)
+        if len(tracker) < self.min_samples:
+            return False
+        return tracker.quantile(self.quantile) > route.latency_budget
+
+    def choose(self, key: str) -> ModelRoute:
+        """
+        Pick the route for a call.
+
+        Args:
+            key (str): "agenttype.method" of the call
+
+        Returns:
+            ModelRoute: The configured route, or its fallback while the
+            primary model is over budget
+        """
+        route = route_for(key)
+        if (not self.enabled or not route.fallback_model or route.fallback_model == route.model
+                or not self.over_budget(key, route) or self._rng() < self.probe_rate):
+            return route
+        with self._lock:
+            self._rerouted[key] = self._rerouted.get(key, 0) + 1
+        return route.fallback()
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Latency quantile and sample count per method and model, plus reroute counts."""
+        with self._lock:
+            latencies = dict(self._latencies)
+            rerouted = dict(self._rerouted)
+        stats: Dict[str, Dict[str, object]] = {}
+        for (key, model), tracker in latencies.items():
+            stats.setdefault(key, {"rerouted": rerouted.get(key, 0), "models": {}})["models"][model] = {
+                "samples": len(tracker), "latency": tracker.quantile(self.quantile)}
+        return stats
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+register_footprint("model_router", lambda: _router)
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide model router."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter(**MODEL_ROUTES_CONFIG["latency_routing"])
+    return _router
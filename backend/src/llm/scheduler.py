@@ -0,0 +1,388 @@
+"""
+Admission scheduler for outbound LLM requests.
+
+Every agent call waits here before it is sent. A request is admitted when
+the request and token buckets have capacity for it and fewer requests are
+in flight than the adaptive concurrency limit. Waiting requests are served
+by priority class first (interactive before batch) and round-robin across
+users within a class, so one user's burst cannot starve everyone else and
+batch work is what slows down under overload.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, TypeVar
+from src.config.ai_config import SCHEDULER_CONFIG, SERVER_CONFIG
+from src.observability import register_footprint
+from .client import LLMError, LLMTimeout
+from .resilience import DeadlineExceeded
+
+T = TypeVar("T")
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Set by routes and background jobs, read when an agent call is scheduled
+current_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_priority", default=INTERACTIVE)
+current_user: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "llm_user", default=None)
+
+
+@contextmanager
+def llm_context(priority: Optional[str] = None, user_id: Optional[str] = None):
+    """
+    Set the priority class and user of the LLM calls made inside the block.
+
+    Args:
+        priority (str, optional): "interactive" or "batch"
+        user_id (str, optional): User the calls are made for
+    """
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    tokens = []
+    if priority is not None:
+        tokens.append((current_priority, current_priority.set(priority)))
+    if user_id is not None:
+        tokens.append((current_user, current_user.set(user_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class AdmissionTimeout(LLMError):
+    """Raised when a request is not admitted before its deadline."""
+
+    # Waiting longer would not help, and the provider is not at fault
+    retryable = False
+
+    def __init__(self, message: str, priority: str):
+        super().__init__(message, status_code=503)
+        self.priority = priority
+        self.retry_after = None
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a token bucket.
+
+        Args:
+            rate_per_minute (float): Refill rate; 0 means unlimited
+            capacity (float, optional): Burst size, defaults to one minute of refill
+            clock (Callable): Monotonic time source
+        """
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self):
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount can be taken, 0 if it can be taken now."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self._level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        if not self.unlimited:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Return (positive) or charge (negative) tokens after the fact."""
+        if not self.unlimited:
+            self._refill()
+            self._level = min(self.capacity, self._level + amount)
+
+
+class AdaptiveLimit:
+    def __init__(self, min_limit: int = 1, max_limit: int = 16, initial: int = 4,
+                 latency_tolerance: float = 2.0, backoff_factor: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize an AIMD concurrency limit.
+
+        The limit grows by one per limit's worth of successful calls and is
+        multiplied by backoff_factor on overload (429/503 or a timeout) or
+        when latency exceeds latency_tolerance times its baseline, at most
+        once per baseline latency so one burst of slow calls only counts
+        once. Other failures say nothing about congestion and leave it as is.
+
+        Args:
+            min_limit (int): Lowest limit
+            max_limit (int): Highest limit
+            initial (int): Starting limit
+            latency_tolerance (float): Latency over baseline that counts as congestion
+            backoff_factor (float): Multiplier applied on congestion
+            clock (Callable): Monotonic time source
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff_factor = backoff_factor
+        self.baseline: Optional[float] = None
+        self._clock = clock
+        self._last_decrease = float("-inf")
+
+    def on_sample(self, latency: Optional[float], overloaded: bool = False):
+        if latency is None and not overloaded:
+            # Failed for another reason, e.g. a 400 or a bug on our side
+            return
+        congested = overloaded
+        if latency is not None and not overloaded:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                # Let the baseline drift up slowly so it follows real changes
+                self.baseline += (latency - self.baseline) * 0.01
+            congested = latency > self.baseline * self.latency_tolerance
+        if congested:
+            now = self._clock()
+            if now - self._last_decrease >= (self.baseline or 0.0):
+                self.limit = max(self.min_limit, self.limit * self.backoff_factor)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+def is_overload(error: Exception) -> bool:
+    """Whether a failed request means the provider is congested: 429, 503 or a timeout."""
+    if getattr(error, "status_code", None) in (408, 429, 503, 504):
+        return True
+    return isinstance(error, (LLMTimeout, DeadlineExceeded, TimeoutError))
+
+
+class Ticket:
+    def __init__(self, tokens: int, priority: str, user: Optional[str]):
+        self.tokens = tokens
+        self.priority = priority
+        self.user = user
+        self.admitted = False
+        self.enqueued_at = time.monotonic()
+        self.queued_seconds = 0.0
+
+
+class AdmissionScheduler:
+    def __init__(self, requests_per_minute: float = 60, tokens_per_minute: float = 60000,
+                 min_concurrency: int = 1, initial_concurrency: int = 4,
+                 max_concurrency: int = 16, latency_tolerance: float = 2.0,
+                 backoff_factor: float = 0.5, expected_completion_tokens: int = 512,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize an admission scheduler.
+
+        Args:
+            requests_per_minute (float): Request rate limit; 0 disables it
+            tokens_per_minute (float): Token rate limit; 0 disables it
+            min_concurrency (int): Lowest adaptive concurrency limit
+            initial_concurrency (int): Starting concurrency limit
+            max_concurrency (int): Highest adaptive concurrency limit
+            latency_tolerance (float): Latency over baseline that counts as congestion
+            backoff_factor (float): Concurrency multiplier on congestion
+            expected_completion_tokens (int): Completion tokens reserved per request
+            clock (Callable): Monotonic time source for the buckets
+        """
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.concurrency = AdaptiveLimit(min_concurrency, max_concurrency, initial_concurrency,
+                                         latency_tolerance, backoff_factor, clock=clock)
+        self.expected_completion_tokens = expected_completion_tokens
+        self.in_flight = 0
+        self.admitted = {priority: 0 for priority in PRIORITIES}
+        self.timed_out = {priority: 0 for priority in PRIORITIES}
+        # priority -> user -> waiting tickets; users are served round-robin
+        self._queues: Dict[str, "OrderedDict[Optional[str], deque]"] = {
+            priority: OrderedDict() for priority in PRIORITIES}
+        self._cond = threading.Condition()
+
+    def _next(self) -> Optional[Ticket]:
+        for priority in PRIORITIES:
+            users = self._queues[priority]
+            if users:
+                return users[next(iter(users))][0]
+        return None
+
+    def _pop(self, ticket: Ticket):
+        users = self._queues[ticket.priority]
+        waiting = users.pop(ticket.user)
+        waiting.popleft()
+        if waiting:
+            # Back of the line for this user's next request
+            users[ticket.user] = waiting
+
+    def _remove(self, ticket: Ticket):
+        users = self._queues[ticket.priority]
+        waiting = users.get(ticket.user)
+        if waiting is not None and ticket in waiting:
+            waiting.remove(ticket)
+            if not waiting:
+                del users[ticket.user]
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit waiting tickets; return seconds until the buckets allow the next."""
+        while self.in_flight < int(self.concurrency.limit):
+            ticket = self._next()
+            if ticket is None:
+                return None
+            wait = max(self.requests.delay(1), self.tokens.delay(ticket.tokens))
+            if wait > 0:
+                return wait
+            self._pop(ticket)
+            self.requests.take(1)
+            self.tokens.take(ticket.tokens)
+            self.in_flight += 1
+            self.admitted[ticket.priority] += 1
+            ticket.admitted = True
+            ticket.queued_seconds = time.monotonic() - ticket.enqueued_at
+            self._cond.notify_all()
+        return None
+
+    def acquire(self, tokens: int, priority: str = INTERACTIVE, user: Optional[str] = None,
+                timeout: Optional[float] = None) -> Ticket:
+        """
+        Wait until a request may be sent.
+
+        Args:
+            tokens (int): Tokens the request is expected to use
+            priority (str): "interactive" or "batch"
+            user (str, optional): User the request is made for
+            timeout (float, optional): Seconds to wait before giving up
+
+        Returns:
+            Ticket: Pass to release() once the request finishes
+
+        Raises:
+            AdmissionTimeout: If the request is not admitted in time
+        """
+        ticket = Ticket(tokens, priority, user)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            self._queues[priority].setdefault(user, deque()).append(ticket)
+            while True:
+                wait = self._dispatch()
+                if ticket.admitted:
+                    return ticket
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    self._remove(ticket)
+                    self.timed_out[priority] += 1
+                    # Another ticket may be admissible now that this one is gone
+                    self._cond.notify_all()
+                    raise AdmissionTimeout(
+                        f"LLM request not admitted within {timeout:g}s ({priority})", priority)
+                waits = [w for w in (wait, remaining) if w is not None]
+                self._cond.wait(min(waits) if waits else None)
+
+    def release(self, ticket: Ticket, latency: Optional[float] = None,
+                overloaded: bool = False, tokens_used: Optional[int] = None):
+        """
+        Mark an admitted request as finished.
+
+        Args:
+            ticket (Ticket): Ticket returned by acquire()
+            latency (float, optional): Seconds the request took, if it completed
+            overloaded (bool): Whether the request failed with 429, 503 or a timeout
+            tokens_used (int, optional): Actual tokens, to correct the reservation
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self.concurrency.on_sample(latency, overloaded)
+            if tokens_used is not None:
+                self.tokens.adjust(ticket.tokens - tokens_used)
+            self._dispatch()
+            self._cond.notify_all()
+
+    def call(self, send: Callable[[Optional[float]], T], prompt_tokens: int,
+             priority: Optional[str] = None, user: Optional[str] = None,
+             timeout: Optional[float] = None,
+             usage: Optional[Dict[str, Any]] = None) -> T:
+        """
+        Admit, send and release one request.
+
+        Args:
+            send (Callable): Sends the request; receives the time left of timeout
+            prompt_tokens (int): Prompt size; expected completion tokens are added
+            priority (str, optional): Defaults to the current llm_context
+            user (str, optional): Defaults to the current llm_context
+            timeout (float, optional): Seconds for queueing and sending together
+            usage (Dict[str, Any], optional): Receives queue time and, when set by
+                send, completion tokens used to correct the reservation
+
+        Returns:
+            T: Result of send
+        """
+        priority = priority or current_priority.get()
+        user = user if user is not None else current_user.get()
+        usage = usage if usage is not None else {}
+        start = time.monotonic()
+        ticket = self.acquire(prompt_tokens + self.expected_completion_tokens,
+                              priority, user, timeout)
+        usage["queued_ms"] = round(ticket.queued_seconds * 1000, 1)
+        left = timeout - (time.monotonic() - start) if timeout is not None else None
+        sent = time.monotonic()
+        latency = None
+        overloaded = False
+        try:
+            result = send(left)
+            latency = time.monotonic() - sent
+            return result
+        except Exception as e:
+            overloaded = is_overload(e)
+            raise
+        finally:
+            completion = usage.get("completion_tokens")
+            used = prompt_tokens + completion if completion is not None else None
+            self.release(ticket, latency, overloaded, used)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "concurrency_limit": round(self.concurrency.limit, 2),
+                "latency_baseline": self.concurrency.baseline,
+                "queued": {p: sum(len(q) for q in users.values())
+                           for p, users in self._queues.items()},
+                "admitted": dict(self.admitted),
+                "timed_out": dict(self.timed_out),
+            }
+
+
+_scheduler: Optional[AdmissionScheduler] = None
+_scheduler_lock = threading.Lock()
+register_footprint("llm_scheduler", lambda: _scheduler)
+
+
+def get_scheduler() -> AdmissionScheduler:
+    """Return the process-wide admission scheduler, building it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                config = dict(SCHEDULER_CONFIG)
+                # Every worker process has its own scheduler; together they
+                # must stay within the provider limits
+                processes = max(1, SERVER_CONFIG["processes"])
+                for limit in ("requests_per_minute", "tokens_per_minute"):
+                    config[limit] = config[limit] / processes
+                _scheduler = AdmissionScheduler(**config)
+    return _scheduler
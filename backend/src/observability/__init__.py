@@ -0,0 +1,30 @@
+from .loop_monitor import LoopMonitor, get_loop_monitor
+from .memory import footprint, memory_snapshots, register_footprint
+from .metrics import Counter, Gauge, Histogram, MetricsRegistry, registry
+from .middleware import RequestMetricsMiddleware, TracingMiddleware
+from .profiler import ProfilerBusy, SamplingProfiler, profiler
+from .tracing import FileExporter, Tracer, annotate, current_span, get_tracer, traced
+
+__all__ = [
+    'Counter',
+    'FileExporter',
+    'Gauge',
+    'Histogram',
+    'LoopMonitor',
+    'MetricsRegistry',
+    'ProfilerBusy',
+    'RequestMetricsMiddleware',
+    'SamplingProfiler',
+    'Tracer',
+    'TracingMiddleware',
+    'annotate',
+    'current_span',
+    'footprint',
+    'get_loop_monitor',
+    'get_tracer',
+    'memory_snapshots',
+    'profiler',
+    'register_footprint',
+    'registry',
+    'traced'
+]
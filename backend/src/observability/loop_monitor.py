@@ -0,0 +1,166 @@
+"""
+Event loop lag monitor.
+
+A heartbeat task on the event loop sleeps for a fixed interval and records
+how late it wakes up. Lag beyond a few milliseconds means a callback, e.g.
+sync file or LLM I/O in an `async def` route, held the loop.
+
+A watchdog thread checks the heartbeat. Once it is late by more than the
+block threshold, the watchdog captures the loop thread's stack while the
+blocking code is still running. When the loop recovers, the block is
+logged with that stack, counted in the metrics and kept in a short
+history.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from src.config.ai_config import LOOP_MONITOR_CONFIG
+from .metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _blocking_stack(frame) -> List[str]:
+    """Format a loop thread's stack from the callback the loop is running."""
+    frames = traceback.extract_stack(frame)
+    # Frames up to the loop running the callback are the same for every block
+    for index in range(len(frames) - 1, -1, -1):
+        if frames[index].filename.endswith(("asyncio/events.py", "asyncio\\events.py")):
+            frames = frames[index + 1:]
+            break
+    return traceback.format_list(frames)
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = LOOP_MONITOR_CONFIG["interval"],
+                 block_threshold_ms: float = LOOP_MONITOR_CONFIG["block_threshold_ms"],
+                 registry: MetricsRegistry = default_registry,
+                 history: int = LOOP_MONITOR_CONFIG["history"]):
+        """
+        Initialize an event loop monitor.
+
+        Args:
+            interval (float): Seconds between heartbeats
+            block_threshold_ms (float): Heartbeat delay reported as a block
+            registry (MetricsRegistry): Registry the metrics are recorded in
+            history (int): Recent blocks kept by `recent()`
+        """
+        self.interval = interval
+        self.threshold = block_threshold_ms / 1000
+        self.lag = registry.histogram(
+            "event_loop_lag_seconds", "Delay of event loop heartbeats beyond their interval",
+            buckets=LAG_BUCKETS).labels()
+        self.blocks = registry.counter(
+            "event_loop_blocks_total", "Times the event loop was blocked beyond the threshold").labels()
+        self.blocked_seconds = registry.counter(
+            "event_loop_blocked_seconds_total", "Time the event loop spent blocked").labels()
+        self._recent: deque = deque(maxlen=history)
+        self._beat = 0.0
+        self._captured: Optional[Tuple[float, List[str]]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start monitoring the running event loop; call from a coroutine."""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._heartbeat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        """Stop the heartbeat and the watchdog."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            beat = self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - beat - self.interval)
+            self.lag.observe(lag)
+            if lag >= self.threshold:
+                captured = self._captured
+                self._record(lag, captured[1] if captured and captured[0] == beat else [])
+
+    def _watch(self):
+        # Polling at half the threshold catches a block while it lasts
+        period = max(min(self.threshold / 2, self.interval), 0.001)
+        while not self._stop.wait(period):
+            beat = self._beat
+            late = time.monotonic() - beat - self.interval
+            if late < self.threshold or (self._captured and self._captured[0] == beat):
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._captured = (beat, _blocking_stack(frame))
+
+    def _record(self, lag: float, stack: List[str]):
+        self.blocks.inc()
+        self.blocked_seconds.inc(lag)
+        self._recent.append({
+            "at": time.time(),
+            "blocked_ms": round(lag * 1000, 1),
+            "stack": stack,
+        })
+        logger.warning("Event loop blocked for %.0f ms%s", lag * 1000,
+                       ":\n" + "".join(stack) if stack else " (stack not captured)")
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Recent blocks, oldest first, with the stack of the blocking code."""
+        return list(self._recent)
+
+    def stats(self) -> Dict[str, Any]:
+        lag = self.lag.snapshot()
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "block_threshold_ms": self.threshold * 1000,
+            "heartbeats": lag["count"],
+            "mean_lag_ms": round(lag["sum"] / lag["count"] * 1000, 3) if lag["count"] else 0.0,
+            "blocks": int(self.blocks.value()),
+            "blocked_seconds": round(self.blocked_seconds.value(), 3),
+        }
+
+
+_loop_monitor: Optional[LoopMonitor] = None
+_loop_monitor_lock = threading.Lock()
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """
+    Return the process-wide loop monitor, building it on first use.
+
+    Returns:
+        LoopMonitor: Monitor configured from LOOP_MONITOR_CONFIG
+    """
+    global _loop_monitor
+    # Double-checked locking: the lock is only taken until the monitor exists
+    if _loop_monitor is None:
+        with _loop_monitor_lock:
+            if _loop_monitor is None:
+                _loop_monitor = LoopMonitor()
+    return _loop_monitor
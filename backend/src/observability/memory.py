@@ -0,0 +1,184 @@
+"""
+Memory diagnostics: tracemalloc snapshots and per-subsystem footprints.
+
+tracemalloc slows every allocation while it traces, so it is off until
+the first snapshot is taken and switched off again when the snapshots are
+cleared. Two snapshots can be compared to find where memory grew.
+
+Subsystems holding state (the habit store, agent caches, LLM queues)
+register a footprint provider returning that state, or None while it has
+not been built. `footprint()` walks each object graph and reports its
+size; objects shared between subsystems are counted in each of them.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.config.ai_config import DIAGNOSTICS_CONFIG
+
+# Shared program structure reached from any object, not state of its own
+_SKIPPED = (type, ModuleType, FunctionType, BuiltinFunctionType)
+MAX_OBJECTS = 1_000_000
+
+_footprints: Dict[str, Callable[[], Any]] = {}
+
+
+def register_footprint(name: str, provider: Callable[[], Any]):
+    """
+    Register the state of a subsystem for `footprint()`.
+
+    Args:
+        name (str): Subsystem name, e.g. "habit_store"
+        provider (Callable): Returns the subsystem's state, or None while
+            it is not built; must not build it
+    """
+    _footprints[name] = provider
+
+
+def deep_size(obj: Any, max_objects: int = MAX_OBJECTS) -> Tuple[int, int, bool]:
+    """
+    Size of an object and everything it references.
+
+    Returns:
+        Tuple[int, int, bool]: Bytes, objects visited, and whether the walk
+            stopped at max_objects
+    """
+    seen = set()
+    pending = [obj]
+    size = 0
+    while pending:
+        if len(seen) >= max_objects:
+            return size, len(seen), True
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+    return size, len(seen), False
+
+
+def process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def footprint() -> Dict[str, Any]:
+    """Bytes and objects held by each registered subsystem that is built."""
+    subsystems = {}
+    for name, provider in sorted(_footprints.items()):
+        state = provider()
+        if state is None:
+            subsystems[name] = None
+            continue
+        size, objects, truncated = deep_size(state)
+        subsystems[name] = {"bytes": size, "objects": objects, "truncated": truncated}
+    return {"rss_bytes": process_rss(), "subsystems": subsystems}
+
+
+class SnapshotStore:
+    def __init__(self, frames: int = DIAGNOSTICS_CONFIG["tracemalloc_frames"],
+                 max_snapshots: int = DIAGNOSTICS_CONFIG["max_snapshots"]):
+        """
+        Initialize a store of tracemalloc snapshots.
+
+        Args:
+            frames (int): Stack depth recorded per allocation
+            max_snapshots (int): Snapshots kept; the oldest is dropped
+        """
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, Tuple[float, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_id = 1
+        self._started = False
+        self._lock = threading.Lock()
+
+    def take(self) -> Dict[str, Any]:
+        """
+        Take a snapshot, starting tracemalloc first if it is off.
+
+        Allocations made before tracing started are not in any snapshot,
+        so the first snapshot mostly serves as a baseline.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started = True
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ))
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = (time.time(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return self._describe(snapshot_id)
+
+    def _describe(self, snapshot_id: int) -> Dict[str, Any]:
+        taken_at, snapshot = self._snapshots[snapshot_id]
+        stats = snapshot.statistics("filename")
+        return {
+            "id": snapshot_id,
+            "taken_at": taken_at,
+            "traced_bytes": sum(stat.size for stat in stats),
+            "blocks": sum(stat.count for stat in stats),
+        }
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._describe(snapshot_id) for snapshot_id in self._snapshots]
+
+    def diff(self, first: int, second: int, limit: int = 20,
+             group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """
+        Largest differences in allocated memory between two snapshots.
+
+        Args:
+            first (int): Id of the earlier snapshot
+            second (int): Id of the later snapshot
+            limit (int): Entries returned, largest change first
+            group_by (str): "lineno", "filename" or "traceback"
+
+        Raises:
+            KeyError: If a snapshot id is unknown
+        """
+        with self._lock:
+            old = self._snapshots[first][1]
+            new = self._snapshots[second][1]
+        stats = new.compare_to(old, group_by)
+        return [{
+            "location": stat.traceback.format()
+            if group_by == "traceback" else str(stat.traceback[0]),
+            "size": stat.size,
+            "size_diff": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        } for stat in stats[:limit]]
+
+    def clear(self):
+        """Drop all snapshots and stop tracemalloc if a snapshot started it."""
+        with self._lock:
+            self._snapshots.clear()
+            if self._started:
+                tracemalloc.stop()
+                self._started = False
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+
+# Process-wide snapshots used by the admin endpoints
+memory_snapshots = SnapshotStore()
@@ -0,0 +1,294 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Counters, gauges and histograms are registered once by name, with a fixed
+set of label names, and updated from any thread. `registry.render()`
+produces the text served by GET /metrics.
+
+Updates take no lock: every thread adds to its own shard of a series and
+shards are summed when the metric is read. Callers on a hot path bind the
+labels once with `metric.labels(...)` and update the returned series.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .memory import register_footprint
+
+# Seconds; suits both fast local work and slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Series:
+    def __init__(self, size: int):
+        """
+        Initialize one labelled series.
+
+        Args:
+            size (int): Number of values per shard
+        """
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> List[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = [0.0] * self._size
+            # Shards of finished threads are kept, their counts still count
+            with self._lock:
+                self._shards.append(values)
+            return values
+
+    def _totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(values) for values in zip(*shards)] if shards else [0.0] * self._size
+
+
+class CounterSeries(_Series):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        try:
+            self._local.values[0] += amount
+        except AttributeError:
+            self._shard()[0] += amount
+
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class GaugeSeries(_Series):
+    def __init__(self):
+        super().__init__(1)
+        self._base = 0.0
+
+    def inc(self, amount: float = 1.0):
+        try:
+            self._local.values[0] += amount
+        except AttributeError:
+            self._shard()[0] += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        # Not meant to be mixed with inc/dec from other threads
+        with self._lock:
+            for values in self._shards:
+                values[0] = 0.0
+            self._base = value
+
+    def value(self) -> float:
+        return self._base + self._totals()[0]
+
+
+class HistogramSeries(_Series):
+    def __init__(self, buckets: Tuple[float, ...]):
+        # One count per bucket, then the sum of observations
+        super().__init__(len(buckets) + 1)
+        self.buckets = buckets
+
+    def observe(self, value: float):
+        # The shard is looked up inline, this runs on every request
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._shard()
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def counts(self) -> Tuple[List[int], float]:
+        """Observations per bucket, not cumulative, and their sum."""
+        totals = self._totals()
+        return [int(count) for count in totals[:-1]], totals[-1]
+
+    def snapshot(self) -> Dict[str, float]:
+        counts, total = self.counts()
+        return {"count": sum(counts), "sum": total}
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        """
+        Initialize a metric.
+
+        Args:
+            name (str): Metric name, e.g. llm_calls_total
+            help (str): One-line description shown in the exposition
+            labels (Sequence[str]): Label names every update must set
+        """
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> _Series:
+        raise NotImplementedError
+
+    def labels(self, **labels: str):
+        """Return the series for these label values, creating it on first use."""
+        if len(labels) != len(self.label_names) or set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        key = tuple(str(labels[name]) for name in self.label_names)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], _Series]]:
+        with self._lock:
+            return sorted(self._series.items(), key=lambda item: item[0])
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(series.value())}"
+                for key, series in self._items()]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self) -> CounterSeries:
+        return CounterSeries()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        self.labels(**labels).inc(amount)
+
+    def value(self, **labels: str) -> float:
+        return self.labels(**labels).value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self) -> GaugeSeries:
+        return GaugeSeries()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        self.labels(**labels).inc(amount)
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.labels(**labels).dec(amount)
+
+    def set(self, value: float, **labels: str):
+        self.labels(**labels).set(value)
+
+    def value(self, **labels: str) -> float:
+        return self.labels(**labels).value()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Initialize a histogram.
+
+        Args:
+            name (str): Metric name, e.g. llm_call_duration_seconds
+            help (str): One-line description shown in the exposition
+            labels (Sequence[str]): Label names every observation must set
+            buckets (Iterable[float]): Upper bounds; +Inf is added
+        """
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_series(self) -> HistogramSeries:
+        return HistogramSeries(self.buckets)
+
+    def observe(self, value: float, **labels: str):
+        self.labels(**labels).observe(value)
+
+    def snapshot(self, **labels: str) -> Dict[str, float]:
+        """Count and sum of the observations with these labels."""
+        return self.labels(**labels).snapshot()
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, series in self._items():
+            counts, total = series.counts()
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, kind: type, name: str, help: str, labels: Sequence[str],
+                  *args) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = kind(name, help, labels, *args)
+            elif type(metric) is not kind or metric.label_names != tuple(labels):
+                raise ValueError(f"{name} is already registered as a {metric.kind} "
+                                 f"with labels {metric.label_names}")
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Process-wide registry served by GET /metrics
+registry = MetricsRegistry()
+register_footprint("metrics", lambda: registry)
@@ -0,0 +1,151 @@
+"""
+ASGI middleware recording request metrics per route.
+
+For every HTTP request it records latency, request and response body
+sizes and the response status, labelled with the method and the route
+template (e.g. /api/habits/{habit_id}) rather than the raw path, so the
+number of series stays bounded. Requests that match no route are
+labelled "unmatched". The number of requests in flight is a gauge.
+
+TracingMiddleware opens the root span of each request's trace.
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from .metrics import MetricsRegistry, registry as default_registry
+from .tracing import Tracer, get_tracer
+
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+UNMATCHED = "unmatched"
+
+Scope = Dict[str, Any]
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: Callable, registry: MetricsRegistry = default_registry):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (Callable): ASGI app being measured
+            registry (MetricsRegistry): Registry the metrics are recorded in
+        """
+        self.app = app
+        labels = ("method", "route")
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "Time to handle HTTP requests", labels)
+        self.request_size = registry.histogram(
+            "http_request_size_bytes", "Body size of HTTP requests", labels, SIZE_BUCKETS)
+        self.response_size = registry.histogram(
+            "http_response_size_bytes", "Body size of HTTP responses", labels, SIZE_BUCKETS)
+        self.responses = registry.counter(
+            "http_responses_total", "HTTP responses by status code", labels + ("status",))
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "HTTP requests being handled").labels()
+        # (method, route) -> series, so labels are only resolved once per route
+        self._series: Dict[Tuple[str, str], Tuple[Any, Any, Any, Dict[int, Any]]] = {}
+
+    def _route_series(self, method: str, route: str):
+        series = self._series.get((method, route))
+        if series is None:
+            series = self._series[(method, route)] = (
+                self.duration.labels(method=method, route=route),
+                self.request_size.labels(method=method, route=route),
+                self.response_size.labels(method=method, route=route),
+                {},
+            )
+        return series
+
+    def _status_series(self, method: str, route: str, statuses: Dict[int, Any], status: int):
+        series = statuses.get(status)
+        if series is None:
+            series = statuses[status] = self.responses.labels(
+                method=method, route=route, status=str(status))
+        return series
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        received = 0
+        sent = 0
+        status = 500
+
+        # The declared length is used when there is one, which saves wrapping
+        # receive; only chunked request bodies are counted as they arrive
+        chunked = False
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                received = int(value) if value.isdigit() else 0
+                break
+            if name == b"transfer-encoding":
+                chunked = True
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, counting_receive if chunked else receive, counting_send)
+        finally:
+            self.in_flight.dec()
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED)
+            method = scope["method"]
+            duration, request_size, response_size, statuses = self._route_series(method, path)
+            duration.observe(time.perf_counter() - start)
+            request_size.observe(received)
+            response_size.observe(sent)
+            (statuses.get(status) or self._status_series(method, path, statuses, status)).inc()
+
+
+class TracingMiddleware:
+    def __init__(self, app: Callable, tracer: Optional[Tracer] = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (Callable): ASGI app being traced
+            tracer (Tracer, optional): Tracer, defaults to the process-wide one
+                looked up per request
+        """
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable):
+        tracer = self.tracer or get_tracer()
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.span("HTTP " + scope["method"], **{
+                "http.method": scope["method"], "http.target": scope["path"]}) as span:
+            trace_header = (b"x-trace-id", span.trace_id.encode())
+
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    span.attributes["http.status_code"] = message["status"]
+                    message = {**message, "headers": [*message.get("headers", ()), trace_header]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            finally:
+                # Named after the route template once the router has matched it
+                route = getattr(scope.get("route"), "path", UNMATCHED)
+                span.name = f"{scope['method']} {route}"
+                span.attributes["http.route"] = route
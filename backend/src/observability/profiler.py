@@ -0,0 +1,183 @@
+"""
+Sampling CPU profiler for the running process.
+
+A profile is taken on demand: for a bounded time, a thread reads the
+stack of every other thread at a fixed interval and counts identical
+stacks. Nothing runs between profiles. Threads waiting on a lock, queue
+or selector are left out unless idle stacks are asked for, so the event
+loop waiting for I/O does not drown out the work.
+
+Profiles are rendered as collapsed stacks, the input of flamegraph.pl and
+most flame graph viewers, or as speedscope JSON.
+"""
+
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from src.config.ai_config import DIAGNOSTICS_CONFIG
+
+STDLIB = sysconfig.get_paths()["stdlib"] + "/"
+
+# (function, file, first line)
+Frame = Tuple[str, str, int]
+
+# Innermost Python frames of threads blocked in C waiting for work
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one runs."""
+
+
+def _short_path(filename: str) -> str:
+    # The standard library, installed packages and the app are shown from
+    # their package root
+    if filename.startswith(STDLIB):
+        return filename[len(STDLIB):]
+    index = filename.rfind("/site-packages/")
+    if index >= 0:
+        return filename[index + len("/site-packages/"):]
+    index = filename.rfind("/src/")
+    return filename[index + 1:] if index >= 0 else filename
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append((getattr(code, "co_qualname", code.co_name),
+                       _short_path(code.co_filename), code.co_firstlineno))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+def _is_idle(stack: Tuple[Frame, ...]) -> bool:
+    if not stack:
+        return True
+    name, filename, _ = stack[-1]
+    return (filename.rsplit("/", 1)[-1], name.rsplit(".", 1)[-1]) in IDLE_LEAVES
+
+
+class Profile:
+    def __init__(self, stacks: Counter, interval: float, duration: float, samples: int):
+        """
+        Initialize a finished profile.
+
+        Args:
+            stacks (Counter): (thread name, *frames) to times seen
+            interval (float): Seconds between samples
+            duration (float): Seconds the profile ran
+            samples (int): Sampling rounds taken
+        """
+        self.stacks = stacks
+        self.interval = interval
+        self.duration = duration
+        self.samples = samples
+
+    def collapsed(self) -> str:
+        """One "thread;outer;...;inner count" line per distinct stack."""
+        lines = []
+        for (thread, *frames), count in sorted(self.stacks.items()):
+            labels = [thread] + [f"{name} ({filename}:{line})" for name, filename, line in frames]
+            lines.append(f"{';'.join(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """The profile in speedscope's file format, one sampled profile per thread."""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Frame, int] = {}
+        threads: Dict[str, Dict[str, List]] = {}
+        weight = round(self.interval * 1000, 3)
+        for (thread, *stack), count in sorted(self.stacks.items()):
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                ids.append(index[frame])
+            profile = threads.setdefault(thread, {"samples": [], "weights": []})
+            profile["samples"].append(ids)
+            profile["weights"].append(weight * count)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "healthhabit",
+            "name": f"CPU profile, {self.duration:.1f}s",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(profile["weights"]), 3),
+                "samples": profile["samples"],
+                "weights": profile["weights"],
+            } for thread, profile in threads.items()],
+        }
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = DIAGNOSTICS_CONFIG["profile_interval_ms"] / 1000):
+        """
+        Initialize a profiler.
+
+        Args:
+            interval (float): Default seconds between samples
+        """
+        self.interval = interval
+        self._running = threading.Lock()
+
+    def profile(self, seconds: float, interval: Optional[float] = None,
+                idle: bool = False) -> Profile:
+        """
+        Sample all other threads for a while; blocks the calling thread.
+
+        Args:
+            seconds (float): How long to sample
+            interval (float, optional): Seconds between samples
+            idle (bool): Keep stacks of threads waiting for work
+
+        Returns:
+            Profile: Counted stacks
+
+        Raises:
+            ProfilerBusy: If another profile is running
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            interval = interval or self.interval
+            me = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks: Counter = Counter()
+            samples = 0
+            start = time.monotonic()
+            deadline = start + seconds
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stack = _stack(frame)
+                    if not idle and _is_idle(stack):
+                        continue
+                    if ident not in names:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    stacks[(names.get(ident, f"thread-{ident}"),) + stack] += 1
+                samples += 1
+                time.sleep(interval)
+            return Profile(stacks, interval, time.monotonic() - start, samples)
+        finally:
+            self._running.release()
+
+
+# Process-wide profiler used by the admin endpoints
+profiler = SamplingProfiler()
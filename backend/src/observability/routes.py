@@ -0,0 +1,23 @@
+"""
+Route class tracing FastAPI route handlers.
+
+Routers built with `APIRouter(route_class=TracedRoute)` run each request's
+handler, parameter validation and response serialization included, in a
+span below the request's root span. Not exported from src.observability,
+so importing the package does not import FastAPI.
+"""
+
+from typing import Callable
+from fastapi.routing import APIRoute
+from .tracing import get_tracer
+
+
+class TracedRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        name = f"route {self.endpoint.__name__}"
+
+        async def traced_handler(request):
+            with get_tracer().span(name, **{"code.function": self.endpoint.__qualname__}):
+                return await handler(request)
+        return traced_handler
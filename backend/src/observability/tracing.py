@@ -0,0 +1,314 @@
+"""
+Lightweight request tracing.
+
+A span times one operation. A span opened while another one is current
+becomes its child: the current span is a context variable, so it follows
+a request across await points and into threads started with
+contextvars.copy_context. Code on other threads passes the parent
+explicitly.
+
+All spans of a trace are collected while its root span is open. When the
+root ends, the trace is exported if it was sampled (sample_rate) or took
+longer than the slow threshold, so slow requests are always captured.
+Exported traces are appended to a file as OTLP-JSON, one trace per line,
+by a background thread. Spans that end after their root, e.g. an LLM call
+that outlived its route's deadline, are not exported.
+"""
+
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from src.config.ai_config import TRACING_CONFIG
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans", "sampled", "dropped")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.sampled = sampled
+        self.dropped = 0
+
+
+class Span:
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start_ns", "end_ns", "_started",
+                 "attributes", "error")
+
+    def __init__(self, name: str, trace: _Trace, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        """
+        Initialize and start a span.
+
+        Args:
+            name (str): Operation name, e.g. "HabitService.create_habit"
+            trace (_Trace): Trace the span belongs to
+            parent_id (str, optional): Span id of the parent, None for a root
+            attributes (Dict[str, Any]): Initial attributes
+        """
+        self.name = name
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end, or until now while open."""
+        end = self.end_ns if self.end_ns is not None else self.start_ns + (
+            time.perf_counter_ns() - self._started)
+        return (end - self.start_ns) / 1e9
+
+    def set(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._started)
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def to_otlp(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Encode the spans of one trace as an OTLP-JSON ExportTraceServiceRequest."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", service_name)]},
+        "scopeSpans": [{
+            "scope": {"name": "src.observability.tracing"},
+            "spans": [{
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                "name": span.name,
+                "kind": 2 if span.parent_id is None else 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [_attribute(key, value) for key, value in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            } for span in spans],
+        }],
+    }]}
+
+
+class FileExporter:
+    def __init__(self, path: str, service_name: str = TRACING_CONFIG["service_name"]):
+        """
+        Initialize an exporter appending OTLP-JSON lines to a file.
+
+        Args:
+            path (str): File traces are appended to
+            service_name (str): service.name resource attribute
+        """
+        self.path = path
+        self.service_name = service_name
+        self._queue: "queue.SimpleQueue[Optional[List[Span]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Condition(self._lock)
+
+    def export(self, spans: List[Span]):
+        """Queue a finished trace; it is written by a background thread."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="trace-exporter",
+                                                daemon=True)
+                self._thread.start()
+            self._pending += 1
+        self._queue.put(spans)
+
+    def _write_loop(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            spans = self._queue.get()
+            try:
+                line = json.dumps(to_otlp(spans, self.service_name), separators=(",", ":"))
+                with open(self.path, "a") as f:
+                    f.write(line + "\n")
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    self._idle.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued traces are written; False on timeout."""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+
+class Tracer:
+    def __init__(self, enabled: bool = TRACING_CONFIG["enabled"],
+                 sample_rate: float = TRACING_CONFIG["sample_rate"],
+                 slow_ms: float = TRACING_CONFIG["slow_ms"],
+                 exporter: Optional[FileExporter] = None,
+                 max_spans: int = TRACING_CONFIG["max_spans"],
+                 rng: Callable[[], float] = random.random):
+        """
+        Initialize a tracer.
+
+        Args:
+            enabled (bool): Whether spans are recorded at all
+            sample_rate (float): Share of traces exported regardless of duration
+            slow_ms (float): Traces whose root takes longer are always exported
+            exporter (FileExporter, optional): Receives exported traces,
+                defaults to a FileExporter on TRACING_CONFIG["file"]
+            max_spans (int): Spans kept per trace
+            rng (Callable): Sampling draw, replaceable in tests
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.exporter = exporter if exporter is not None else FileExporter(TRACING_CONFIG["file"])
+        self.max_spans = max_spans
+        self._rng = rng
+        self._lock = threading.Lock()
+        self.counters = {"traces": 0, "sampled": 0, "slow": 0, "dropped_spans": 0}
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Run the block in a span.
+
+        Args:
+            name (str): Operation name
+            parent (Span, optional): Parent on another thread; defaults to the
+                current span, and without one a new trace is started
+            **attributes: Initial span attributes
+
+        Yields:
+            Optional[Span]: The span, or None while tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+        parent = parent if parent is not None else _current_span.get()
+        if parent is None:
+            trace = _Trace(f"{random.getrandbits(128):032x}", self._rng() < self.sample_rate)
+        else:
+            trace = parent.trace
+        span = Span(name, trace, parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            if len(trace.spans) < self.max_spans:
+                trace.spans.append(span)
+            else:
+                trace.dropped += 1
+            if parent is None:
+                self._end_trace(span)
+
+    def _end_trace(self, root: Span):
+        trace = root.trace
+        slow = root.duration * 1000 >= self.slow_ms
+        with self._lock:
+            self.counters["traces"] += 1
+            self.counters["dropped_spans"] += trace.dropped
+            if trace.sampled:
+                self.counters["sampled"] += 1
+            elif slow:
+                self.counters["slow"] += 1
+        if trace.sampled or slow:
+            # Spans of a trace are appended as they end, the root last
+            self.exporter.export(list(trace.spans))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "enabled": self.enabled, "sample_rate": self.sample_rate,
+                    "slow_ms": self.slow_ms}
+
+
+def current_span() -> Optional[Span]:
+    """The span of the running operation, if it is traced."""
+    return _current_span.get()
+
+
+def annotate(**attributes: Any):
+    """Add attributes to the current span, if there is one."""
+    span = _current_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Return the process-wide tracer, building it on first use.
+
+    Returns:
+        Tracer: Tracer configured from TRACING_CONFIG
+    """
+    global _tracer
+    # Double-checked locking: the lock is only taken until the tracer exists
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+    return _tracer
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorate a function or coroutine function to run in a span.
+
+    Args:
+        name (str, optional): Span name, defaults to the function's qualified name
+    """
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                tracer = get_tracer()
+                if not tracer.enabled:
+                    return await fn(*args, **kwargs)
+                with tracer.span(span_name):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                tracer = get_tracer()
+                if not tracer.enabled:
+                    return fn(*args, **kwargs)
+                with tracer.span(span_name):
+                    return fn(*args, **kwargs)
+        return wrapper
+    return decorate
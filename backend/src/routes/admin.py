@@ -0,0 +1,76 @@
+import asyncio
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Literal, Optional
+from src.config.ai_config import DIAGNOSTICS_CONFIG
+from src.observability import ProfilerBusy, footprint, memory_snapshots, profiler
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured admin token."""
+    expected = DIAGNOSTICS_CONFIG["admin_token"]
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled, set ADMIN_TOKEN")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile")
+async def cpu_profile(
+    seconds: float = Query(5.0, gt=0, le=DIAGNOSTICS_CONFIG["max_profile_seconds"]),
+    format: Literal["collapsed", "speedscope"] = "collapsed",
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+    idle: bool = False
+):
+    """Sample the stacks of all threads for a while and return the profile"""
+    try:
+        # Sampling runs on a worker thread so the event loop shows up in it
+        result = await asyncio.to_thread(
+            profiler.profile, seconds, interval_ms / 1000 if interval_ms else None, idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "speedscope":
+        return result.speedscope()
+    return PlainTextResponse(result.collapsed())
+
+
+@router.post("/memory/snapshots", status_code=201)
+async def take_memory_snapshot():
+    """Take a tracemalloc snapshot; the first one starts tracing"""
+    return await asyncio.to_thread(memory_snapshots.take)
+
+
+@router.get("/memory/snapshots")
+async def list_memory_snapshots():
+    """List the kept snapshots"""
+    return {"tracing": memory_snapshots.tracing, "snapshots": memory_snapshots.list()}
+
+
+@router.delete("/memory/snapshots", status_code=204)
+async def clear_memory_snapshots():
+    """Drop all snapshots and stop tracing"""
+    memory_snapshots.clear()
+
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    first: int,
+    second: int,
+    limit: int = Query(20, ge=1, le=500),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno"
+):
+    """Largest allocation changes from one snapshot to another"""
+    try:
+        return await asyncio.to_thread(memory_snapshots.diff, first, second, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Snapshot {e.args[0]} not found")
+
+
+@router.get("/memory/footprint")
+async def memory_footprint():
+    """Memory held by each subsystem and the process's resident size"""
+    return await asyncio.to_thread(footprint)
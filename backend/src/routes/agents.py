@@ -1,84 +1,192 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
-from datetime import datetime
-from src.agents import PlannerAgent, TrackerAgent, AnalyzerAgent, MotivatorAgent
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from typing import Callable, Dict, Any, List, Optional
+from datetime import date, datetime
+from src.agents import CelebrationPrefetcher, FallbackTier, Lazy, get_agent
+from src.agents.prefetch import celebration_key
+from src.batch import ARTIFACTS, get_artifact_store, habits_fingerprint
+from src.llm import (
+    INTERACTIVE, AdmissionTimeout, CircuitOpenError, DeadlineExceeded, LLMError, RateLimitError,
+    current_user, llm_context, record_cache_hit, token_ledger
+)
+from src.observability import register_footprint
+from src.observability.routes import TracedRoute
+from src.routes.admin import require_admin
+from src.routes.habits import habit_controller
+from src.services.events import HABIT_COMPLETED, habit_events
+from src.workflows import WorkflowError, build_daily_digest
 
-router = APIRouter()
 
-# Initialize agents
-planner_agent = PlannerAgent()
-tracker_agent = TrackerAgent()
-analyzer_agent = AnalyzerAgent()
-motivator_agent = MotivatorAgent()
+async def interactive_llm_context(x_user_id: Optional[str] = Header(None)):
+    """Schedule LLM calls made by agent routes as interactive, per user."""
+    with llm_context(priority=INTERACTIVE, user_id=x_user_id):
+        yield
+
+
+router = APIRouter(route_class=TracedRoute, dependencies=[Depends(interactive_llm_context)])
+
+# Agents are built on first use, see src/agents/registry.py
+daily_digest_workflow = Lazy(lambda: build_daily_digest(
+    get_agent("planner"), get_agent("tracker"),
+    get_agent("analyzer"), get_agent("motivator")))
+
+# Celebrations are generated speculatively when a completion crosses a
+# streak milestone, see src/agents/prefetch.py
+celebration_prefetcher = Lazy(CelebrationPrefetcher)
+habit_events.subscribe(HABIT_COMPLETED, lambda event: celebration_prefetcher().on_habit_completed(event))
+
+# Short-form routes answer locally once their deadline passes, see
+# src/agents/fallback.py
+fallback_tier = Lazy(FallbackTier)
+
+register_footprint("celebration_prefetcher",
+                   lambda: celebration_prefetcher() if celebration_prefetcher.built else None)
+register_footprint("fallback_tier", lambda: fallback_tier() if fallback_tier.built else None)
+
+
+def agent_error(e: Exception) -> HTTPException:
+    """
+    Map an agent failure to an HTTP error.
+
+    Deadlines become 504, an unavailable or rate-limiting provider 503 with
+    Retry-After, other provider errors 502 and anything else 500.
+    """
+    # Workflow step failures wrap the agent error
+    cause = e.__cause__ if isinstance(e, WorkflowError) and e.__cause__ else e
+    if isinstance(cause, DeadlineExceeded):
+        return HTTPException(status_code=504, detail=str(e))
+    if isinstance(cause, (CircuitOpenError, RateLimitError, AdmissionTimeout)):
+        headers = {"Retry-After": str(max(1, round(cause.retry_after)))} if cause.retry_after else None
+        return HTTPException(status_code=503, detail=str(e), headers=headers)
+    if isinstance(cause, LLMError):
+        return HTTPException(status_code=502, detail=str(e))
+    return HTTPException(status_code=500, detail=str(e))
+
+
+def _stored_output(user_id: str, artifact: str, day: date, habits: str) -> Optional[str]:
+    return get_artifact_store().get_fresh(user_id, artifact, ARTIFACTS[artifact].day(day), habits)
+
+
+async def precomputed(artifact: str, response: Response, day: Optional[date] = None) -> Optional[str]:
+    """
+    Return the precomputed output for the requesting user, if fresh.
+
+    Outputs are generated off-peak by `python -m src.batch` and looked up
+    by the X-User-ID header and the requested day (today by default). They
+    are only served while the user's habits in the store are the ones the
+    output was generated from; responses served from the store are marked
+    with X-Precomputed.
+    """
+    user_id = current_user.get()
+    if not user_id:
+        return None
+    habits = await habit_controller.habit_service.get_user_habits(user_id)
+    if not habits:
+        return None
+    # SQLite blocks; keep it off the event loop
+    content = await asyncio.to_thread(
+        _stored_output, user_id, artifact, day or date.today(), habits_fingerprint(habits))
+    if content is not None:
+        response.headers["X-Precomputed"] = "true"
+        if ARTIFACTS[artifact].method:
+            record_cache_hit(ARTIFACTS[artifact].method, "precomputed")
+    return content
+
+
+async def with_fallback(method: str, generate: Callable[[], str], response: Response,
+                        variant: str = "", **inputs: Any) -> str:
+    """
+    Run an agent call behind the fallback tier.
+
+    Responses produced locally are marked with X-Fallback ("cached" or
+    "template"); the LLM call keeps running to warm the cache.
+    """
+    content, fallback = await fallback_tier().call(method, generate, inputs, variant)
+    if fallback:
+        response.headers["X-Fallback"] = fallback
+    return content
+
 
 # Planner Agent Routes
 
 
 @router.post("/planner/weekly-plan")
 async def create_weekly_plan(user_preferences: Dict[str, Any]):
-    """Create a personalized weekly health plan"""
+    """Create a personalized health plan"""
     try:
-        return planner_agent.create_weekly_plan(user_preferences)
+        return await asyncio.to_thread(get_agent("planner").create_daily_plan, user_preferences)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 
 @router.post("/planner/adjust-goals")
 async def adjust_goals(current_goals: Dict[str, Any], performance_data: Dict[str, Any]):
-    """Adjust goals based on performance"""
+    """Adjust the plan based on performance"""
     try:
-        return planner_agent.adjust_goals(current_goals, performance_data)
+        return await asyncio.to_thread(get_agent("planner").adjust_plan, performance_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 # Tracker Agent Routes
 
 
 @router.post("/tracker/log-daily")
-async def log_daily_data(habit_data: Dict[str, Any]):
+async def log_daily_data(habit_data: Dict[str, Any], response: Response):
     """Log daily habit data"""
     try:
-        return tracker_agent.log_daily_data(habit_data)
+        return await with_fallback(
+            "tracker.log_daily_data",
+            lambda: get_agent("tracker").log_daily_data(habit_data),
+            response, data=habit_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 
 @router.post("/tracker/daily-report")
-async def generate_daily_report(date: datetime, habit_data: Dict[str, Any]):
+async def generate_daily_report(date: datetime, habit_data: Dict[str, Any], response: Response):
     """Generate daily report"""
     try:
-        return tracker_agent.generate_daily_report(date, habit_data)
+        stored = await precomputed("daily-report", response, date.date())
+        if stored is not None:
+            return stored
+        return await with_fallback(
+            "tracker.generate_daily_report",
+            lambda: get_agent("tracker").generate_daily_report(habit_data),
+            response, data=habit_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 
 @router.post("/tracker/check-consistency")
 async def check_consistency(weekly_data: List[Dict[str, Any]]):
     """Check habit consistency"""
     try:
-        return tracker_agent.check_consistency(weekly_data)
+        return await asyncio.to_thread(get_agent("tracker").check_consistency, weekly_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 # Analyzer Agent Routes
 
 
 @router.post("/analyzer/weekly-progress")
-async def analyze_weekly_progress(weekly_data: List[Dict[str, Any]]):
+async def analyze_weekly_progress(weekly_data: List[Dict[str, Any]], response: Response):
     """Analyze weekly progress"""
     try:
-        return analyzer_agent.analyze_weekly_progress(weekly_data)
+        stored = await precomputed("weekly-analysis", response)
+        if stored is not None:
+            return stored
+        return await asyncio.to_thread(get_agent("analyzer").analyze_weekly_progress, weekly_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 
 @router.post("/analyzer/behavior-patterns")
 async def identify_behavior_patterns(historical_data: List[Dict[str, Any]]):
     """Identify behavior patterns"""
     try:
-        return analyzer_agent.identify_behavior_patterns(historical_data)
+        return await asyncio.to_thread(get_agent("analyzer").identify_behavior_patterns, historical_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 
 @router.post("/analyzer/insights-report")
@@ -87,11 +195,11 @@ async def generate_insights_report(
     data: List[Dict[str, Any]],
     goals: Dict[str, Any]
 ):
-    """Generate insights report"""
+    """Generate insights report over the given data; time_period only labels the request"""
     try:
-        return analyzer_agent.generate_insights_report(time_period, data, goals)
+        return await asyncio.to_thread(get_agent("analyzer").generate_insights_report, data, goals)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 # Motivator Agent Routes
 
@@ -99,13 +207,20 @@ async def generate_insights_report(
 @router.post("/motivator/daily-motivation")
 async def provide_daily_motivation(
     user_data: Dict[str, Any],
-    recent_achievements: List[str]
+    recent_achievements: List[str],
+    response: Response
 ):
     """Provide daily motivation"""
     try:
-        return motivator_agent.provide_daily_motivation(user_data, recent_achievements)
+        stored = await precomputed("daily-motivation", response)
+        if stored is not None:
+            return stored
+        return await with_fallback(
+            "motivator.provide_daily_motivation",
+            lambda: get_agent("motivator").provide_daily_motivation(user_data, recent_achievements),
+            response, daily_data=user_data, achievements=recent_achievements)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 
 @router.post("/motivator/suggest-challenges")
@@ -115,18 +230,74 @@ async def suggest_challenges(
 ):
     """Suggest health challenges"""
     try:
-        return motivator_agent.suggest_challenges(user_preferences, current_goals)
+        return await asyncio.to_thread(
+            get_agent("motivator").suggest_challenges, user_preferences, current_goals)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
 
 
 @router.post("/motivator/celebration")
 async def generate_celebration_message(
     achievement: str,
-    user_data: Dict[str, Any]
+    user_data: Dict[str, Any],
+    response: Response
 ):
     """Generate celebration message"""
+    prefetched = celebration_prefetcher().take(current_user.get(), achievement)
+    if prefetched is not None:
+        try:
+            message = await asyncio.wrap_future(prefetched)
+            response.headers["X-Prefetched"] = "true"
+            return message
+        except Exception:
+            # The speculative call failed; generate the message live instead
+            celebration_prefetcher().record_failure()
     try:
-        return motivator_agent.generate_celebration_message(achievement, user_data)
+        return await with_fallback(
+            "motivator.generate_celebration_message",
+            lambda: get_agent("motivator").generate_celebration_message(achievement, user_data),
+            response, variant=celebration_key(None, achievement)[1],
+            achievement=achievement, context=user_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
+
+
+@router.get("/motivator/celebration/prefetch-stats")
+async def celebration_prefetch_stats():
+    """Hit and waste rates of speculative celebration prefetches"""
+    return celebration_prefetcher().stats()
+
+
+@router.get("/fallback-stats")
+async def fallback_stats():
+    """How often short-form routes answered locally"""
+    return fallback_tier().stats()
+
+
+@router.get("/token-usage", dependencies=[Depends(require_admin)])
+async def token_usage(user_id: Optional[str] = None):
+    """LLM calls and tokens per user, or of one user, in this worker; needs the admin token"""
+    return token_ledger.totals(user_id)
+
+# Workflow Routes
+
+
+@router.post("/workflows/daily-digest")
+async def run_daily_digest(
+    preferences: Dict[str, Any],
+    daily_data: Dict[str, Any],
+    weekly_data: List[Dict[str, Any]],
+    achievements: List[str],
+    goals: Dict[str, Any]
+):
+    """Run all agents for the daily digest concurrently"""
+    try:
+        return await daily_digest_workflow().run(
+            preferences=preferences,
+            daily_data=daily_data,
+            weekly_data=weekly_data,
+            achievements=achievements,
+            goals=goals
+        )
+    except WorkflowError as e:
+        raise agent_error(e)
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Header, HTTPException
+from typing import List, Optional
 from uuid import UUID
 from src.models.habit import Habit, HabitCreate, HabitUpdate
 from src.controllers.habit_controller import HabitController
+from src.observability import register_footprint
+from src.observability.routes import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 habit_controller = HabitController()
+register_footprint("habit_store", lambda: habit_controller.habit_service.habits)
 
 
 @router.get("/", response_model=List[Habit])
@@ -57,3 +60,16 @@ async def delete_habit(habit_id: str):
         return {"message": "Habit deleted successfully"}
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid habit ID format")
+
+
+@router.post("/{habit_id}/complete", response_model=Habit)
+async def complete_habit(habit_id: str, x_user_id: Optional[str] = Header(None)):
+    """Mark a habit as completed for today"""
+    try:
+        uuid = UUID(habit_id)
+        habit = await habit_controller.complete_habit(uuid, x_user_id)
+        if not habit:
+            raise HTTPException(status_code=404, detail="Habit not found")
+        return habit
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid habit ID format")
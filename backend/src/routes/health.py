@@ -0,0 +1,17 @@
+import os
+from fastapi import APIRouter, Request, Response
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def ready(request: Request, response: Response):
+    """Whether this worker has warmed up and takes traffic; 503 until then"""
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        # The lifespan has not run yet
+        response.status_code = 503
+        return {"status": "starting", "pid": os.getpid()}
+    if not warmup.ready:
+        response.status_code = 503
+    return {**warmup.status(), "pid": os.getpid()}
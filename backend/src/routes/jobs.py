@@ -0,0 +1,30 @@
+import asyncio
+from fastapi import APIRouter, Header, HTTPException, Query
+from typing import Optional
+from src.config.ai_config import JOBS_CONFIG
+from src.jobs import get_job_runner
+from src.models.job import Job, JobCreate
+from src.observability.routes import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.post("/", response_model=Job, status_code=202)
+async def submit_job(job: JobCreate, x_user_id: Optional[str] = Header(None)):
+    """Queue a long-running agent task and return its id right away"""
+    try:
+        # The store write blocks; keep it off the event loop
+        return await asyncio.to_thread(get_job_runner().submit, job.kind, job.params, x_user_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job kind: {job.kind}")
+    except TypeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid params for {job.kind}: {e}")
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: str, wait: float = Query(0, ge=0)):
+    """Get a job; with wait, hold the request until it finishes or wait seconds pass"""
+    job = await get_job_runner().wait(job_id, min(wait, JOBS_CONFIG["max_wait"]))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
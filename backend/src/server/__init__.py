@@ -0,0 +1,5 @@
+from .warmup import Warmup
+
+__all__ = [
+    'Warmup'
+]
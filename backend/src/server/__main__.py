@@ -0,0 +1,32 @@
+"""
+Run the API with pre-forked, warmed-up workers, e.g. behind a load balancer.
+
+Usage:
+    python -m src.server [--app full|habits] [--workers 4] [--port 8000] [--no-preload]
+"""
+
+import argparse
+import logging
+import sys
+from src.config.ai_config import SERVER_CONFIG
+from .launcher import APPS, Launcher
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", choices=sorted(APPS), default=SERVER_CONFIG["app"],
+                        help="app to serve (default: %(default)s)")
+    parser.add_argument("--host", default=SERVER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG["port"])
+    parser.add_argument("--workers", type=int, default=SERVER_CONFIG["workers"],
+                        help="worker processes, 0 for one per CPU (default: %(default)s)")
+    parser.add_argument("--no-preload", dest="preload", action="store_false", default=SERVER_CONFIG["preload"],
+                        help="import the app in each worker instead of once before forking")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", default=SERVER_CONFIG["warmup"],
+                        help="report workers ready without warming them up")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [%(process)d] %(name)s: %(message)s")
+    # Read by the app's lifespan in every worker
+    SERVER_CONFIG["warmup"] = args.warmup
+    sys.exit(Launcher(args.app, args.host, args.port, args.workers, args.preload,
+                      log_level=args.log_level).serve())
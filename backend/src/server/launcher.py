@@ -0,0 +1,201 @@
+"""
+Pre-forking production server.
+
+The parent process binds the listening socket and, with preload, imports
+the app and its heavy dependencies once. It then freezes the garbage
+collector's view of those objects and forks the workers. The workers
+share the imported code and data copy-on-write instead of importing it
+each. Every worker runs uvicorn on the inherited socket; uvicorn uses
+uvloop and httptools when they are installed.
+
+The parent only supervises. It restarts workers that die and passes
+SIGTERM on to the workers, which finish their requests and run the app's
+shutdown.
+"""
+
+import gc
+import importlib
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, Optional
+from src.config.ai_config import SERVER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+APPS = {
+    "full": "src.api.main:app",
+    "habits": "src.app:app",
+}
+
+# Imported lazily by the full app on the first agent request; preloading
+# them in the parent shares them between workers
+PRELOAD_MODULES = {
+    "full": ("httpx", "litellm", "crewai"),
+    "habits": (),
+}
+
+# A worker dying sooner than this after its start is restarted with a delay
+MIN_WORKER_LIFETIME = 5.0
+
+
+def default_workers() -> int:
+    """One worker per CPU this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def import_app(name: str) -> Any:
+    """Import the ASGI app registered as `name` in APPS."""
+    module, attribute = APPS[name].split(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def _implementations() -> Dict[str, str]:
+    """The event loop and HTTP parser uvicorn's "auto" setting picks."""
+    def available(module: str) -> bool:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            return False
+        return True
+    return {"loop": "uvloop" if available("uvloop") else "asyncio",
+            "http": "httptools" if available("httptools") else "h11"}
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Launcher:
+    def __init__(self, app: str = SERVER_CONFIG["app"], host: str = SERVER_CONFIG["host"],
+                 port: int = SERVER_CONFIG["port"], workers: int = SERVER_CONFIG["workers"],
+                 preload: bool = SERVER_CONFIG["preload"],
+                 graceful_timeout: float = SERVER_CONFIG["graceful_timeout"],
+                 log_level: str = "info"):
+        """
+        Initialize the launcher.
+
+        Args:
+            app (str): Key in APPS, "full" or "habits"
+            host (str): Interface to listen on
+            port (int): Port to listen on
+            workers (int): Worker processes; 0 for one per CPU
+            preload (bool): Import the app before forking the workers
+            graceful_timeout (float): Seconds workers get to finish on shutdown
+            log_level (str): uvicorn log level
+        """
+        if app not in APPS:
+            raise ValueError(f"Unknown app {app!r}, expected one of {sorted(APPS)}")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers or default_workers()
+        self.preload = preload
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.children: Dict[int, float] = {}
+        self._stopping = False
+        self._socket: Optional[socket.socket] = None
+
+    def _preload(self):
+        start = time.perf_counter()
+        import_app(self.app)
+        for module in PRELOAD_MODULES[self.app]:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+        # Objects that exist now are never collected; the collector would
+        # otherwise touch them and copy their pages into every worker
+        gc.collect()
+        gc.freeze()
+        logger.info("Preloaded %s in %.1f s", APPS[self.app], time.perf_counter() - start)
+
+    def _uvicorn_config(self):
+        import uvicorn
+        # With preload the app is already imported, so this is only a lookup
+        return uvicorn.Config(
+            APPS[self.app], loop="auto", http="auto", lifespan="on",
+            timeout_graceful_shutdown=self.graceful_timeout, log_level=self.log_level)
+
+    def _run_worker(self) -> int:
+        """Body of a forked worker; returns its exit status."""
+        import uvicorn
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        server = uvicorn.Server(self._uvicorn_config())
+        server.run(sockets=[self._socket])
+        return 0 if server.started else 1
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                status = self._run_worker()
+            except BaseException:
+                logger.exception("Worker %d failed", os.getpid())
+            finally:
+                os._exit(status)
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+
+    def _on_signal(self, signum, frame):
+        self._stopping = True
+        # Ctrl+C already reached the workers through the process group; a
+        # second signal would make uvicorn skip its graceful shutdown
+        if signum == signal.SIGTERM:
+            for pid in list(self.children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def serve(self) -> int:
+        """Serve until SIGTERM or SIGINT; returns the exit status."""
+        self._socket = bind(self.host, self.port)
+        logger.info("Listening on %s:%d with %d %s workers (%s)", self.host, self.port,
+                    self.workers, self.app, ", ".join(_implementations().values()))
+        if not hasattr(os, "fork"):
+            # No fork on Windows; a single in-process server instead
+            import uvicorn
+            uvicorn.Server(self._uvicorn_config()).run(sockets=[self._socket])
+            return 0
+        SERVER_CONFIG["processes"] = self.workers
+        if self.preload:
+            self._preload()
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        for _ in range(self.workers):
+            self._spawn()
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            logger.warning("Worker %d exited with %d, restarting", pid, code)
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                # Crashing on startup; do not spin
+                time.sleep(1)
+            if not self._stopping:
+                self._spawn()
+        self._socket.close()
+        logger.info("All workers stopped")
+        return 0
+
@@ -0,0 +1,89 @@
+"""
+Worker warmup behind the readiness endpoint.
+
+The first request after a deploy should not pay for cold starts: loading
+the habit store, opening SQLite stores, importing and building the agents
+and the TLS handshake with the LLM API. Each app lists its warmup steps;
+they run one after another on a background thread once the app starts,
+and GET /ready answers 503 until they are done, so a load balancer only
+sends traffic to warm workers. A failing step is reported but does not
+keep the worker out of rotation, e.g. when the LLM API is briefly down.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WARMING = "warming"
+READY = "ready"
+STOPPING = "stopping"
+
+
+class Warmup:
+    def __init__(self, steps: Dict[str, Callable[[], Any]]):
+        """
+        Initialize a warmup.
+
+        Args:
+            steps (Dict[str, Callable]): Step name to blocking callable, run in order
+        """
+        self.steps = steps
+        self.state = WARMING
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def start(self):
+        """Run the steps on a background thread; without steps the worker is ready at once."""
+        self._started = time.monotonic()
+        if not self.steps:
+            self._finish()
+            return
+        # A daemon thread, so shutting down does not wait for a slow step
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        for name, step in self.steps.items():
+            if self.state == STOPPING:
+                return
+            start = time.perf_counter()
+            error = None
+            try:
+                step()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                logger.warning("Warmup step %s failed: %s", name, error)
+            self.results[name] = {"ms": round((time.perf_counter() - start) * 1000, 1), "error": error}
+        self._finish()
+
+    def _finish(self):
+        self._finished = time.monotonic()
+        if self.state == WARMING:
+            self.state = READY
+            logger.info("Worker ready after %.0f ms", (self._finished - self._started) * 1000)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the steps are done; False on timeout."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.state != WARMING
+
+    def stop(self):
+        """Report the worker as not ready while it shuts down."""
+        self.state = STOPPING
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": self.state,
+            "warmup_ms": round(((self._finished or time.monotonic()) - self._started) * 1000, 1),
+            "steps": dict(self.results),
+        }
@@ -0,0 +1,53 @@
+"""
+In-process publish/subscribe for domain events.
+
+Handlers run synchronously in the publishing thread, so they must be quick;
+anything slow should be handed off to a background executor.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+HABIT_COMPLETED = "habit.completed"
+
+
+class EventBus:
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event: str, handler: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        """
+        Register a handler for an event.
+
+        Args:
+            event (str): Event name, e.g. HABIT_COMPLETED
+            handler (Callable): Called with the event payload
+
+        Returns:
+            Callable: Removes the subscription when called
+        """
+        with self._lock:
+            self._handlers.setdefault(event, []).append(handler)
+
+        def unsubscribe():
+            with self._lock:
+                if handler in self._handlers.get(event, []):
+                    self._handlers[event].remove(handler)
+        return unsubscribe
+
+    def publish(self, event: str, payload: Dict[str, Any]):
+        """Call every handler of an event; a failing handler does not affect the others."""
+        with self._lock:
+            handlers = list(self._handlers.get(event, []))
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Handler for %s failed", event)
+
+
+habit_events = EventBus()
@@ -1,9 +1,46 @@
+import asyncio
 import json
-from typing import List, Optional
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple, TypeVar
 from uuid import UUID
 from datetime import datetime
 from pathlib import Path
+from src.config.ai_config import STORAGE_CONFIG
 from src.models.habit import Habit, HabitCreate, HabitUpdate
+from src.observability import annotate, registry, traced
+from src.services.events import HABIT_COMPLETED, habit_events
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where the store is single-process only
+    fcntl = None
+
+
+# Storage time split into file I/O and (de)serialization with validation
+store_seconds = registry.histogram(
+    "habit_store_seconds", "Time HabitService spends loading and saving habits",
+    ("operation", "phase"), (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+_load_io = store_seconds.labels(operation="load", phase="io")
+_load_parse = store_seconds.labels(operation="load", phase="serialization")
+_save_dump = store_seconds.labels(operation="save", phase="serialization")
+_save_io = store_seconds.labels(operation="save", phase="io")
+store_reloads = registry.counter(
+    "habit_store_reloads_total", "Reloads of the habit store after another process changed it").labels()
+
+# (inode, mtime in ns, size) of the file a process last read or wrote. Every
+# save replaces the file with a new one, so any change alters it.
+Signature = Tuple[int, int, int]
+
+T = TypeVar("T")
+
+
+def _signature(stat: os.stat_result) -> Signature:
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
 
 class UUIDEncoder(json.JSONEncoder):
@@ -16,77 +53,209 @@ class UUIDEncoder(json.JSONEncoder):
 
 
 class HabitService:
-    def __init__(self):
-        self.data_file = Path("data/habits.json")
+    def __init__(self, data_file: Optional[str] = None, shared: Optional[bool] = None):
+        """
+        Initialize the habit service.
+
+        Args:
+            data_file (str, optional): JSON file holding the habits, defaults
+                to STORAGE_CONFIG["habits_file"]
+            shared (bool, optional): Whether other processes use the same
+                file, defaults to STORAGE_CONFIG["shared"]
+        """
+        self.data_file = Path(data_file or STORAGE_CONFIG["habits_file"])
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        self.shared = STORAGE_CONFIG["shared"] if shared is None else shared
+        self._lock_path = self.data_file.with_name(self.data_file.name + ".lock")
+        self._lock_file = None
+        self._write_lock = threading.Lock()
+        self._signature: Optional[Signature] = None
         self._load_data()
 
+    @traced()
     def _load_data(self):
         """Load habits data from JSON file"""
-        if self.data_file.exists():
+        try:
+            start = time.perf_counter()
             with open(self.data_file, 'r') as f:
-                self.habits = {UUID(k): Habit(**v)
-                               for k, v in json.load(f).items()}
-        else:
+                # Taken from the open file, so it matches what is read even
+                # if another process replaces the file meanwhile
+                signature = _signature(os.fstat(f.fileno()))
+                text = f.read()
+        except FileNotFoundError:
             self.habits = {}
+            self._signature = None
+            return
+        read = time.perf_counter()
+        self.habits = {UUID(k): Habit(**v)
+                       for k, v in json.loads(text).items()}
+        self._signature = signature
+        parsed = time.perf_counter()
+        _load_io.observe(read - start)
+        _load_parse.observe(parsed - read)
+        annotate(habits=len(self.habits), io_ms=round((read - start) * 1000, 3),
+                 serialization_ms=round((parsed - read) * 1000, 3))
 
+    @traced()
     def _save_data(self):
         """Save habits data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump({str(k): v.model_dump()
-                      for k, v in self.habits.items()}, f, cls=UUIDEncoder)
+        start = time.perf_counter()
+        text = json.dumps({str(k): v.model_dump()
+                           for k, v in self.habits.items()}, cls=UUIDEncoder)
+        dumped = time.perf_counter()
+        # Written aside and renamed over the store, so readers in other
+        # processes see either the old or the new file, never a partial one
+        fd, temp_path = tempfile.mkstemp(dir=self.data_file.parent, prefix=f".{self.data_file.name}.")
+        try:
+            # mkstemp creates the file private to the owner
+            os.chmod(temp_path, 0o644)
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+                f.flush()
+                signature = _signature(os.fstat(f.fileno()))
+            os.replace(temp_path, self.data_file)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._signature = signature
+        written = time.perf_counter()
+        _save_dump.observe(dumped - start)
+        _save_io.observe(written - dumped)
+        annotate(habits=len(self.habits), bytes=len(text),
+                 serialization_ms=round((dumped - start) * 1000, 3),
+                 io_ms=round((written - dumped) * 1000, 3))
+
+    def refresh(self):
+        """Reload the habits if another process changed the file."""
+        if not self.shared:
+            return
+        try:
+            current = _signature(os.stat(self.data_file))
+        except FileNotFoundError:
+            current = None
+        if current != self._signature:
+            store_reloads.inc()
+            self._load_data()
+
+    @contextmanager
+    def _writing(self):
+        """
+        Hold the store for a read-modify-write.
 
+        In shared mode an exclusive lock on a lock file next to the store
+        serializes writers across processes, and the habits are reloaded
+        first if another process saved since they were read.
+        """
+        with self._write_lock:
+            if not self.shared or fcntl is None:
+                yield
+                return
+            if self._lock_file is None:
+                # Kept open, flock locks belong to the open file
+                self._lock_file = open(self._lock_path, 'a')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @traced()
     async def get_all_habits(self) -> List[Habit]:
         """Get all habits"""
+        self.refresh()
         return list(self.habits.values())
 
+    @traced()
+    async def get_user_habits(self, user_id: str) -> List[Habit]:
+        """Get the habits of one user"""
+        self.refresh()
+        return [habit for habit in self.habits.values() if str(habit.user_id) == user_id]
+
+    @traced()
     async def get_habit(self, habit_id: UUID) -> Optional[Habit]:
         """Get a specific habit by ID"""
+        self.refresh()
         return self.habits.get(habit_id)
 
+    async def _write(self, change: Callable[[], T]) -> T:
+        """
+        Run a read-modify-write of the store in a worker thread.
+
+        Taking the file lock waits for as long as another process holds it,
+        and saving blocks on disk; neither may stall the event loop.
+        """
+        def run() -> T:
+            with self._writing():
+                return change()
+        return await asyncio.to_thread(run)
+
+    @traced()
     async def create_habit(self, habit: HabitCreate) -> Habit:
         """Create a new habit"""
         new_habit = Habit(**habit.model_dump())
-        self.habits[new_habit.id] = new_habit
-        self._save_data()
-        return new_habit
 
+        def change() -> Habit:
+            self.habits[new_habit.id] = new_habit
+            self._save_data()
+            return new_habit
+        return await self._write(change)
+
+    @traced()
     async def update_habit(self, habit_id: UUID, habit: HabitUpdate) -> Optional[Habit]:
         """Update an existing habit"""
-        if habit_id not in self.habits:
-            return None
+        def change() -> Optional[Habit]:
+            if habit_id not in self.habits:
+                return None
 
-        existing_habit = self.habits[habit_id]
-        update_data = habit.model_dump(exclude_unset=True)
+            existing_habit = self.habits[habit_id]
+            update_data = habit.model_dump(exclude_unset=True)
 
-        for field, value in update_data.items():
-            setattr(existing_habit, field, value)
+            for field, value in update_data.items():
+                setattr(existing_habit, field, value)
 
-        existing_habit.updated_at = datetime.utcnow()
-        self._save_data()
-        return existing_habit
+            existing_habit.updated_at = datetime.utcnow()
+            self._save_data()
+            return existing_habit
+        return await self._write(change)
 
+    @traced()
     async def delete_habit(self, habit_id: UUID) -> bool:
         """Delete a habit"""
-        if habit_id in self.habits:
-            del self.habits[habit_id]
-            self._save_data()
-            return True
-        return False
+        def change() -> bool:
+            if habit_id in self.habits:
+                del self.habits[habit_id]
+                self._save_data()
+                return True
+            return False
+        return await self._write(change)
 
-    async def complete_habit(self, habit_id: UUID) -> Optional[Habit]:
+    @traced()
+    async def complete_habit(self, habit_id: UUID, user_id: Optional[str] = None) -> Optional[Habit]:
         """Mark a habit as completed"""
-        if habit_id not in self.habits:
-            return None
+        def change() -> Optional[Tuple[Habit, int]]:
+            if habit_id not in self.habits:
+                return None
 
-        habit = self.habits[habit_id]
-        habit.last_completed = datetime.utcnow()
-        habit.streak += 1
-        self._save_data()
+            habit = self.habits[habit_id]
+            previous_streak = habit.streak
+            habit.last_completed = datetime.utcnow()
+            habit.streak += 1
+            self._save_data()
+            return habit, previous_streak
+
+        completed = await self._write(change)
+        if completed is None:
+            return None
+        habit, previous_streak = completed
+        habit_events.publish(HABIT_COMPLETED, {"habit": habit, "previous_streak": previous_streak,
+                                               "user_id": user_id})
         return habit
 
+    @traced()
     async def get_habit_stats(self, habit_id: UUID) -> dict:
         """Get statistics for a specific habit"""
+        self.refresh()
         if habit_id not in self.habits:
             return {}
 
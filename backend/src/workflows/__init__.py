@@ -0,0 +1,9 @@
+from .engine import Step, Workflow, WorkflowError
+from .daily_digest import build_daily_digest
+
+__all__ = [
+    'Step',
+    'Workflow',
+    'WorkflowError',
+    'build_daily_digest'
+]
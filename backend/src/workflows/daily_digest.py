@@ -0,0 +1,44 @@
+"""
+Daily digest workflow combining all four agents.
+"""
+
+from src.workflows.engine import Step, Workflow
+
+
+def build_daily_digest(planner, tracker, analyzer, motivator) -> Workflow:
+    """
+    Build the daily digest workflow.
+
+    None of the agent calls depend on each other, so all steps run
+    concurrently and the digest takes about as long as its slowest step.
+    Steps sharing an agent are safe to overlap, since every call checks
+    out its own CrewAI agent (see BaseAgent.crew_agent).
+
+    Args:
+        planner (PlannerAgent): Agent producing the daily plan
+        tracker (TrackerAgent): Agent producing the daily report and consistency check
+        analyzer (AnalyzerAgent): Agent producing the weekly analysis
+        motivator (MotivatorAgent): Agent producing motivation and challenges
+
+    Returns:
+        Workflow: The daily digest workflow
+    """
+    return Workflow(
+        name="daily_digest",
+        inputs=("preferences", "daily_data", "weekly_data", "achievements", "goals"),
+        steps=[
+            Step("daily_plan", planner.create_daily_plan,
+                 inputs=("preferences",)),
+            Step("daily_report",
+                 lambda daily_data: tracker.generate_daily_report(daily_data),
+                 inputs=("daily_data",)),
+            Step("consistency", tracker.check_consistency,
+                 inputs=("weekly_data",)),
+            Step("weekly_analysis", analyzer.analyze_weekly_progress,
+                 inputs=("weekly_data",)),
+            Step("motivation", motivator.provide_daily_motivation,
+                 inputs=("daily_data", "achievements")),
+            Step("challenges", motivator.suggest_challenges,
+                 inputs=("weekly_data", "goals")),
+        ]
+    )
@@ -0,0 +1,184 @@
+"""
+Dependency-driven workflow engine for multi-agent pipelines.
+
+A workflow is a set of steps. Each step declares the named values it reads
+(inputs) and the named values it produces (outputs). Steps whose inputs are
+all available run concurrently, so the end-to-end latency of a workflow is
+bounded by its longest dependency chain rather than the sum of its steps.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from src.config.ai_config import WORKFLOW_CONFIG
+
+# Agent calls are blocking, so steps run on a process-wide pool whose size is
+# the global concurrency limit shared by every workflow run.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=WORKFLOW_CONFIG["max_concurrency"],
+                    thread_name_prefix="workflow-step"
+                )
+    return _executor
+
+
+class WorkflowError(Exception):
+    """Raised when a workflow is invalid or one of its steps fails."""
+
+    def __init__(self, message: str, step: Optional[str] = None):
+        super().__init__(message)
+        self.step = step
+
+
+class Step:
+    def __init__(self, name: str, func: Callable[..., Any],
+                 inputs: Sequence[str] = (), outputs: Sequence[str] = ()):
+        """
+        Initialize a workflow step.
+
+        Args:
+            name (str): Unique step name
+            func (Callable): Blocking callable invoked with the inputs as keyword arguments
+            inputs (Sequence[str]): Names of the values the step reads
+            outputs (Sequence[str]): Names of the values the step produces. With a
+                single output the return value is stored as-is; with several the
+                callable must return a dict keyed by output name.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs) or (name,)
+
+    def run(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.func(**{key: values[key] for key in self.inputs})
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        if not isinstance(result, dict) or not all(key in result for key in self.outputs):
+            raise WorkflowError(
+                f"Step '{self.name}' must return a dict with keys {list(self.outputs)}", self.name)
+        return {key: result[key] for key in self.outputs}
+
+
+class Workflow:
+    def __init__(self, name: str, steps: Iterable[Step], inputs: Sequence[str] = ()):
+        """
+        Initialize and validate a workflow.
+
+        Args:
+            name (str): Workflow name
+            steps (Iterable[Step]): Steps making up the workflow
+            inputs (Sequence[str]): Names of the values supplied by the caller
+
+        Raises:
+            WorkflowError: If names collide, an input has no producer or the
+                steps contain a dependency cycle
+        """
+        self.name = name
+        self.steps = list(steps)
+        self.inputs = tuple(inputs)
+        self._validate()
+
+    def _validate(self):
+        producers: Dict[str, str] = {key: "<input>" for key in self.inputs}
+        names = set()
+        for step in self.steps:
+            if step.name in names:
+                raise WorkflowError(f"Duplicate step name '{step.name}'", step.name)
+            names.add(step.name)
+            for output in step.outputs:
+                if output in producers:
+                    raise WorkflowError(
+                        f"Value '{output}' is produced by both '{producers[output]}' and '{step.name}'",
+                        step.name)
+                producers[output] = step.name
+        for step in self.steps:
+            for key in step.inputs:
+                if key not in producers:
+                    raise WorkflowError(
+                        f"Step '{step.name}' reads '{key}' which nothing produces", step.name)
+        # Every step must become runnable eventually, otherwise there is a cycle
+        self.topological_order()
+
+    def topological_order(self) -> List[List[Step]]:
+        """Group steps into levels that can run concurrently."""
+        available = set(self.inputs)
+        remaining = list(self.steps)
+        levels = []
+        while remaining:
+            ready = [s for s in remaining if all(k in available for k in s.inputs)]
+            if not ready:
+                raise WorkflowError(
+                    f"Dependency cycle between steps {[s.name for s in remaining]}")
+            levels.append(ready)
+            for step in ready:
+                available.update(step.outputs)
+                remaining.remove(step)
+        return levels
+
+    def critical_path_length(self) -> int:
+        """Number of steps on the longest dependency chain."""
+        return len(self.topological_order())
+
+    async def run(self, **inputs: Any) -> Dict[str, Any]:
+        """
+        Run the workflow, starting every step as soon as its inputs exist.
+
+        Args:
+            **inputs: Values for the declared workflow inputs
+
+        Returns:
+            Dict[str, Any]: Outputs of all steps keyed by output name
+
+        Raises:
+            WorkflowError: If an input is missing or a step fails
+        """
+        missing = [key for key in self.inputs if key not in inputs]
+        if missing:
+            raise WorkflowError(f"Missing workflow inputs: {missing}")
+
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        values = dict(inputs)
+        pending = list(self.steps)
+        running: Dict[asyncio.Future, Step] = {}
+
+        def start_ready():
+            for step in list(pending):
+                if all(key in values for key in step.inputs):
+                    pending.remove(step)
+                    # Steps inherit the caller's context, e.g. its LLM priority
+                    context = contextvars.copy_context()
+                    future = loop.run_in_executor(executor, context.run, step.run, dict(values))
+                    running[future] = step
+
+        start_ready()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        outputs = future.result()
+                    except WorkflowError:
+                        raise
+                    except Exception as e:
+                        raise WorkflowError(
+                            f"Step '{step.name}' failed: {e}", step.name) from e
+                    values.update(outputs)
+                start_ready()
+        finally:
+            for future in running:
+                future.cancel()
+
+        return {key: values[key] for step in self.steps for key in step.outputs}
+
@@ -23,11 +23,16 @@ The fixtures are designed to provide a consistent, isolated testing environment
 for all test modules in the suite.
 """
 
+import os
+
+# Set before the app is imported; tests warm up explicitly instead of
+# building agents and calling the LLM API in the background
+os.environ.setdefault("WARMUP", "false")
+
 import pytest
 from fastapi.testclient import TestClient
 from src.app import app
 from src.services.habit_service import HabitService
-import os
 from unittest.mock import patch, MagicMock
 from crewai import Agent, Task, Crew
 
@@ -91,6 +96,28 @@ def setup_test_environment():
         yield
 
 
+@pytest.fixture(autouse=True)
+def unlimited_llm_scheduler():
+    """
+    Replaces the LLM admission scheduler with an unlimited one.
+
+    Expected behavior:
+    - Agent calls are admitted immediately regardless of rate limits
+    - Scheduler state does not leak between tests
+
+    Preconditions:
+    - None (autouse fixture)
+
+    Postconditions:
+    - The process-wide scheduler is restored
+    """
+    from src.llm.scheduler import AdmissionScheduler
+    scheduler = AdmissionScheduler(requests_per_minute=0, tokens_per_minute=0,
+                                   initial_concurrency=64, max_concurrency=64)
+    with patch('src.llm.scheduler._scheduler', scheduler):
+        yield scheduler
+
+
 class MockMessage:
     """
     Simulates an OpenAI API message response.
@@ -194,6 +221,8 @@ def mock_agent():
             - Basic attributes (name, role, goal, etc.)
             - Mocked execution method
             - Empty tools list
+            - copy() returning the same mock, so calls routed to
+              other model settings are still observed
 
     Note:
         Provides a consistent mock agent for
@@ -211,6 +240,7 @@ def mock_agent():
     agent.security_config = None
     agent.tools = []
     agent.execute_task = MagicMock(return_value="Mocked agent response")
+    agent.copy.return_value = agent
     return agent
 
 
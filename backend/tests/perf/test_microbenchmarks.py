@@ -0,0 +1,74 @@
+"""
+Microbenchmarks of the service, model and serialization hot paths.
+Runs the cases of benchmarks.bench_micro and prints their statistics.
+They are marked as benchmarks and deselected by default; run them with
+`pytest -m benchmark`.
+
+This suite verifies:
+- The harness reports per-call timing statistics and allocations.
+- Every case runs and reports plausible numbers.
+"""
+
+import pytest
+from benchmarks.bench_micro import build_cases, measure, print_header, print_row
+
+CASES = build_cases(sizes=(100, 1000))
+
+
+@pytest.fixture(scope="module")
+def workdir(tmp_path_factory):
+    """
+    Creates a work directory shared by the cases.
+
+    Returns:
+        str: Directory the seeded habit stores are written to
+
+    Note:
+        Shared so each store size is seeded once.
+    """
+    print_header()
+    return str(tmp_path_factory.mktemp("micro"))
+
+
+def test_measure_reports_statistics():
+    """
+    Test the measuring harness.
+
+    Expected behavior:
+    - Times are per call and ordered min <= median <= p95.
+    - Memory kept by the operation is counted as retained blocks.
+
+    Preconditions:
+    - An operation that keeps one new list per call.
+
+    Postconditions:
+    - None.
+    """
+    kept = []
+    result = measure(lambda: kept.append([0] * 16), rounds=5, warmup=1, number=100)
+
+    assert result["number"] == 100 and result["rounds"] == 5
+    assert 0 < result["min_us"] <= result["median_us"] <= result["p95_us"]
+    assert result["retained_blocks"] >= 1
+    assert result["peak_bytes"] > 0
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", list(CASES))
+def test_microbenchmark(name, workdir):
+    """
+    Test one hot path.
+
+    Expected behavior:
+    - The case runs repeatedly without errors and reports its statistics.
+
+    Preconditions:
+    - Habit stores seeded in the shared work directory.
+
+    Postconditions:
+    - A row of statistics is printed.
+    """
+    result = measure(CASES[name](workdir), rounds=5, warmup=1, min_round_ms=10.0)
+    print_row(name, result)
+
+    assert 0 < result["min_us"] <= result["median_us"] <= result["p95_us"]
@@ -0,0 +1,74 @@
+"""
+Test suite for the lazy agent registry.
+Tests that shared agents are built on first use, exactly once, even when
+several threads ask for them at the same time.
+
+This suite verifies:
+- Lazy values are built once under concurrent access.
+- get_agent returns the same shared instance.
+"""
+
+import threading
+import time
+from src.agents.registry import Lazy, get_agent, reset_agents
+from src.agents.tracker_agent import TrackerAgent
+
+
+def test_lazy_builds_once_under_contention():
+    """
+    Test the thread-safe lazy accessor.
+
+    Expected behavior:
+    - The factory runs once although eight threads race for the value.
+    - Every thread receives the same object.
+
+    Preconditions:
+    - A factory slow enough for the threads to overlap.
+
+    Postconditions:
+    - Value is marked as built.
+    """
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    lazy = Lazy(factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lazy())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+    assert lazy.built
+
+
+def test_get_agent_shared_instance():
+    """
+    Test the shared agent accessor.
+
+    Expected behavior:
+    - The agent is built on first access.
+    - Later accesses return the same instance.
+    - reset_agents forces a rebuild.
+
+    Preconditions:
+    - No agent built yet.
+
+    Postconditions:
+    - Registry is reset for other tests.
+    """
+    reset_agents()
+    try:
+        tracker = get_agent("tracker")
+        assert isinstance(tracker, TrackerAgent)
+        assert get_agent("tracker") is tracker
+        reset_agents()
+        assert get_agent("tracker") is not tracker
+    finally:
+        reset_agents()
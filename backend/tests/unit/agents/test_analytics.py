@@ -0,0 +1,115 @@
+"""
+Test suite for local numeric pre-aggregation of health records.
+Tests the statistics computed from daily records and the compact
+statistics block sent to the model instead of raw records.
+
+This suite verifies:
+- Completion ratios and missed days for boolean metrics.
+- Mean, variance and trend slope for numeric metrics.
+- Numbers embedded in strings are parsed.
+- Agents send statistics rather than raw records.
+"""
+
+import pytest
+from src.agents.analytics import (
+    compute_metric_stats, flatten_record, parse_number, summarize_records
+)
+from src.agents.tracker_agent import TrackerAgent
+from src.agents.analyzer_agent import AnalyzerAgent
+
+
+@pytest.fixture
+def week_records():
+    """
+    Provides a week of records with a rising exercise duration.
+
+    Returns:
+        list: Seven dated records; exercise is skipped on odd days and
+            sleep is missing on the last day
+
+    Note:
+        Duration grows by two minutes per day so the trend is known
+    """
+    records = []
+    for i in range(7):
+        record = {
+            "date": f"2024-03-{18 + i}",
+            "exercise": {"completed": i % 2 == 0, "duration": f"{30 + 2 * i} minutes"},
+            "mood": "good" if i < 5 else "tired",
+        }
+        if i < 6:
+            record["sleep"] = {"hours": 8}
+        records.append(record)
+    return records
+
+
+def test_flatten_and_parse():
+    """
+    Test record flattening and number parsing.
+
+    Expected behavior:
+    - Nested keys are joined with dots.
+    - Numbers are extracted from strings; booleans are not numbers.
+
+    Preconditions:
+    - None.
+
+    Postconditions:
+    - Inputs are not modified.
+    """
+    assert flatten_record({"a": {"b": 1, "c": {"d": 2}}}) == {"a.b": 1, "a.c.d": 2}
+    assert parse_number("35 minutes") == 35.0
+    assert parse_number("2.5L") == 2.5
+    assert parse_number(True) is None
+    assert parse_number("good") is None
+
+
+def test_compute_metric_stats(week_records):
+    """
+    Test statistics computed for each metric type.
+
+    Expected behavior:
+    - Boolean metrics report completion ratio and missed days.
+    - Numeric metrics report mean, variance and trend.
+    - Missing values count as missed days.
+
+    Preconditions:
+    - One week of records with known values.
+
+    Postconditions:
+    - The date key is not treated as a metric.
+    """
+    stats = compute_metric_stats(week_records)
+
+    assert "date" not in stats
+    assert stats["exercise.completed"]["completion_ratio"] == pytest.approx(4 / 7)
+    assert stats["exercise.completed"]["missed_days"] == 3
+    assert stats["exercise.duration"]["mean"] == pytest.approx(36.0)
+    assert stats["exercise.duration"]["trend_per_day"] == pytest.approx(2.0)
+    assert stats["sleep.hours"]["variance"] == pytest.approx(0.0)
+    assert stats["sleep.hours"]["missed_days"] == 1
+    assert stats["mood"]["top"][0] == ("good", 5)
+
+
+def test_agents_send_statistics(mock_agent, week_records):
+    """
+    Test that weekly analyses send a statistics block.
+
+    Expected behavior:
+    - The prompt contains computed statistics.
+    - The prompt does not contain the raw records.
+
+    Preconditions:
+    - Tracker and analyzer agents share a mock CrewAI agent.
+
+    Postconditions:
+    - Prompt is smaller than the raw data.
+    """
+    TrackerAgent(mock_agent).check_consistency(week_records)
+    AnalyzerAgent(mock_agent).analyze_weekly_progress(week_records)
+
+    for call in mock_agent.execute_task.call_args_list:
+        description = call.args[0].description
+        assert "completed 4/7 days" in description
+        assert "{'completed'" not in description
+    assert len(summarize_records(week_records)) < len(str(week_records))
@@ -0,0 +1,194 @@
+"""
+Test suite for speculative celebration prefetching.
+Tests that completing a habit across a streak milestone starts generating
+its celebration before the client asks, and that the celebration route
+serves it.
+
+This suite verifies:
+- Only completions that cross a configured milestone trigger a prefetch.
+- Prefetches run as batch LLM work for the user who completed the habit.
+- Completions without X-User-ID do not prefetch.
+- The celebration route returns the prefetched message for the same user
+  and achievement, and generates live otherwise.
+- Unclaimed prefetches expire and are counted as wasted.
+- A failed prefetch falls back to a live call.
+"""
+
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.agents import CelebrationPrefetcher
+from src.llm import current_priority, current_user
+from src.models.habit import Habit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def generated():
+    """
+    Records speculative generations and the LLM context they ran in.
+
+    Returns:
+        list: (achievement, priority, user) tuples, appended by `generate`
+    """
+    return []
+
+
+@pytest.fixture
+def prefetcher(generated):
+    """
+    Creates a prefetcher whose generations are recorded instead of calling the model.
+
+    Returns:
+        CelebrationPrefetcher: Enabled, milestones 3 and 7, manual clock
+    """
+    def generate(achievement, context):
+        generated.append((achievement, current_priority.get(), current_user.get()))
+        return f"Prefetched: {achievement}"
+
+    return CelebrationPrefetcher(generate, milestones=[3, 7], ttl_seconds=60,
+                                 max_entries=10, workers=1, enabled=True, clock=FakeClock())
+
+
+def test_only_milestones_trigger(prefetcher, generated):
+    """
+    Test milestone detection.
+
+    Expected behavior:
+    - Going from 2 to 3 days crosses the milestone 3 and prefetches.
+    - Going from 3 to 4 days crosses nothing and does not.
+    - A completion without a user id does not.
+    - A disabled prefetcher never prefetches.
+
+    Preconditions:
+    - Milestones 3 and 7.
+
+    Postconditions:
+    - One generation ran, as batch work for the completing user.
+    """
+    habit = Habit(name="Exercise", frequency="daily", streak=3)
+    sleep = Habit(name="Sleep", frequency="daily", streak=3)
+
+    prefetcher.on_habit_completed({"habit": habit, "previous_streak": 2, "user_id": "user-1"})
+    prefetcher.on_habit_completed({"habit": habit.model_copy(update={"streak": 4}),
+                                   "previous_streak": 3, "user_id": "user-1"})
+    prefetcher.on_habit_completed({"habit": sleep, "previous_streak": 2, "user_id": None})
+    prefetcher.enabled = False
+    prefetcher.on_habit_completed({"habit": habit.model_copy(update={"streak": 7}),
+                                   "previous_streak": 6, "user_id": "user-1"})
+
+    assert prefetcher.crossed_milestone(1, 8) == 7
+    assert prefetcher.take("user-1", "exercise:  3-day STREAK").result(5) \
+        == "Prefetched: Exercise: 3-day streak"
+    assert generated == [("Exercise: 3-day streak", "batch", "user-1")]
+
+
+def test_completion_prefetches_for_route(prefetcher, habit_service):
+    """
+    Test the completion-to-celebration path.
+
+    Expected behavior:
+    - Completing a habit to a 3-day streak through the API, with X-User-ID,
+      publishes an event that starts a prefetch for that user.
+    - The celebration route for that user returns it, marked X-Prefetched,
+      without calling the agent.
+    - Another user's request misses and is generated live.
+
+    Preconditions:
+    - A habit on a 2-day streak; the routes' habit service and prefetcher
+      are replaced.
+
+    Postconditions:
+    - Stats show one hit and one miss.
+    """
+    habit = Habit(name="Exercise", frequency="daily", streak=2)
+    habit_service.habits[habit.id] = habit
+    user = "user-1"
+
+    with patch("src.routes.agents.celebration_prefetcher", lambda: prefetcher), \
+            patch("src.routes.habits.habit_controller.habit_service", habit_service), \
+            patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.generate_celebration_message.return_value = "Live celebration"
+        client = TestClient(app)
+        completed = client.post(f"/api/habits/{habit.id}/complete", headers={"X-User-ID": user})
+        assert completed.json()["streak"] == 3
+
+        params = {"achievement": "Exercise: 3-day streak"}
+        hit = client.post("/api/agents/motivator/celebration", params=params,
+                          json={}, headers={"X-User-ID": user})
+        assert get_agent.call_count == 0
+        miss = client.post("/api/agents/motivator/celebration", params=params,
+                           json={}, headers={"X-User-ID": "someone-else"})
+        stats = client.get("/api/agents/motivator/celebration/prefetch-stats").json()
+
+    assert hit.json() == "Prefetched: Exercise: 3-day streak"
+    assert hit.headers["x-prefetched"] == "true"
+    assert miss.json() == "Live celebration"
+    assert "x-prefetched" not in miss.headers
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_expired_prefetch_is_wasted(prefetcher):
+    """
+    Test expiry of unclaimed prefetches.
+
+    Expected behavior:
+    - A prefetch not claimed within the TTL is dropped and counted as wasted.
+    - Claiming it afterwards is a miss.
+
+    Preconditions:
+    - One prefetch, clock advanced past the TTL.
+
+    Postconditions:
+    - Waste rate is 1.
+    """
+    prefetcher.prefetch("user-1", "Exercise: 7-day streak", [])
+    prefetcher._clock.now = 61
+
+    assert prefetcher.take("user-1", "Exercise: 7-day streak") is None
+    stats = prefetcher.stats()
+    assert stats["wasted"] == 1 and stats["waste_rate"] == 1.0 and stats["parked"] == 0
+
+
+def test_failed_prefetch_falls_back_live():
+    """
+    Test a prefetch whose generation raised.
+
+    Expected behavior:
+    - The route generates the message live and counts the failure.
+
+    Preconditions:
+    - A prefetch that raises once it is allowed to run.
+
+    Postconditions:
+    - The response is the live message, without X-Prefetched.
+    """
+    release = threading.Event()
+
+    def generate(achievement, context):
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    prefetcher = CelebrationPrefetcher(generate, milestones=[3], enabled=True, workers=1)
+    prefetcher.prefetch("user-1", "Sleep: 3-day streak", [])
+    release.set()
+
+    with patch("src.routes.agents.celebration_prefetcher", lambda: prefetcher), \
+            patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.generate_celebration_message.return_value = "Live celebration"
+        response = TestClient(app).post("/api/agents/motivator/celebration",
+                                        params={"achievement": "Sleep: 3-day streak"},
+                                        json={}, headers={"X-User-ID": "user-1"})
+
+    assert response.json() == "Live celebration"
+    assert "x-prefetched" not in response.headers
+    assert prefetcher.stats()["failed"] == 1
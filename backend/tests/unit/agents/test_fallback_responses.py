@@ -0,0 +1,235 @@
+"""
+Test suite for deadline-aware fallback responses.
+Tests that short-form agent routes answer locally when the LLM misses its
+deadline or fails, and that late LLM results warm the fallback cache.
+
+This suite verifies:
+- Templates are filled in from the request data.
+- A slow call is answered by the template, marked X-Fallback.
+- The slow call's result is cached and served for the same request.
+- Routes that allow stale answers fall back to the user's last result.
+- Requests without a user id never get another caller's last result.
+- Invalid input still fails instead of falling back.
+- With fallbacks disabled, agent calls still run off the event loop.
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.agents import FallbackTier
+from src.agents.fallback import motivation_template, report_template
+from src.batch import ArtifactStore
+from src.llm import LLMError
+from src.llm.resilience import _in_event_loop
+
+MOTIVATION = "/api/agents/motivator/daily-motivation"
+REPORT = "/api/agents/tracker/daily-report"
+
+
+@pytest.fixture
+def fallback_tier(tmp_path):
+    """
+    Creates a fallback tier with short deadlines and wires it into the routes.
+
+    Returns:
+        FallbackTier: Tier used by the agent routes during the test
+
+    Note:
+        Motivation may fall back to cached results, the daily report only
+        to its template. Precomputed outputs are looked up in an empty
+        temporary store.
+    """
+    tier = FallbackTier(routes={
+        "motivator.provide_daily_motivation": {"deadline": 0.2, "cached": True},
+        "tracker.generate_daily_report": {"deadline": 0.2, "cached": False},
+    }, enabled=True)
+    store = ArtifactStore(str(tmp_path / "artifacts.db"))
+    with patch("src.routes.agents.fallback_tier", lambda: tier), \
+            patch("src.batch.artifacts._store", store):
+        yield tier
+    store.close()
+
+
+def test_templates():
+    """
+    Test local answers.
+
+    Expected behavior:
+    - Completed and open habits are counted and named.
+    - Achievements are mentioned in motivation.
+
+    Preconditions:
+    - Request data in both the flat and the detailed form.
+
+    Postconditions:
+    - None.
+    """
+    motivation = motivation_template({"exercise": True, "sleep": {"completed": False}},
+                                     ["Exercise: 5-day streak"])
+    report = report_template({"exercise": {"completed": True}, "water": 0})
+
+    assert "1 of 2 habits" in motivation and "Exercise: 5-day streak" in motivation
+    assert report.splitlines() == [
+        "Daily report: 1 of 2 habits completed.", "Completed: exercise.", "Still open: water."]
+
+
+def test_slow_call_falls_back_and_warms_cache(fallback_tier):
+    """
+    Test the deadline path.
+
+    Expected behavior:
+    - A call slower than the route deadline is answered by the template.
+    - The call finishes in the background and its result is cached.
+    - Repeating the request while the provider fails returns that result.
+
+    Preconditions:
+    - The tracker agent blocks until released, then fails on the next call.
+
+    Postconditions:
+    - Stats count one template, one cached answer and one warmed result.
+    """
+    release = threading.Event()
+
+    def slow_report(data):
+        release.wait(5)
+        return "LLM report"
+
+    body = {"exercise": True, "sleep": False}
+    with patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.generate_daily_report.side_effect = slow_report
+        client = TestClient(app)
+        first = client.post(REPORT, params={"date": "2024-01-10T00:00:00"}, json=body,
+                            headers={"X-User-ID": "user-1"})
+        release.set()
+        deadline = time.monotonic() + 5
+        while fallback_tier.stats()["warmed"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        get_agent.return_value.generate_daily_report.side_effect = LLMError("provider down")
+        second = client.post(REPORT, params={"date": "2024-01-10T00:00:00"}, json=body,
+                             headers={"X-User-ID": "user-1"})
+
+    assert first.status_code == 200
+    assert first.headers["x-fallback"] == "template"
+    assert first.json().startswith("Daily report: 1 of 2 habits completed.")
+    assert second.json() == "LLM report"
+    assert second.headers["x-fallback"] == "cached"
+    stats = fallback_tier.stats()
+    assert (stats["template"], stats["cached"], stats["warmed"]) == (1, 1, 1)
+
+
+def test_provider_failure_uses_last_result(fallback_tier):
+    """
+    Test falling back to the user's last result.
+
+    Expected behavior:
+    - A live answer is returned unmarked and remembered for the user.
+    - When the provider then fails for different input, motivation
+      returns that last result; another user gets the template.
+
+    Preconditions:
+    - The motivator succeeds once, then raises LLMError.
+
+    Postconditions:
+    - None.
+    """
+    with patch("src.routes.agents.get_agent") as get_agent:
+        motivator = get_agent.return_value
+        motivator.provide_daily_motivation.return_value = "Live motivation"
+        client = TestClient(app)
+        live = client.post(MOTIVATION, json={"user_data": {"exercise": True}, "recent_achievements": []},
+                           headers={"X-User-ID": "user-2"})
+
+        motivator.provide_daily_motivation.side_effect = LLMError("provider down")
+        body = {"user_data": {"exercise": False}, "recent_achievements": []}
+        cached = client.post(MOTIVATION, json=body, headers={"X-User-ID": "user-2"})
+        other = client.post(MOTIVATION, json=body, headers={"X-User-ID": "user-3"})
+
+    assert live.json() == "Live motivation" and "x-fallback" not in live.headers
+    assert cached.json() == "Live motivation" and cached.headers["x-fallback"] == "cached"
+    assert other.headers["x-fallback"] == "template"
+    assert "fresh start" in other.json()
+
+
+def test_anonymous_requests_do_not_share_last_result(fallback_tier):
+    """
+    Test the last-result fallback without X-User-ID.
+
+    Expected behavior:
+    - After an anonymous live answer, another anonymous request with
+      different input gets the template, not that answer.
+
+    Preconditions:
+    - The motivator succeeds once, then raises LLMError.
+
+    Postconditions:
+    - None.
+    """
+    with patch("src.routes.agents.get_agent") as get_agent:
+        motivator = get_agent.return_value
+        motivator.provide_daily_motivation.return_value = "Keep up your exercise, Alex"
+        client = TestClient(app)
+        live = client.post(MOTIVATION, json={"user_data": {"exercise": True}, "recent_achievements": []})
+
+        motivator.provide_daily_motivation.side_effect = LLMError("provider down")
+        other = client.post(MOTIVATION, json={"user_data": {"sleep": False}, "recent_achievements": []})
+
+    assert live.json() == "Keep up your exercise, Alex"
+    assert other.headers["x-fallback"] == "template"
+    assert "Alex" not in other.json()
+
+
+def test_invalid_input_is_not_masked(fallback_tier):
+    """
+    Test errors that are not provider failures.
+
+    Expected behavior:
+    - A ValueError from the agent still answers 500 without a fallback.
+
+    Preconditions:
+    - The motivator rejects its input.
+
+    Postconditions:
+    - None.
+    """
+    with patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.provide_daily_motivation.side_effect = ValueError("Daily data cannot be empty")
+        response = TestClient(app).post(MOTIVATION, json={"user_data": {}, "recent_achievements": []})
+
+    assert response.status_code == 500
+    assert "x-fallback" not in response.headers
+
+
+def test_disabled_tier_runs_calls_off_the_loop():
+    """
+    Test the routes with fallbacks turned off.
+
+    Expected behavior:
+    - The agent call runs in a worker thread and its answer is returned
+      unmarked.
+
+    Preconditions:
+    - A disabled tier; the motivator fails when called on an event loop,
+      as LLM calls do.
+
+    Postconditions:
+    - None.
+    """
+    tier = FallbackTier(enabled=False)
+
+    def motivation(data, achievements):
+        if _in_event_loop():
+            raise RuntimeError("LLM calls block; run them in a worker thread")
+        return "Live motivation"
+
+    with patch("src.routes.agents.fallback_tier", lambda: tier), \
+            patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.provide_daily_motivation.side_effect = motivation
+        response = TestClient(app).post(
+            MOTIVATION, json={"user_data": {"exercise": True}, "recent_achievements": []})
+
+    assert response.status_code == 200
+    assert response.json() == "Live motivation" and "x-fallback" not in response.headers
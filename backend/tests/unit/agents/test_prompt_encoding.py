@@ -0,0 +1,113 @@
+"""
+Test suite for the tabular prompt encoding of record lists.
+Tests that nested records are flattened into a single header followed by
+one row per record, and that agents embed this encoding in their prompts.
+
+This suite verifies:
+- Header columns are written once in first-seen order.
+- Missing values are left empty.
+- The encoding uses far fewer tokens than Python repr.
+"""
+
+import pytest
+from src.agents.prompt_encoding import encode_records
+from src.agents.token_budget import estimate_tokens
+from src.agents.motivator_agent import MotivatorAgent
+
+
+@pytest.fixture
+def records():
+    """
+    Provides two nested daily records with differing keys.
+
+    Returns:
+        list: The second record lacks sleep data and adds a mood
+
+    Note:
+        Exercises column union and missing values
+    """
+    return [
+        {"date": "2024-03-20", "exercise": {"completed": True, "duration": 30},
+         "sleep": {"hours": 8.0}},
+        {"date": "2024-03-21", "exercise": {"completed": False, "duration": 0},
+         "mood": "tired"},
+    ]
+
+
+def test_encode_records(records):
+    """
+    Test the header-plus-rows table format.
+
+    Expected behavior:
+    - Nested keys become dotted column names.
+    - Booleans and whole floats are written compactly.
+    - Missing values are empty cells.
+
+    Preconditions:
+    - Records with different key sets.
+
+    Postconditions:
+    - One line per record plus the header.
+    """
+    assert encode_records(records).splitlines() == [
+        "date|exercise.completed|exercise.duration|sleep.hours|mood",
+        "2024-03-20|yes|30|8|",
+        "2024-03-21|no|0||tired",
+    ]
+
+
+def test_encode_non_dict_records():
+    """
+    Test encoding of plain values and empty lists.
+
+    Expected behavior:
+    - Plain values are written one per line.
+    - Empty input is marked explicitly.
+
+    Preconditions:
+    - None.
+
+    Postconditions:
+    - No header is emitted for plain values.
+    """
+    assert encode_records(["a", "b|c"]) == "a\nb/c"
+    assert encode_records([]) == "(no records)"
+
+
+def test_encoding_saves_tokens(records):
+    """
+    Test the token saving over Python repr.
+
+    Expected behavior:
+    - A month of records costs well under half the repr tokens.
+
+    Preconditions:
+    - Thirty copies of the sample records.
+
+    Postconditions:
+    - Encoding is deterministic.
+    """
+    month = records * 15
+
+    assert estimate_tokens(encode_records(month)) < estimate_tokens(str(month)) / 2
+
+
+def test_agent_prompt_uses_table(mock_agent, records):
+    """
+    Test that agent prompts embed the table encoding.
+
+    Expected behavior:
+    - The header row appears in the prompt.
+    - Raw dict syntax does not.
+
+    Preconditions:
+    - Motivator agent with a mock CrewAI agent.
+
+    Postconditions:
+    - Model is called once.
+    """
+    MotivatorAgent(mock_agent).suggest_challenges(records, {"exercise": "daily"})
+
+    description = mock_agent.execute_task.call_args.args[0].description
+    assert "date|exercise.completed" in description
+    assert "{'completed'" not in description
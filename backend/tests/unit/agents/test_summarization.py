@@ -0,0 +1,206 @@
+"""
+Test suite for map-reduce summarization of long histories.
+Tests weekly chunking, concurrent chunk summarization and memoization of
+chunk summaries in the AnalyzerAgent.
+
+This suite verifies:
+- Records are grouped into calendar weeks.
+- Weekly chunks are summarized concurrently.
+- Unchanged weeks are not summarized again.
+- Concurrent chunks run through CrewAI each send only their own prompt.
+"""
+
+import re
+import threading
+import time
+import pytest
+from datetime import date, timedelta
+from crewai import LLM
+from crewai.agent import Agent
+from src.agents.analyzer_agent import AnalyzerAgent
+from src.agents.summarization import chunk_by_week
+
+# Taken before the autouse fixture replaces it with a mock
+REAL_EXECUTE_TASK = Agent.execute_task
+
+
+@pytest.fixture
+def ninety_days():
+    """
+    Provides ninety days of dated tracking records.
+
+    Returns:
+        list: Records in chronological order starting on a Monday
+
+    Note:
+        Ninety days starting on a Monday span thirteen ISO weeks
+    """
+    start = date(2024, 1, 1)
+    return [
+        {
+            "date": (start + timedelta(days=i)).isoformat(),
+            "exercise": {"completed": i % 3 != 0, "duration": 30},
+            "sleep": {"duration": 7 + (i % 2)}
+        }
+        for i in range(90)
+    ]
+
+
+def test_chunk_by_week(ninety_days):
+    """
+    Test grouping records by ISO week.
+
+    Expected behavior:
+    - Every record lands in exactly one chunk.
+    - Full weeks hold seven records.
+
+    Preconditions:
+    - Ninety consecutive dated records.
+
+    Postconditions:
+    - Chunks are in chronological order.
+    """
+    chunks = chunk_by_week(ninety_days)
+
+    assert len(chunks) == 13
+    assert chunks[0][0] == "2024-W01"
+    assert all(len(records) == 7 for _, records in chunks[:-1])
+    assert sum(len(records) for _, records in chunks) == 90
+
+
+def test_undated_records_chunked_by_position():
+    """
+    Test chunking records without dates.
+
+    Expected behavior:
+    - Records fall into consecutive runs of seven.
+
+    Preconditions:
+    - Ten records without a date key.
+
+    Postconditions:
+    - Two chunks are produced.
+    """
+    chunks = chunk_by_week([{"sleep": {"duration": 8}}] * 10)
+
+    assert [len(records) for _, records in chunks] == [7, 3]
+
+
+def test_map_reduce_memoizes_chunks(mock_agent, ninety_days):
+    """
+    Test that only changed weeks are summarized again.
+
+    Expected behavior:
+    - First run summarizes every week plus one final analysis.
+    - Adding a day re-summarizes only that day's week.
+
+    Preconditions:
+    - Analyzer agent with a mock CrewAI agent.
+
+    Postconditions:
+    - Chunk summaries are cached on the agent.
+    """
+    agent = AnalyzerAgent(mock_agent)
+
+    agent.identify_behavior_patterns(ninety_days)
+    assert mock_agent.execute_task.call_count == 13 + 1
+
+    mock_agent.execute_task.reset_mock()
+    next_day = dict(ninety_days[-1], date="2024-03-31")
+    agent.identify_behavior_patterns(ninety_days + [next_day])
+    assert mock_agent.execute_task.call_count == 1 + 1
+
+
+def test_map_reduce_runs_chunks_concurrently(mock_agent, ninety_days):
+    """
+    Test that weekly summaries overlap in time.
+
+    Expected behavior:
+    - Total latency is far below thirteen sequential calls.
+
+    Preconditions:
+    - Each model call takes 0.1s.
+
+    Postconditions:
+    - Report is produced from the weekly summaries.
+    """
+    def slow_call(task):
+        time.sleep(0.1)
+        return "Mocked agent response"
+
+    mock_agent.execute_task.side_effect = slow_call
+    agent = AnalyzerAgent(mock_agent)
+
+    start = time.perf_counter()
+    result = agent.generate_insights_report(ninety_days, {"exercise": "daily"})
+    elapsed = time.perf_counter() - start
+
+    assert result == "Mocked agent response"
+    assert elapsed < 0.8
+
+
+def test_short_history_uses_single_prompt(mock_agent):
+    """
+    Test that short histories skip map-reduce.
+
+    Expected behavior:
+    - A single model call is made.
+
+    Preconditions:
+    - One week of records.
+
+    Postconditions:
+    - No chunk summaries are cached.
+    """
+    agent = AnalyzerAgent(mock_agent)
+
+    agent.identify_behavior_patterns([{"sleep": {"duration": 8}}] * 7)
+
+    assert mock_agent.execute_task.call_count == 1
+    assert len(agent.chunk_summaries) == 0
+
+
+def test_concurrent_crew_chunks_do_not_share_prompts(monkeypatch, ninety_days):
+    """
+    Test the map step through the real CrewAI agent loop.
+
+    Expected behavior:
+    - Every request to the model carries the prompt of exactly one week.
+    - Every week is requested once and the final analysis runs over all.
+
+    Preconditions:
+    - Crew execution mode; the model call is stubbed and takes 0.05s.
+    - Building an agent executor is slowed down, so concurrent calls on one
+      CrewAI agent would pick up each other's executor.
+
+    Postconditions:
+    - None.
+    """
+    requests = []
+    lock = threading.Lock()
+    create_executor = Agent.create_agent_executor
+
+    def slow_create_executor(self, *args, **kwargs):
+        create_executor(self, *args, **kwargs)
+        time.sleep(0.02)
+
+    def call(self, messages, *args, **kwargs):
+        text = " ".join(message["content"] for message in messages)
+        with lock:
+            requests.append(re.findall(r"this week \((\S+)\)", text))
+        time.sleep(0.05)
+        return "Thought: I know the answer\nFinal Answer: Mocked week summary"
+
+    monkeypatch.setattr(Agent, "execute_task", REAL_EXECUTE_TASK)
+    monkeypatch.setattr(Agent, "create_agent_executor", slow_create_executor)
+    monkeypatch.setattr(LLM, "call", call)
+    agent = AnalyzerAgent()
+    agent.mode = "crew"
+
+    result = agent.identify_behavior_patterns(ninety_days)
+
+    weeks = [labels for labels in requests if labels]
+    assert all(len(labels) == 1 for labels in weeks), weeks
+    assert sorted(labels[0] for labels in weeks) == [label for label, _ in chunk_by_week(ninety_days)]
+    assert len(requests) == 13 + 1
+    assert "Mocked week summary" in result
@@ -0,0 +1,236 @@
+"""
+Test suite for token estimation and prompt budget enforcement.
+Tests the local token estimator, the record trimming policies and the
+budget checks performed by BaseAgent before a prompt is sent.
+
+This suite verifies:
+- Token estimates scale with text size.
+- Oversized record lists are trimmed or compacted per policy.
+- Prompts that cannot fit are rejected without calling the model.
+- Each call's budget follows its model route's context window and max_tokens.
+- Token counts are recorded for each call.
+"""
+
+import pytest
+from unittest.mock import patch
+from src.agents.token_budget import (
+    TokenBudget, TokenBudgetExceeded, estimate_tokens,
+    TRIM_OLDEST, COMPACT, REJECT
+)
+from src.agents.analyzer_agent import AnalyzerAgent
+from src.agents.planner_agent import PlannerAgent
+from src.agents.tracker_agent import TrackerAgent
+from src.config.ai_config import MODEL_CONFIG, MODEL_ROUTES_CONFIG, SMALL_MODEL_NAME, TOKEN_BUDGET_CONFIG
+from src.llm import route_for
+
+
+@pytest.fixture
+def small_budget():
+    """
+    Creates a deliberately small token budget.
+
+    Returns:
+        TokenBudget: A budget with room for roughly 200 prompt tokens
+
+    Note:
+        Small enough that a few dozen records overflow it
+    """
+    return TokenBudget(context_window=400, reserved_output_tokens=150, overhead_tokens=50)
+
+
+@pytest.fixture
+def daily_records():
+    """
+    Provides sixty days of tracking records.
+
+    Returns:
+        list: Records in chronological order, each tagged with its day index
+
+    Note:
+        The day index lets tests check which records were kept
+    """
+    return [{"day": i, "exercise": {"completed": i % 2 == 0, "duration": 30}}
+            for i in range(60)]
+
+
+def _render(records):
+    """
+    Renders records into a task string.
+
+    Returns:
+        str: Task text embedding the records
+    """
+    return f"Analyze: {records}"
+
+
+def test_estimate_tokens():
+    """
+    Test the local token estimator.
+
+    Expected behavior:
+    - Empty text has no tokens.
+    - Longer text has more tokens.
+    - Estimates stay near the usual four characters per token.
+
+    Preconditions:
+    - None.
+
+    Postconditions:
+    - Estimator is deterministic.
+    """
+    text = "Completed 35 minutes of running and 10 minutes of meditation."
+
+    assert estimate_tokens("") == 0
+    assert estimate_tokens(text * 2) == 2 * estimate_tokens(text)
+    assert len(text) / 6 < estimate_tokens(text) < len(text) / 2
+
+
+def test_trim_oldest_keeps_recent_records(small_budget, daily_records):
+    """
+    Test the trim_oldest policy.
+
+    Expected behavior:
+    - Only the most recent records are kept.
+    - Resulting task fits the budget.
+
+    Preconditions:
+    - Records overflow the budget.
+
+    Postconditions:
+    - Last record is always kept.
+    """
+    task, kept = small_budget.fit_records("", daily_records, _render, TRIM_OLDEST)
+
+    assert 0 < kept < len(daily_records)
+    assert small_budget.fits("", task)
+    assert task == _render(daily_records[-kept:])
+
+
+def test_compact_spreads_records(small_budget, daily_records):
+    """
+    Test the compact policy.
+
+    Expected behavior:
+    - An evenly spaced sample of the whole window is kept.
+    - First and last records are both present.
+
+    Preconditions:
+    - Records overflow the budget.
+
+    Postconditions:
+    - Resulting task fits the budget.
+    """
+    task, kept = small_budget.fit_records("", daily_records, _render, COMPACT)
+
+    assert 1 < kept < len(daily_records)
+    assert small_budget.fits("", task)
+    assert "'day': 0," in task
+    assert "'day': 59," in task
+
+
+def test_reject_policy(small_budget, daily_records):
+    """
+    Test the reject policy.
+
+    Expected behavior:
+    - Oversized input raises TokenBudgetExceeded.
+    - Input that fits is rendered unchanged.
+
+    Preconditions:
+    - Records overflow the budget.
+
+    Postconditions:
+    - Exception reports the prompt size and budget.
+    """
+    with pytest.raises(TokenBudgetExceeded) as exc_info:
+        small_budget.fit_records("", daily_records, _render, REJECT)
+    assert exc_info.value.prompt_tokens > exc_info.value.budget
+
+    task, kept = small_budget.fit_records("", daily_records[:1], _render, REJECT)
+    assert kept == 1
+
+
+def test_agent_compacts_monthly_data(mock_agent, daily_records, small_budget):
+    """
+    Test budget enforcement inside an agent method.
+
+    Expected behavior:
+    - Oversized monthly data is compacted before sending.
+    - Token counts and record counts are recorded.
+
+    Preconditions:
+    - Analyzer agent with a small token budget.
+
+    Postconditions:
+    - Model is called once with a prompt that fits.
+    """
+    agent = AnalyzerAgent(mock_agent)
+    agent.token_budget = TokenBudget(
+        context_window=400, reserved_output_tokens=150, overhead_tokens=50)
+
+    result = agent.identify_behavior_patterns(daily_records, map_reduce=False)
+
+    usage = agent.last_usage
+    assert result == "Mocked agent response"
+    assert usage["method"] == "identify_behavior_patterns"
+    assert usage["records_in"] == 60
+    assert usage["records_kept"] < 60
+    assert usage["system_tokens"] + usage["task_tokens"] <= usage["budget"]
+    mock_agent.execute_task.assert_called_once()
+
+
+def test_oversized_prompt_not_sent(mock_agent):
+    """
+    Test that an oversized prompt fails before the model call.
+
+    Expected behavior:
+    - TokenBudgetExceeded is raised.
+    - The model is never called.
+
+    Preconditions:
+    - Preferences far larger than the context window.
+
+    Postconditions:
+    - No round trip is wasted.
+    """
+    agent = PlannerAgent(mock_agent)
+    preferences = {f"goal_{i}": "thirty minutes of exercise" for i in range(5000)}
+
+    with pytest.raises(TokenBudgetExceeded):
+        agent.create_daily_plan(preferences)
+    mock_agent.execute_task.assert_not_called()
+
+
+def test_budget_follows_model_route(mock_agent, monkeypatch):
+    """
+    Test per-route prompt budgets.
+
+    Expected behavior:
+    - A method routed to the small model gets that model's context window
+      less the method's max_tokens; a large-model method gets the large one.
+    - A call moved to the fallback model whose prompt only fits the
+      primary model stays on the primary model.
+
+    Preconditions:
+    - The small model has a 2048-token context window.
+
+    Postconditions:
+    - None.
+    """
+    monkeypatch.setitem(MODEL_ROUTES_CONFIG, "context_windows", {SMALL_MODEL_NAME: 2048})
+    overhead = TOKEN_BUDGET_CONFIG["overhead_tokens"]
+    tracker = TrackerAgent(mock_agent)
+    planner = PlannerAgent(mock_agent)
+
+    tracker.log_daily_data({"exercise": True})
+    small = tracker.last_usage
+    planner.create_daily_plan({"focus": "fitness"})
+    large = planner.last_usage
+    report = route_for("tracker.generate_daily_report")
+    with patch("src.llm.routing.ModelRouter.choose", lambda router, key: report.fallback()):
+        tracker.execute("exercise done " * 300, method="generate_daily_report")
+
+    assert small["model"] == SMALL_MODEL_NAME and small["budget"] == 2048 - 512 - overhead
+    assert large["budget"] == MODEL_CONFIG["context_window"] - 1536 - overhead
+    assert tracker.last_usage["model"] == report.model
+    assert tracker.last_usage["budget"] == MODEL_CONFIG["context_window"] - report.max_tokens - overhead
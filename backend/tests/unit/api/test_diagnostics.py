@@ -0,0 +1,196 @@
+"""
+Test suite for the admin diagnostics endpoints.
+Tests on-demand CPU profiles, memory snapshots and subsystem footprints of
+the live process, and that they are only served with the admin token.
+
+This suite verifies:
+- Requests without the right token are refused; unset, the endpoints are off.
+- A CPU profile finds a busy thread and renders collapsed and speedscope output.
+- Only one profile runs at a time.
+- Snapshot diffs point at the allocating line, and clearing stops tracemalloc.
+- Footprints are reported for built subsystems only.
+"""
+
+import threading
+import time
+import tracemalloc
+import pytest
+from fastapi.testclient import TestClient
+from src.app import app
+from src.config.ai_config import DIAGNOSTICS_CONFIG
+from src.observability import ProfilerBusy, SamplingProfiler, memory, register_footprint
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    """
+    Creates a client for the habits app with the admin token configured.
+
+    Returns:
+        TestClient: Client sending the admin token
+
+    Note:
+        Snapshots are cleared afterwards, which stops tracemalloc.
+    """
+    monkeypatch.setitem(DIAGNOSTICS_CONFIG, "admin_token", "secret")
+    client = TestClient(app, headers=TOKEN)
+    yield client
+    client.delete("/api/admin/memory/snapshots")
+
+
+def spin(stop: threading.Event):
+    """Busy loop standing in for CPU-bound work."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_admin_token_is_required(monkeypatch):
+    """
+    Test access control.
+
+    Expected behavior:
+    - Without ADMIN_TOKEN set the endpoints answer 403.
+    - With it set, a missing or wrong token answers 401.
+
+    Preconditions:
+    - None.
+
+    Postconditions:
+    - None.
+    """
+    client = TestClient(app)
+
+    monkeypatch.setitem(DIAGNOSTICS_CONFIG, "admin_token", "")
+    disabled = client.get("/api/admin/memory/footprint", headers=TOKEN)
+    monkeypatch.setitem(DIAGNOSTICS_CONFIG, "admin_token", "secret")
+    missing = client.get("/api/admin/memory/footprint")
+    wrong = client.get("/api/admin/memory/footprint", headers={"X-Admin-Token": "guess"})
+
+    assert disabled.status_code == 403
+    assert missing.status_code == 401 and wrong.status_code == 401
+
+
+def test_cpu_profile_finds_busy_thread(admin):
+    """
+    Test the profile endpoint.
+
+    Expected behavior:
+    - Collapsed stacks name the busy thread and its function with counts.
+    - Speedscope output has one sampled profile per thread on shared frames.
+    - Idle threads are left out by default.
+
+    Preconditions:
+    - A thread spinning for the duration of the profiles.
+
+    Postconditions:
+    - The thread is stopped.
+    """
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        collapsed = admin.get("/api/admin/profile", params={"seconds": 0.2, "interval_ms": 2})
+        speedscope = admin.get("/api/admin/profile",
+                               params={"seconds": 0.2, "interval_ms": 2, "format": "speedscope"})
+    finally:
+        stop.set()
+        worker.join()
+
+    assert collapsed.status_code == 200
+    lines = [line for line in collapsed.text.splitlines() if line.startswith("busy-worker;")]
+    assert lines and all("spin (" in line for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) >= 10
+    assert "selectors.py" not in collapsed.text
+    document = speedscope.json()
+    profiles = {profile["name"]: profile for profile in document["profiles"]}
+    busy = profiles["busy-worker"]
+    assert busy["type"] == "sampled" and len(busy["samples"]) == len(busy["weights"])
+    names = [document["shared"]["frames"][index]["name"] for sample in busy["samples"] for index in sample]
+    assert "spin" in names
+
+
+def test_one_profile_at_a_time():
+    """
+    Test profiler exclusion.
+
+    Expected behavior:
+    - A profile requested while another runs raises ProfilerBusy.
+
+    Preconditions:
+    - A profiler running on another thread.
+
+    Postconditions:
+    - None.
+    """
+    profiler = SamplingProfiler(interval=0.005)
+    running = threading.Thread(target=profiler.profile, args=(0.3,))
+    running.start()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(ProfilerBusy):
+            profiler.profile(0.01)
+    finally:
+        running.join()
+    assert profiler.profile(0.01).samples >= 1
+
+
+def test_memory_snapshot_diff(admin):
+    """
+    Test memory snapshots.
+
+    Expected behavior:
+    - The first snapshot starts tracemalloc.
+    - The diff of two snapshots lists the line that allocated in between.
+    - Unknown snapshot ids answer 404.
+    - Clearing the snapshots stops tracemalloc again.
+
+    Preconditions:
+    - tracemalloc is off.
+
+    Postconditions:
+    - tracemalloc is off.
+    """
+    assert not tracemalloc.is_tracing()
+    first = admin.post("/api/admin/memory/snapshots").json()
+    retained = [bytearray(1024) for _ in range(2000)]
+    second = admin.post("/api/admin/memory/snapshots").json()
+
+    diff = admin.get("/api/admin/memory/diff", params={"first": first["id"], "second": second["id"]})
+    listed = admin.get("/api/admin/memory/snapshots").json()
+    missing = admin.get("/api/admin/memory/diff", params={"first": first["id"], "second": 999})
+    cleared = admin.delete("/api/admin/memory/snapshots")
+
+    top = diff.json()[0]
+    assert "test_diagnostics.py" in top["location"] and top["size_diff"] >= 2000 * 1024
+    assert listed["tracing"] and [s["id"] for s in listed["snapshots"]] == [first["id"], second["id"]]
+    assert missing.status_code == 404
+    assert cleared.status_code == 204 and not tracemalloc.is_tracing()
+    assert len(retained) == 2000
+
+
+def test_footprint_reports_built_subsystems(admin, monkeypatch):
+    """
+    Test subsystem footprints.
+
+    Expected behavior:
+    - The habit store is measured, including the habits it holds.
+    - A registered subsystem that is not built is reported as null.
+    - The process resident size is reported.
+
+    Preconditions:
+    - A registered subsystem whose provider returns None.
+
+    Postconditions:
+    - The registration is dropped.
+    """
+    monkeypatch.setattr(memory, "_footprints", dict(memory._footprints))
+    register_footprint("unbuilt_subsystem", lambda: None)
+
+    report = admin.get("/api/admin/memory/footprint").json()
+
+    store = report["subsystems"]["habit_store"]
+    assert store["bytes"] > 0 and store["objects"] >= 1 and not store["truncated"]
+    assert report["subsystems"]["unbuilt_subsystem"] is None
+    assert report["rss_bytes"] > 0
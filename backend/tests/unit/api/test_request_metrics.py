@@ -0,0 +1,143 @@
+"""
+Test suite for request-level metrics.
+Tests that the metrics middleware records every HTTP request per route and
+that the habit store reports where its time goes.
+
+This suite verifies:
+- Latency, sizes and status counts are labelled with the route template.
+- Requests matching no route are labelled "unmatched".
+- The in-flight gauge counts requests being handled and drops back.
+- Habit store loads and saves are split into I/O and serialization.
+"""
+
+import asyncio
+from fastapi.testclient import TestClient
+from src.app import app
+from src.models.habit import HabitCreate
+from src.observability import MetricsRegistry, RequestMetricsMiddleware, registry
+from src.services.habit_service import HabitService, store_seconds
+
+HABIT = "/api/habits/{habit_id}"
+
+
+def test_requests_are_recorded_per_route():
+    """
+    Test the middleware on the habits app.
+
+    Expected behavior:
+    - A request for one habit is counted under the route template with
+      its status, latency, request and response sizes.
+    - An unknown path is counted as "unmatched".
+    - GET /metrics exposes the HTTP metrics.
+
+    Preconditions:
+    - The app with the metrics middleware installed.
+
+    Postconditions:
+    - None.
+    """
+    client = TestClient(app)
+    # The middleware, and with it its metrics, is built on the first request
+    client.get("/")
+    duration = registry.histogram("http_request_duration_seconds", "", ("method", "route"))
+    responses = registry.counter("http_responses_total", "", ("method", "route", "status"))
+    response_size = registry.histogram("http_response_size_bytes", "", ("method", "route"))
+    bad_ids = responses.value(method="GET", route=HABIT, status="400")
+    unmatched = responses.value(method="GET", route="unmatched", status="404")
+    before = duration.snapshot(method="GET", route=HABIT)
+    sent_before = response_size.snapshot(method="GET", route=HABIT)["sum"]
+
+    bad = client.get("/api/habits/not-a-uuid")
+    client.get("/no/such/path")
+    metrics = client.get("/metrics").text
+
+    after = duration.snapshot(method="GET", route=HABIT)
+    assert responses.value(method="GET", route=HABIT, status="400") == bad_ids + 1
+    assert responses.value(method="GET", route="unmatched", status="404") == unmatched + 1
+    assert after["count"] == before["count"] + 1 and after["sum"] > before["sum"]
+    assert response_size.snapshot(method="GET", route=HABIT)["sum"] == sent_before + len(bad.content)
+    assert 'http_responses_total{method="GET",route="/api/habits/{habit_id}",status="400"}' in metrics
+    assert "# TYPE http_requests_in_flight gauge" in metrics
+
+
+def test_in_flight_and_request_size():
+    """
+    Test the in-flight gauge and request body sizes.
+
+    Expected behavior:
+    - The gauge is 1 while a request is handled and 0 afterwards.
+    - Request bodies are measured from Content-Length.
+    - A failing app is still recorded, with status 500.
+
+    Preconditions:
+    - A bare ASGI app wrapped in the middleware with its own registry.
+
+    Postconditions:
+    - None.
+    """
+    metrics = MetricsRegistry()
+    seen = []
+
+    async def inner(scope, receive, send):
+        seen.append(metrics.gauge("http_requests_in_flight", "").value())
+        if scope["path"] == "/fail":
+            raise RuntimeError("boom")
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"created"})
+
+    async def receive():
+        return {"type": "http.request", "body": b"x" * 12}
+
+    async def send(message):
+        pass
+
+    middleware = RequestMetricsMiddleware(inner, metrics)
+
+    async def run():
+        await middleware({"type": "http", "method": "POST", "path": "/ok",
+                          "headers": [(b"content-length", b"12")]}, receive, send)
+        try:
+            await middleware({"type": "http", "method": "POST", "path": "/fail", "headers": []},
+                             receive, send)
+        except RuntimeError:
+            pass
+
+    asyncio.run(run())
+
+    responses = metrics.counter("http_responses_total", "", ("method", "route", "status"))
+    request_size = metrics.histogram("http_request_size_bytes", "", ("method", "route"))
+    assert seen == [1, 1]
+    assert metrics.gauge("http_requests_in_flight", "").value() == 0
+    assert responses.value(method="POST", route="unmatched", status="201") == 1
+    assert responses.value(method="POST", route="unmatched", status="500") == 1
+    assert request_size.snapshot(method="POST", route="unmatched")["sum"] == 12
+
+
+def test_store_time_is_split_by_phase(tmp_path):
+    """
+    Test the habit store hooks.
+
+    Expected behavior:
+    - Saving records serialization and I/O time once each.
+    - Loading an existing store records I/O and deserialization time.
+
+    Preconditions:
+    - A habit service on an empty temporary file.
+
+    Postconditions:
+    - None.
+    """
+    def count(operation, phase):
+        return store_seconds.snapshot(operation=operation, phase=phase)["count"]
+
+    phases = [(operation, phase) for operation in ("load", "save") for phase in ("io", "serialization")]
+    before = {key: count(*key) for key in phases}
+    service = HabitService(str(tmp_path / "habits.json"))
+
+    asyncio.run(service.create_habit(HabitCreate(name="Exercise", frequency="daily")))
+    HabitService(str(tmp_path / "habits.json"))
+
+    assert {key: count(*key) - before[key] for key in phases} == {
+        ("load", "io"): 1, ("load", "serialization"): 1,
+        ("save", "io"): 1, ("save", "serialization"): 1,
+    }
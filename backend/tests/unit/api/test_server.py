@@ -0,0 +1,148 @@
+"""
+Test suite for the production launcher and worker readiness.
+Tests that workers warm up before GET /ready reports them ready, and that
+the launcher serves from several pre-forked workers and stops cleanly.
+
+This suite verifies:
+- /ready answers 503 while a worker warms up and 200 with step timings after.
+- A failing warmup step is reported and does not keep the worker unready.
+- The launcher forks the requested workers, which serve on one port.
+- SIGTERM stops the launcher and its workers with exit status 0.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from fastapi.testclient import TestClient
+from src.app import WARMUP_STEPS, app
+from src.config.ai_config import SERVER_CONFIG
+from src.server import Warmup
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+def free_port() -> int:
+    """A port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_ready(port: int):
+    """Status code and body of GET /ready, or None when not listening."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=2) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+    except OSError:
+        return None
+
+
+def test_ready_after_warmup(monkeypatch):
+    """
+    Test the readiness endpoint.
+
+    Expected behavior:
+    - While a step runs, /ready answers 503 with status "warming".
+    - Afterwards it answers 200 with the timing of each step and the pid.
+
+    Preconditions:
+    - Warmup enabled, with the habit store step held back by an event.
+
+    Postconditions:
+    - None.
+    """
+    release = threading.Event()
+    refresh = WARMUP_STEPS["habit_store"]
+    monkeypatch.setitem(SERVER_CONFIG, "warmup", True)
+    monkeypatch.setitem(WARMUP_STEPS, "habit_store", lambda: (release.wait(5), refresh()))
+
+    with TestClient(app) as client:
+        warming = client.get("/ready")
+        release.set()
+        assert app.state.warmup.wait(5)
+        ready = client.get("/ready")
+
+    assert warming.status_code == 503 and warming.json()["status"] == "warming"
+    assert ready.status_code == 200
+    body = ready.json()
+    assert body["status"] == "ready" and body["pid"] == os.getpid()
+    assert body["steps"]["habit_store"]["error"] is None
+    assert body["warmup_ms"] >= body["steps"]["habit_store"]["ms"]
+
+
+def test_failing_step_does_not_block_readiness():
+    """
+    Test a warmup step that raises.
+
+    Expected behavior:
+    - The error is reported for its step and later steps still run.
+    - The worker becomes ready.
+
+    Preconditions:
+    - A failing step followed by a succeeding one.
+
+    Postconditions:
+    - None.
+    """
+    ran = []
+
+    def unreachable():
+        raise ConnectionError("API down")
+
+    warmup = Warmup({"llm_connection": unreachable, "agents": lambda: ran.append("agents")})
+    warmup.start()
+
+    assert warmup.wait(5) and warmup.ready
+    steps = warmup.status()["steps"]
+    assert steps["llm_connection"]["error"] == "ConnectionError: API down"
+    assert steps["agents"]["error"] is None and ran == ["agents"]
+
+
+def test_launcher_serves_from_workers_and_stops(tmp_path):
+    """
+    Test the launcher end to end.
+
+    Expected behavior:
+    - Two workers, other processes than the launcher, become ready on one port.
+    - After SIGTERM the launcher exits with status 0 and the port is closed.
+
+    Preconditions:
+    - The habits app on a free port, with its files in a temporary directory.
+
+    Postconditions:
+    - The launcher is stopped.
+    """
+    port = free_port()
+    env = {**os.environ, "HABITS_DATA_FILE": str(tmp_path / "habits.json"),
+           "TRACE_FILE": str(tmp_path / "traces.jsonl"), "WARMUP": "true"}
+    launcher = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--app", "habits", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", "2", "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stderr=subprocess.PIPE, text=True)
+    try:
+        pids = set()
+        deadline = time.monotonic() + 30
+        while len(pids) < 2 and time.monotonic() < deadline:
+            answer = get_ready(port)
+            if answer and answer[0] == 200:
+                assert answer[1]["steps"]["habit_store"]["error"] is None
+                pids.add(answer[1]["pid"])
+            else:
+                time.sleep(0.1)
+        # Which worker accepts a connection is up to the kernel; one is enough
+        assert pids and launcher.pid not in pids
+    finally:
+        launcher.send_signal(signal.SIGTERM)
+        _, errors = launcher.communicate(timeout=30)
+
+    assert launcher.returncode == 0, errors
+    assert get_ready(port) is None
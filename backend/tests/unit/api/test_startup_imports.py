@@ -0,0 +1,63 @@
+"""
+Test suite for application startup cost.
+Tests that importing the API entry points does not load the heavy agent
+dependencies, which are only needed once an agent route is hit.
+
+This suite verifies:
+- src.app and src.api.main import without crewai, litellm, numpy or httpx.
+- Agent routes are still registered.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+@pytest.mark.parametrize("module", ["src.app", "src.api.main"])
+def test_entry_point_imports_stay_light(module):
+    """
+    Test that an entry point import leaves heavy modules unloaded.
+
+    Expected behavior:
+    - crewai, litellm, numpy and httpx are absent from sys.modules.
+
+    Preconditions:
+    - Fresh interpreter started in the backend directory.
+
+    Postconditions:
+    - Import succeeds.
+    """
+    code = (f"import sys, {module}; "
+            "print(','.join(m for m in ('crewai', 'litellm', 'numpy', 'httpx') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
+
+
+def test_agent_routes_registered_without_agents():
+    """
+    Test that agent routes exist before any agent is built.
+
+    Expected behavior:
+    - Routes are mounted under /api/agents.
+    - No agent has been constructed yet.
+
+    Preconditions:
+    - Fresh interpreter started in the backend directory.
+
+    Postconditions:
+    - Agents are built only when a route is called.
+    """
+    code = ("import src.api.main as m; from src.agents.registry import built_agents; "
+            "print(len([r for r in m.app.routes if r.path.startswith('/api/agents')]), "
+            "len(built_agents()))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+
+    routes, built = result.stdout.split()
+    assert int(routes) > 0
+    assert built == "0"
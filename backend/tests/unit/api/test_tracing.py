@@ -0,0 +1,190 @@
+"""
+Test suite for request tracing.
+Tests that spans follow a request from the route through the controller and
+the habit store, and that only sampled or slow traces are exported.
+
+This suite verifies:
+- Nested spans share the trace and point at their parent.
+- Traces are exported as OTLP-JSON when sampled or slower than the threshold.
+- A habits request is traced from the route down to the store.
+- Agent calls record the LLM request as a child span across threads.
+- Disabled tracing records nothing.
+"""
+
+import json
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from src.agents.tracker_agent import TrackerAgent
+from src.app import app
+from src.observability import FileExporter, Tracer, annotate, traced
+from src.observability import tracing
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    """
+    Installs a tracer exporting every trace to a temporary file.
+
+    Returns:
+        Callable: Returns the exported traces as lists of OTLP span dicts
+
+    Note:
+        The process-wide tracer is restored after the test.
+    """
+    exporter = FileExporter(str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(tracing, "_tracer", Tracer(sample_rate=1.0, exporter=exporter))
+
+    def read():
+        assert exporter.flush()
+        if not (tmp_path / "traces.jsonl").exists():
+            return []
+        return [json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+                for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    return read
+
+
+def test_spans_nest_and_slow_traces_are_exported(tmp_path):
+    """
+    Test span nesting, sampling and the slow threshold.
+
+    Expected behavior:
+    - A span opened inside another is its child, in the same trace.
+    - Errors mark the span and attributes are encoded with their types.
+    - An unsampled fast trace is dropped, an unsampled slow one exported.
+
+    Preconditions:
+    - A tracer that never samples, with a 0 ms and an unreachable threshold.
+
+    Postconditions:
+    - None.
+    """
+    exporter = FileExporter(str(tmp_path / "traces.jsonl"))
+    fast = Tracer(sample_rate=0.0, slow_ms=60_000, exporter=exporter)
+    slow = Tracer(sample_rate=0.0, slow_ms=0, exporter=exporter)
+
+    with fast.span("dropped"):
+        pass
+    with slow.span("root", user="u1") as root:
+        with pytest.raises(ValueError):
+            with slow.span("child", attempt=2, cached=False) as child:
+                raise ValueError("bad input")
+    assert exporter.flush()
+
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert len(lines) == 1
+    spans = {span["name"]: span for span in
+             json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+    assert set(spans) == {"root", "child"}
+    assert spans["child"]["traceId"] == spans["root"]["traceId"] == root.trace_id
+    assert spans["child"]["parentSpanId"] == root.span_id == spans["root"]["spanId"]
+    assert "parentSpanId" not in spans["root"]
+    assert spans["child"]["status"] == {"code": 2, "message": "ValueError: bad input"}
+    assert {"key": "attempt", "value": {"intValue": "2"}} in spans["child"]["attributes"]
+    assert {"key": "cached", "value": {"boolValue": False}} in spans["child"]["attributes"]
+    assert int(spans["root"]["endTimeUnixNano"]) >= int(spans["child"]["endTimeUnixNano"])
+    assert child.duration <= root.duration
+    assert fast.stats()["traces"] == 1 and slow.stats()["slow"] == 1
+
+
+def test_habit_request_is_traced_to_the_store(exported):
+    """
+    Test tracing of a habits request.
+
+    Expected behavior:
+    - The response carries the trace id in X-Trace-Id.
+    - The root span is named after the route template and holds the status.
+    - Route, controller, service and store spans form one chain.
+
+    Preconditions:
+    - Every trace is sampled.
+
+    Postconditions:
+    - A habit is created in the test store.
+    """
+    client = TestClient(app)
+
+    response = client.post("/api/habits/", json={"name": "Exercise", "frequency": "daily"})
+
+    assert response.status_code == 200
+    traces = exported()
+    assert len(traces) == 1
+    spans = {span["name"]: span for span in traces[0]}
+    root = spans["POST /api/habits/"]
+    assert root["traceId"] == response.headers["x-trace-id"]
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in root["attributes"]
+    chain = ["POST /api/habits/", "route create_habit", "HabitController.create_habit",
+             "HabitService.create_habit", "HabitService._save_data"]
+    for parent, child in zip(chain, chain[1:]):
+        assert spans[child]["parentSpanId"] == spans[parent]["spanId"]
+    store = {item["key"] for item in spans["HabitService._save_data"]["attributes"]}
+    assert {"bytes", "io_ms", "serialization_ms"} <= store
+
+
+def test_agent_call_spans_cross_threads(exported, monkeypatch):
+    """
+    Test the agent and LLM request spans.
+
+    Expected behavior:
+    - The agent span is a child of the caller's span.
+    - The LLM request, sent from a scheduler thread, is a child of the
+      agent span and carries the model.
+
+    Preconditions:
+    - A direct-mode tracker whose completion is stubbed.
+
+    Postconditions:
+    - None.
+    """
+    agent = TrackerAgent()
+    agent.mode = "direct"
+    threads = []
+
+    def fake_direct(task, usage, timeout=None, route=None):
+        threads.append(threading.get_ident())
+        annotate(stubbed=True)
+        return "Report"
+    monkeypatch.setattr(agent, "_execute_direct", fake_direct)
+
+    @traced("daily report job")
+    def job():
+        return agent.execute("Summarize today", method="generate_daily_report")
+
+    assert job() == "Report"
+
+    spans = {span["name"]: span for span in exported()[0]}
+    agent_span = spans["agent tracker.generate_daily_report"]
+    request = spans["llm.request"]
+    assert agent_span["parentSpanId"] == spans["daily report job"]["spanId"]
+    assert request["parentSpanId"] == agent_span["spanId"]
+    assert {"key": "stubbed", "value": {"boolValue": True}} in request["attributes"]
+    assert any(item["key"] == "model" for item in request["attributes"])
+    assert any(item["key"] == "attempts" for item in agent_span["attributes"])
+
+
+def test_disabled_tracing_records_nothing(tmp_path, monkeypatch):
+    """
+    Test the switch.
+
+    Expected behavior:
+    - Spans yield None and nothing is exported.
+    - Responses carry no trace id.
+
+    Preconditions:
+    - A disabled tracer installed as the process-wide one.
+
+    Postconditions:
+    - None.
+    """
+    exporter = FileExporter(str(tmp_path / "traces.jsonl"))
+    tracer = Tracer(enabled=False, sample_rate=1.0, exporter=exporter)
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+
+    with tracer.span("ignored") as span:
+        assert span is None
+    response = TestClient(app).get("/api/habits/")
+
+    assert response.status_code == 200
+    assert "x-trace-id" not in response.headers
+    assert exporter.flush() and not (tmp_path / "traces.jsonl").exists()
+    assert tracer.stats()["traces"] == 0
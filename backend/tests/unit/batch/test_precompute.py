@@ -0,0 +1,218 @@
+"""
+Test suite for offline precomputation of agent outputs.
+Tests that predictable outputs are generated per user ahead of time and
+that agent routes serve them instead of calling the model.
+
+This suite verifies:
+- Inputs are derived from a user's habits.
+- Every user gets each artifact once per day (weekly ones once per week).
+- Re-running skips artifacts that are already stored.
+- Generation runs as batch LLM work for the user.
+- Routes return fresh stored outputs for the requesting user.
+- Stored outputs are served for their day until the user's habits change.
+"""
+
+import asyncio
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from uuid import UUID, uuid4
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.batch import Artifact, ArtifactStore, PrecomputeRunner, habits_fingerprint
+from src.batch.precompute import user_inputs
+from src.llm import current_priority, current_user
+from src.models.habit import Habit
+
+DAY = date(2024, 1, 10)  # a Wednesday
+
+
+@pytest.fixture
+def artifact_store(tmp_path):
+    """
+    Creates an artifact store backed by a temporary SQLite file.
+
+    Returns:
+        ArtifactStore: Empty store
+    """
+    store = ArtifactStore(str(tmp_path / "artifacts.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def two_users(habit_service):
+    """
+    Fills the habit service with habits of two users.
+
+    Returns:
+        tuple: The two user ids as strings
+
+    Note:
+        Habits are set in memory only; nothing is written to disk.
+    """
+    alice, bob = uuid4(), uuid4()
+    for user_id, name, streak in ((alice, "Exercise", 5), (alice, "Meditation", 1), (bob, "Sleep", 0)):
+        habit = Habit(name=name, frequency="daily", user_id=user_id, streak=streak,
+                      last_completed=datetime(2024, 1, 9, 20) if streak else None)
+        habit_service.habits[habit.id] = habit
+    return str(alice), str(bob)
+
+
+def test_user_inputs():
+    """
+    Test input derivation from habits.
+
+    Expected behavior:
+    - Habits completed the day before count as completed.
+    - Streaks of three days or more are listed as achievements.
+    - Weekly data has one entry per habit.
+
+    Preconditions:
+    - One habit completed yesterday with a 5-day streak, one never completed.
+
+    Postconditions:
+    - None.
+    """
+    habits = [
+        Habit(name="Exercise", frequency="daily", streak=5, target_value=30, unit="minutes",
+              last_completed=datetime(2024, 1, 9, 20)),
+        Habit(name="Sleep", frequency="daily"),
+    ]
+
+    inputs = user_inputs(habits, DAY)
+
+    assert inputs["daily_data"]["Exercise"] == {
+        "completed": True, "streak": 5, "frequency": "daily", "target": "30 minutes"}
+    assert inputs["daily_data"]["Sleep"]["completed"] is False
+    assert inputs["achievements"] == ["Exercise: 5-day streak"]
+    assert [entry["habit"] for entry in inputs["weekly_data"]] == ["Exercise", "Sleep"]
+
+
+def test_precompute_all_users(habit_service, artifact_store, two_users):
+    """
+    Test a precomputation run.
+
+    Expected behavior:
+    - Each user gets every artifact, generated as batch work for that user.
+    - Weekly artifacts are keyed by the Monday of the week.
+    - A second run skips everything already stored.
+
+    Preconditions:
+    - Two users with habits, artifacts that record their call context.
+
+    Postconditions:
+    - Stored content is retrievable per (user, artifact, day).
+    """
+    calls = []
+
+    def generate(name):
+        def run(inputs):
+            calls.append((name, current_priority.get(), current_user.get()))
+            return f"{name} for {current_user.get()}"
+        return run
+
+    artifacts = {
+        "daily-motivation": Artifact("daily-motivation", generate("daily-motivation")),
+        "weekly-analysis": Artifact("weekly-analysis", generate("weekly-analysis"), period="weekly"),
+    }
+    runner = PrecomputeRunner(habit_service, artifact_store, artifacts, parallelism=2)
+
+    report = runner.run(DAY)
+    assert report["users"] == 2
+    assert report["generated"] == 4
+    assert {priority for _, priority, _ in calls} == {"batch"}
+    assert {user for _, _, user in calls} == set(two_users)
+
+    alice = two_users[0]
+    monday = DAY - timedelta(days=DAY.weekday())
+    assert artifact_store.get_fresh(alice, "daily-motivation", DAY) == f"daily-motivation for {alice}"
+    assert artifact_store.get_fresh(alice, "weekly-analysis", monday) == f"weekly-analysis for {alice}"
+
+    report = runner.run(DAY)
+    assert report["generated"] == 0
+    assert report["skipped"] == 4
+
+
+def test_routes_serve_precomputed(habit_service, artifact_store, two_users):
+    """
+    Test serving stored outputs.
+
+    Expected behavior:
+    - With X-User-ID and a fresh artifact for today, the route returns it
+      without calling the agent and marks the response X-Precomputed,
+      whatever data the request carries.
+    - Without a stored artifact the agent is called as before.
+
+    Preconditions:
+    - Today's daily motivation is stored for the first user, generated
+      from their current habits.
+
+    Postconditions:
+    - The agent is called only for the user without an artifact.
+    """
+    alice, bob = two_users
+    habits = asyncio.run(habit_service.get_user_habits(alice))
+    artifact_store.put(alice, "daily-motivation", date.today(), "Stored motivation",
+                       habits_fingerprint(habits))
+    body = {"user_data": {"exercise": True}, "recent_achievements": []}
+
+    with patch("src.batch.artifacts._store", artifact_store), \
+            patch("src.routes.agents.habit_controller.habit_service", habit_service), \
+            patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.provide_daily_motivation.return_value = "Live motivation"
+        client = TestClient(app)
+        stored = client.post("/api/agents/motivator/daily-motivation", json=body,
+                             headers={"X-User-ID": alice})
+        assert get_agent.call_count == 0
+        live = client.post("/api/agents/motivator/daily-motivation", json=body,
+                           headers={"X-User-ID": bob})
+
+    assert stored.json() == "Stored motivation"
+    assert stored.headers["x-precomputed"] == "true"
+    assert live.json() == "Live motivation"
+    assert "x-precomputed" not in live.headers
+
+
+def test_precomputed_only_while_habits_unchanged(habit_service, artifact_store, two_users):
+    """
+    Test freshness of stored outputs.
+
+    Expected behavior:
+    - A daily report is served for the day it was generated for, also
+      after the user completes a habit.
+    - Another date, or a habit added since the run, calls the agent.
+
+    Preconditions:
+    - A precompute run stored the first user's daily report for DAY.
+
+    Postconditions:
+    - None.
+    """
+    alice, _ = two_users
+    artifacts = {"daily-report": Artifact("daily-report", lambda inputs: "Stored report")}
+    PrecomputeRunner(habit_service, artifact_store, artifacts).run(DAY)
+    exercise = next(habit for habit in habit_service.habits.values() if habit.name == "Exercise")
+
+    with patch("src.batch.artifacts._store", artifact_store), \
+            patch("src.routes.agents.habit_controller.habit_service", habit_service), \
+            patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.generate_daily_report.return_value = "Live report"
+        client = TestClient(app)
+
+        def report(day):
+            return client.post("/api/agents/tracker/daily-report", params={"date": f"{day}T00:00:00"},
+                               json={"Exercise": {"completed": True}}, headers={"X-User-ID": alice})
+
+        stored = report(DAY)
+        exercise.streak, exercise.last_completed = 6, datetime(2024, 1, 10, 8)
+        after_completion = report(DAY)
+        other_day = report(DAY + timedelta(days=1))
+        habit = Habit(name="Reading", frequency="daily", user_id=UUID(alice))
+        habit_service.habits[habit.id] = habit
+        new_habit = report(DAY)
+
+    assert stored.json() == "Stored report" and stored.headers["x-precomputed"] == "true"
+    assert after_completion.json() == "Stored report"
+    assert other_day.json() == "Live report" and "x-precomputed" not in other_day.headers
+    assert new_habit.json() == "Live report"
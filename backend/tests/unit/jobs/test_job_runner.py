@@ -0,0 +1,305 @@
+"""
+Test suite for background agent jobs.
+Tests submitting long-running agent tasks, polling for their results and
+recovering queued work after a restart.
+
+This suite verifies:
+- Submitting returns 202 with a job id before the task runs.
+- Long-polling returns the result once the job finishes.
+- Long-polling sees jobs finished by another worker process.
+- Submitting and polling read and write the store off the event loop.
+- Unknown kinds and mismatched params are rejected at submit time.
+- Handler failures are recorded on the job.
+- Jobs run as batch LLM work for the submitting user.
+- Jobs left running by a dead process are requeued on start.
+- Jobs left by an earlier process with the same pid are requeued too.
+"""
+
+import asyncio
+import os
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.jobs import JobRunner, JobStore
+from src.jobs.store import RUNNING, _process_start
+from src.jobs.tasks import JOB_HANDLERS
+from src.llm import current_priority, current_user
+
+
+@pytest.fixture
+def job_store(tmp_path):
+    """
+    Creates a job store backed by a temporary SQLite file.
+
+    Returns:
+        JobStore: Empty store
+
+    Note:
+        The file is removed with the temporary directory.
+    """
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def job_client(job_store):
+    """
+    Creates a test client whose app runs jobs from a temporary store.
+
+    Returns:
+        TestClient: Client with the app lifespan (and job workers) running
+
+    Note:
+        The process-wide runner is replaced for the duration of the test.
+    """
+    runner = JobRunner(job_store, JOB_HANDLERS, workers=2, poll_interval=0.05)
+    with patch("src.jobs.runner._runner", runner):
+        with TestClient(app) as client:
+            yield client
+
+
+def test_submit_and_long_poll(job_client):
+    """
+    Test the job round trip.
+
+    Expected behavior:
+    - Submitting answers 202 with a queued job and its id.
+    - Polling with wait returns the finished job and the agent result.
+
+    Preconditions:
+    - The analyzer agent is mocked.
+
+    Postconditions:
+    - The job is stored as succeeded.
+    """
+    response = job_client.post("/api/jobs/", json={
+        "kind": "insights-report",
+        "params": {"data": [{"date": "2024-01-01", "exercise": True}], "goals": {"exercise": "daily"}},
+    })
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+
+    response = job_client.get(f"/api/jobs/{job['id']}", params={"wait": 10})
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == "Mocked agent response"
+    assert job["started_at"] and job["finished_at"]
+
+
+@pytest.mark.parametrize("payload, status_code", [
+    ({"kind": "unknown", "params": {}}, 404),
+    ({"kind": "behavior-patterns", "params": {"wrong": []}}, 422),
+])
+def test_submit_rejects_invalid_jobs(job_client, payload, status_code):
+    """
+    Test submit validation.
+
+    Expected behavior:
+    - Unknown job kinds answer 404.
+    - Params that do not match the handler answer 422.
+
+    Preconditions:
+    - None.
+
+    Postconditions:
+    - No job is stored.
+    """
+    response = job_client.post("/api/jobs/", json=payload)
+
+    assert response.status_code == status_code
+
+
+def test_unknown_job_id(job_client):
+    """
+    Test polling a job that does not exist.
+
+    Expected behavior:
+    - Answers 404.
+
+    Preconditions:
+    - Empty store.
+
+    Postconditions:
+    - None.
+    """
+    assert job_client.get("/api/jobs/missing").status_code == 404
+
+
+def test_failed_job_and_batch_context(job_store):
+    """
+    Test job execution details.
+
+    Expected behavior:
+    - Handlers run with batch LLM priority for the submitting user.
+    - A raising handler marks the job failed with its message.
+
+    Preconditions:
+    - Handlers that record their context or raise.
+
+    Postconditions:
+    - Both jobs are finished.
+    """
+    seen = {}
+
+    def record():
+        seen["priority"] = current_priority.get()
+        seen["user"] = current_user.get()
+        return {"ok": True}
+
+    def explode():
+        raise RuntimeError("provider down")
+
+    runner = JobRunner(job_store, {"record": record, "explode": explode}, poll_interval=0.05)
+    runner.start()
+    try:
+        ok = runner.submit("record", {}, user_id="user-3")
+        failed = runner.submit("explode", {})
+        ok = asyncio.run(runner.wait(ok.id, 5))
+        failed = asyncio.run(runner.wait(failed.id, 5))
+    finally:
+        runner.stop(timeout=5)
+
+    assert ok.status == "succeeded" and ok.result == {"ok": True}
+    assert seen == {"priority": "batch", "user": "user-3"}
+    assert failed.status == "failed" and failed.error == "provider down"
+
+
+def test_wait_for_job_run_elsewhere(job_store):
+    """
+    Test long-polling a job that another worker process runs.
+
+    Expected behavior:
+    - The waiting runner returns the finished job within about a poll
+      interval, not at the end of its timeout.
+
+    Preconditions:
+    - Two runners on one store, as in two workers; only the second runs
+      jobs, which finish after the wait has started.
+
+    Postconditions:
+    - The second runner is stopped.
+    """
+    def record():
+        time.sleep(0.3)
+        return "done"
+
+    waiting = JobRunner(job_store, {"record": record}, poll_interval=0.05)
+    running = JobRunner(job_store, {"record": record}, poll_interval=0.05)
+    job = waiting.submit("record", {})
+    running.start()
+    try:
+        start = time.monotonic()
+        job = asyncio.run(waiting.wait(job.id, 30))
+        elapsed = time.monotonic() - start
+    finally:
+        running.stop(timeout=5)
+
+    assert job.status == "succeeded"
+    assert elapsed < 5
+
+
+def test_store_calls_leave_loop_free(job_client, job_store):
+    """
+    Test where the routes call the job store.
+
+    Expected behavior:
+    - Creating a job on submit and reading it while long-polling run
+      outside the event loop, in threads with no running loop.
+
+    Preconditions:
+    - The store records, for every create and get, whether it was called
+      on the event loop.
+
+    Postconditions:
+    - The job finishes as usual.
+    """
+    on_loop = []
+
+    def recorded(call):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return call(*args, **kwargs)
+        return wrapper
+
+    with patch.object(job_store, "create", recorded(job_store.create)), \
+            patch.object(job_store, "get", recorded(job_store.get)):
+        job = job_client.post("/api/jobs/", json={
+            "kind": "insights-report",
+            "params": {"data": [{"date": "2024-01-01", "exercise": True}], "goals": {"exercise": "daily"}},
+        }).json()
+        job = job_client.get(f"/api/jobs/{job['id']}", params={"wait": 10}).json()
+
+    assert job["status"] == "succeeded"
+    assert len(on_loop) >= 2
+    assert not any(on_loop)
+
+
+def test_orphaned_jobs_requeued_on_start(job_store):
+    """
+    Test restart recovery.
+
+    Expected behavior:
+    - A job claimed by a process that no longer exists is queued again
+      when a runner starts and then completes.
+
+    Preconditions:
+    - A running job owned by a dead process id.
+
+    Postconditions:
+    - The job succeeded on its second attempt.
+    """
+    job = job_store.create("record", {})
+    job_store.claim_next()
+    job_store._conn.execute("UPDATE jobs SET owner = ? WHERE id = ?", (2 ** 22 + 1, job.id))
+
+    runner = JobRunner(job_store, {"record": lambda: "done"}, poll_interval=0.05)
+    runner.start()
+    try:
+        job = asyncio.run(runner.wait(job.id, 5))
+    finally:
+        runner.stop(timeout=5)
+
+    assert job.status == "succeeded"
+    assert job.attempts == 2
+
+
+def test_jobs_of_restarted_process_requeued(job_store):
+    """
+    Test recovery after a restart that reuses the process id.
+
+    Expected behavior:
+    - A job owned by this pid but an earlier process start is requeued.
+    - Jobs running in this process and in another live process are not.
+
+    Preconditions:
+    - Three running jobs: one claimed now, one owned by "<pid>:<earlier
+      start>", one owned by the parent process.
+
+    Postconditions:
+    - Only the job of the earlier process start is queued again.
+    """
+    current = job_store.create("record", {})
+    job_store.claim_next()
+    restarted = job_store.create("record", {})
+    job_store.claim_next()
+    job_store._conn.execute("UPDATE jobs SET owner = ? WHERE id = ?",
+                            (f"{os.getpid()}:earlier-start", restarted.id))
+    other = job_store.create("record", {})
+    job_store.claim_next()
+    parent = os.getppid()
+    job_store._conn.execute("UPDATE jobs SET owner = ? WHERE id = ?",
+                            (f"{parent}:{_process_start(parent)}", other.id))
+
+    assert job_store.requeue_orphans() == 1
+    assert job_store.get(restarted.id).status == "queued"
+    assert job_store.get(current.id).status == RUNNING
+    assert job_store.get(other.id).status == RUNNING
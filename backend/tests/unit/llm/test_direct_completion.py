@@ -0,0 +1,201 @@
+"""
+Test suite for the direct chat completion path.
+Tests that agents in direct mode send one chat completion built from their
+system prompt and task, and that completion API errors are surfaced.
+
+This suite verifies:
+- Direct mode sends system and user messages with the model parameters.
+- Provider token usage is recorded with the call.
+- Per-method overrides select the CrewAI path.
+- Error responses raise LLMError and RateLimitError.
+- Every agent and litellm share one pooled client.
+- After the client is closed, agents and litellm move to the rebuilt one.
+"""
+
+import json
+import httpx
+import litellm
+import pytest
+from unittest.mock import patch
+from src.agents.analyzer_agent import AnalyzerAgent
+from src.agents.tracker_agent import TrackerAgent
+from src.config.ai_config import AGENT_EXECUTION_CONFIG, MODEL_CONFIG
+from src.llm import (
+    LLMClient, LLMError, RateLimitError, close_llm_client, get_llm_client, route_for
+)
+
+
+def stub_client(requests, status_code=200, headers=None):
+    """Build an LLMClient whose requests are answered in-process."""
+    def handler(request):
+        requests.append(request)
+        if status_code != 200:
+            return httpx.Response(status_code, text="error", headers=headers)
+        return httpx.Response(200, json={
+            "model": MODEL_CONFIG["model"],
+            "choices": [{"message": {"role": "assistant", "content": "Direct response"}}],
+            "usage": {"prompt_tokens": 42, "completion_tokens": 7},
+        })
+
+    return LLMClient("http://stub/v1", api_key="test-key", transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def sent_requests():
+    """
+    Collects the requests received by the stub client.
+
+    Returns:
+        list: httpx.Request objects in the order they were sent
+    """
+    return []
+
+
+@pytest.fixture
+def direct_tracker(sent_requests):
+    """
+    Creates a tracker agent running in direct mode.
+
+    Returns:
+        TrackerAgent: Agent whose calls bypass CrewAI
+
+    Note:
+        The CrewAI agent itself is still built, so mode can be switched back.
+        Completions are answered by an in-process stub client.
+    """
+    agent = TrackerAgent()
+    agent.mode = "direct"
+    agent.llm_client = stub_client(sent_requests)
+    return agent
+
+
+def test_direct_mode_sends_one_completion(direct_tracker, sent_requests):
+    """
+    Test a direct mode call.
+
+    Expected behavior:
+    - Exactly one POST is sent to the chat completions endpoint.
+    - Messages are the tracker system prompt followed by the task.
+    - Model, max_tokens and temperature come from the method's route.
+    - The completion text is returned and provider usage recorded.
+
+    Preconditions:
+    - The stub client answers with a canned completion.
+
+    Postconditions:
+    - The CrewAI agent loop is not invoked.
+    """
+    result = direct_tracker.execute("Summarize today", method="generate_daily_report")
+
+    # The patched CrewAI loop would have answered "Mocked agent response"
+    assert result == "Direct response"
+    assert len(sent_requests) == 1
+    request = sent_requests[0]
+    body = json.loads(request.content)
+    assert str(request.url) == "http://stub/v1/chat/completions"
+    assert request.headers["authorization"] == "Bearer test-key"
+    assert body["messages"] == [
+        {"role": "system", "content": direct_tracker.system_prompt},
+        {"role": "user", "content": "Summarize today"},
+    ]
+    route = route_for("tracker.generate_daily_report")
+    assert body["model"] == route.model
+    assert body["max_tokens"] == route.max_tokens
+    assert body["temperature"] == route.temperature
+    assert direct_tracker.last_usage["provider_prompt_tokens"] == 42
+    assert direct_tracker.last_usage["completion_tokens"] == 7
+
+
+def test_method_override_uses_crew(direct_tracker, sent_requests):
+    """
+    Test per-method execution mode overrides.
+
+    Expected behavior:
+    - A method configured as "crew" runs through the CrewAI agent.
+    - No completion request is sent.
+
+    Preconditions:
+    - The agent default mode is "direct".
+
+    Postconditions:
+    - The override is removed again.
+    """
+    key = "tracker.check_consistency"
+    with patch.dict(AGENT_EXECUTION_CONFIG["methods"], {key: "crew"}):
+        result = direct_tracker.execute("Check streaks", method="check_consistency")
+
+    assert result == "Mocked agent response"
+    assert sent_requests == []
+
+
+@pytest.mark.parametrize("status_code, error", [(429, RateLimitError), (500, LLMError)])
+def test_completion_errors(status_code, error):
+    """
+    Test error handling of the completion client.
+
+    Expected behavior:
+    - 429 raises RateLimitError with the Retry-After value.
+    - Other error statuses raise LLMError with the status code.
+
+    Preconditions:
+    - The stub client answers with an error status.
+
+    Postconditions:
+    - No completion is returned.
+    """
+    client = stub_client([], status_code=status_code, headers={"retry-after": "2"})
+    with pytest.raises(error) as exc_info:
+        client.chat_completion([{"role": "user", "content": "hi"}])
+
+    assert exc_info.value.status_code == status_code
+    if error is RateLimitError:
+        assert exc_info.value.retry_after == 2.0
+
+
+def test_agents_share_pooled_client():
+    """
+    Test the process-wide client.
+
+    Expected behavior:
+    - Agents of different types hold the same LLMClient.
+    - litellm, used by the CrewAI path, sends through the same httpx pool.
+
+    Preconditions:
+    - No client has been replaced on the agents.
+
+    Postconditions:
+    - get_llm_client keeps returning the shared instance.
+    """
+    tracker = TrackerAgent()
+    analyzer = AnalyzerAgent()
+
+    assert tracker.llm_client is analyzer.llm_client is get_llm_client()
+    assert litellm.client_session is get_llm_client().http
+
+
+def test_closing_client_releases_references():
+    """
+    Test closing the process-wide client.
+
+    Expected behavior:
+    - litellm no longer holds the closed pool.
+    - The next call on an existing agent builds a new client, which litellm
+      uses as well.
+
+    Preconditions:
+    - An agent built before the client is closed.
+
+    Postconditions:
+    - A new shared client is in place.
+    """
+    tracker = TrackerAgent()
+    closed = get_llm_client()
+
+    close_llm_client()
+    released = litellm.client_session
+
+    assert released is None
+    assert closed.http.is_closed
+    assert tracker.llm_client is get_llm_client() is not closed
+    assert litellm.client_session is get_llm_client().http
+    assert not get_llm_client().http2
@@ -0,0 +1,250 @@
+"""
+Test suite for LLM call instrumentation.
+Tests that agent calls are recorded per agent type and method, and that the
+metrics are served in the Prometheus text format.
+
+This suite verifies:
+- The registry renders counters and cumulative histogram buckets.
+- Metrics reject labels they were not registered with.
+- Streamed direct calls record latency, time to first token and tokens.
+- CrewAI calls record the tokens the provider reports, or an estimate.
+- Per-user token totals are kept and served to admins only.
+- Failed calls are counted by error; summary cache hits are counted.
+- GET /metrics serves the registry.
+"""
+
+import json
+import httpx
+import litellm
+import pytest
+from crewai import Agent
+from fastapi.testclient import TestClient
+from src.agents.summarization import ChunkSummaryCache
+from src.agents.tracker_agent import TrackerAgent
+from src.api.main import app
+from src.config.ai_config import DIAGNOSTICS_CONFIG
+from src.llm import LLMClient, LLMError, llm_context, token_ledger
+from src.llm.instrumentation import (
+    cache_hits_total, call_seconds, completion_tokens_total, errors_total, first_token_seconds,
+    prompt_tokens_total
+)
+from src.observability import MetricsRegistry
+
+LABELS = {"agent": "tracker", "method": "generate_daily_report"}
+# conftest replaces it for every test; crew path tests put it back
+REAL_EXECUTE_TASK = Agent.execute_task
+
+
+def streamed(content: str, usage):
+    """Body of a streamed completion sending content word by word."""
+    chunks = [{"model": "stub", "choices": [{"delta": {"role": "assistant", "content": ""}}]}]
+    chunks += [{"model": "stub", "choices": [{"delta": {"content": f" {word}" if i else word}}]}
+               for i, word in enumerate(content.split(" "))]
+    chunks.append({"model": "stub", "choices": [{"delta": {}, "finish_reason": "stop"}], "usage": usage})
+    return "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+
+
+@pytest.fixture
+def streaming_tracker():
+    """
+    Creates a tracker agent in direct mode with a streaming stub client.
+
+    Returns:
+        TrackerAgent: Agent whose completions are streamed in-process
+
+    Note:
+        The stub answers 400 when the task contains "reject".
+    """
+    def handler(request):
+        body = json.loads(request.content)
+        if "reject" in body["messages"][-1]["content"]:
+            return httpx.Response(400, text="bad request")
+        assert body["stream"] is True
+        return httpx.Response(200, text=streamed("Streamed daily report",
+                                                 {"prompt_tokens": 30, "completion_tokens": 5}),
+                              headers={"content-type": "text/event-stream"})
+
+    agent = TrackerAgent()
+    agent.mode = "direct"
+    agent.llm_client = LLMClient("http://stub/v1", stream=True, transport=httpx.MockTransport(handler))
+    return agent
+
+
+def test_registry_renders_prometheus_text():
+    """
+    Test the exposition format.
+
+    Expected behavior:
+    - Counters render one sample per label set, label values escaped.
+    - Histogram buckets are cumulative and end with +Inf, sum and count.
+    - Updates with other label names and re-registering under another
+      type raise ValueError.
+
+    Preconditions:
+    - A fresh registry.
+
+    Postconditions:
+    - None.
+    """
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    calls.inc(route='say "hi"')
+    calls.inc(2, route='say "hi"')
+    for seconds in (0.05, 0.5, 5):
+        latency.observe(seconds, route="/a")
+
+    text = registry.render()
+
+    assert '# TYPE calls_total counter\ncalls_total{route="say \\"hi\\""} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{route="/a"} 5.55' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    assert registry.counter("calls_total", "Calls", ("route",)) is calls
+    with pytest.raises(ValueError):
+        calls.inc(path="/a")
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls")
+
+
+def test_streamed_call_is_recorded(streaming_tracker):
+    """
+    Test metrics of a successful call.
+
+    Expected behavior:
+    - The streamed reply is assembled from its chunks.
+    - Latency and time to first token are observed for the method.
+    - Provider token counts are added per method and per user.
+
+    Preconditions:
+    - A streaming stub reporting 30 prompt and 5 completion tokens.
+
+    Postconditions:
+    - None.
+    """
+    calls = call_seconds.snapshot(**LABELS)["count"]
+    first_tokens = first_token_seconds.snapshot(**LABELS)["count"]
+    prompt = prompt_tokens_total.value(**LABELS)
+    completion = completion_tokens_total.value(**LABELS)
+    before = token_ledger.totals("metrics-user")
+
+    with llm_context(user_id="metrics-user"):
+        result = streaming_tracker.execute("Summarize today", method="generate_daily_report")
+
+    assert result == "Streamed daily report"
+    assert streaming_tracker.last_usage["first_token_ms"] is not None
+    assert call_seconds.snapshot(**LABELS)["count"] == calls + 1
+    assert first_token_seconds.snapshot(**LABELS)["count"] == first_tokens + 1
+    assert prompt_tokens_total.value(**LABELS) == prompt + 30
+    assert completion_tokens_total.value(**LABELS) == completion + 5
+    after = token_ledger.totals("metrics-user")
+    assert after["calls"] == before["calls"] + 1
+    assert after["prompt_tokens"] == before["prompt_tokens"] + 30
+
+
+def test_errors_and_cache_hits_are_counted(streaming_tracker):
+    """
+    Test failure and cache hit counters.
+
+    Expected behavior:
+    - A rejected call raises and is counted under its error type.
+    - A memoized weekly summary counts as a summary cache hit.
+
+    Preconditions:
+    - The stub answers 400 to the task.
+
+    Postconditions:
+    - None.
+    """
+    errors = errors_total.value(error="LLMError", **LABELS)
+    hits = cache_hits_total.value(agent="analyzer", method="summarize_week", cache="summary")
+
+    with pytest.raises(LLMError):
+        streaming_tracker.execute("reject this", method="generate_daily_report")
+    cache = ChunkSummaryCache()
+    cache.put("week", "A steady week")
+    cache.get("week")
+    cache.get("other week")
+
+    assert errors_total.value(error="LLMError", **LABELS) == errors + 1
+    assert cache_hits_total.value(agent="analyzer", method="summarize_week", cache="summary") == hits + 1
+
+
+def test_crew_call_records_tokens(monkeypatch):
+    """
+    Test token counts of calls through the CrewAI agent loop.
+
+    Expected behavior:
+    - Prompt and completion tokens reported by the provider are recorded
+      for the method and the user.
+    - Without reported usage, completion tokens are estimated from the answer.
+
+    Preconditions:
+    - A tracker agent in crew mode; the provider answers in one step, first
+      with usage, then without.
+
+    Postconditions:
+    - None.
+    """
+    answers = [
+        litellm.ModelResponse(
+            choices=[{"message": {"role": "assistant", "content": "Final Answer: Crew daily report"}}],
+            usage={"prompt_tokens": 40, "completion_tokens": 7, "total_tokens": 47}),
+        litellm.ModelResponse(
+            choices=[{"message": {"role": "assistant", "content": "Final Answer: Another crew report"}}]),
+    ]
+    for answer in answers[1:]:
+        del answer.usage
+    monkeypatch.setattr(Agent, "execute_task", REAL_EXECUTE_TASK)
+    monkeypatch.setattr(litellm, "completion", lambda **params: answers.pop(0))
+    agent = TrackerAgent()
+    agent.mode = "crew"
+    completion = completion_tokens_total.value(**LABELS)
+    before = token_ledger.totals("crew-user")
+
+    with llm_context(user_id="crew-user"):
+        reported = agent.execute("Summarize today", method="generate_daily_report")
+        reported_usage = dict(agent.last_usage)
+        estimated = agent.execute("Summarize yesterday", method="generate_daily_report")
+
+    assert reported == "Crew daily report" and estimated == "Another crew report"
+    assert reported_usage["provider_prompt_tokens"] == 40
+    assert reported_usage["completion_tokens"] == 7
+    assert agent.last_usage["completion_tokens"] > 0
+    assert completion_tokens_total.value(**LABELS) == completion + 7 + agent.last_usage["completion_tokens"]
+    assert token_ledger.totals("crew-user")["completion_tokens"] == \
+        before["completion_tokens"] + 7 + agent.last_usage["completion_tokens"]
+
+def test_metrics_and_token_usage_endpoints(streaming_tracker, monkeypatch):
+    """
+    Test the endpoints.
+
+    Expected behavior:
+    - GET /metrics answers Prometheus text including the LLM metrics.
+    - GET /api/agents/token-usage returns the totals of a user to an admin.
+    - Without the admin token it answers 401.
+
+    Preconditions:
+    - One recorded call for the user; an admin token is configured.
+
+    Postconditions:
+    - None.
+    """
+    with llm_context(user_id="usage-user"):
+        streaming_tracker.execute("Summarize today", method="generate_daily_report")
+    monkeypatch.setitem(DIAGNOSTICS_CONFIG, "admin_token", "secret")
+    client = TestClient(app)
+
+    metrics = client.get("/metrics")
+    usage = client.get("/api/agents/token-usage", params={"user_id": "usage-user"},
+                       headers={"X-Admin-Token": "secret"})
+    anonymous = client.get("/api/agents/token-usage")
+
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert "# TYPE llm_call_duration_seconds histogram" in metrics.text
+    assert 'llm_calls_total{agent="tracker",method="generate_daily_report",outcome="ok"}' in metrics.text
+    assert usage.json()["calls"] >= 1 and usage.json()["completion_tokens"] >= 5
+    assert anonymous.status_code == 401
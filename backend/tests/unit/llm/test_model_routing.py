@@ -0,0 +1,197 @@
+"""
+Test suite for per-method model routing.
+Tests that each agent method is sent to its configured model with its own
+completion budget, and that latency routing moves calls to the fallback
+model while the primary model is over budget.
+
+This suite verifies:
+- Method routes override the default model, max_tokens and temperature.
+- Direct calls carry the route's model parameters.
+- Calls move to the fallback model only when enabled, measured and over budget.
+- A share of calls keeps probing the primary model.
+- Agent calls record their latency and report reroutes in usage.
+"""
+
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+from src.agents.motivator_agent import MotivatorAgent
+from src.agents.tracker_agent import TrackerAgent
+from src.config.ai_config import MODEL_CONFIG, SMALL_MODEL_NAME
+from src.llm import LLMClient, ModelRouter, route_for
+
+
+@pytest.fixture
+def sent_bodies():
+    """
+    Collects the JSON bodies of completion requests.
+
+    Returns:
+        list: Request bodies in the order they were sent
+    """
+    return []
+
+
+@pytest.fixture
+def stub_client(sent_bodies):
+    """
+    Creates an LLM client answered in-process.
+
+    Returns:
+        LLMClient: Client whose completions all answer "Routed response"
+    """
+    def handler(request):
+        sent_bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "choices": [{"message": {"role": "assistant", "content": "Routed response"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+        })
+
+    return LLMClient("http://stub/v1", api_key="test-key", transport=httpx.MockTransport(handler))
+
+
+def slow_router(key, seconds, **kwargs):
+    """Build an enabled router that has seen enough slow calls of key on the primary model."""
+    # Calls are never drawn as probes unless a test asks for it
+    kwargs.setdefault("rng", lambda: 1.0)
+    router = ModelRouter(enabled=True, min_samples=5, **kwargs)
+    for _ in range(5):
+        router.record(key, route_for(key).model, seconds)
+    return router
+
+
+def test_method_routes():
+    """
+    Test the routing table.
+
+    Expected behavior:
+    - Celebration messages use the small model with a short completion budget.
+    - Insights reports keep the large model and the default budget.
+
+    Preconditions:
+    - Default MODEL_ROUTES_CONFIG.
+
+    Postconditions:
+    - None.
+    """
+    celebration = route_for("motivator.generate_celebration_message")
+    report = route_for("analyzer.generate_insights_report")
+
+    assert (celebration.model, celebration.max_tokens) == (SMALL_MODEL_NAME, 256)
+    assert (report.model, report.max_tokens) == (MODEL_CONFIG["model"], MODEL_CONFIG["max_tokens"])
+    assert report.temperature == MODEL_CONFIG["temperature"]
+
+
+def test_direct_calls_use_route(stub_client, sent_bodies):
+    """
+    Test model parameters of direct calls.
+
+    Expected behavior:
+    - The request carries the method's model, max_tokens and temperature.
+    - The model is recorded in the call's usage.
+
+    Preconditions:
+    - A motivator in direct mode with a stub client.
+
+    Postconditions:
+    - One request was sent.
+    """
+    agent = MotivatorAgent()
+    agent.mode = "direct"
+    agent.llm_client = stub_client
+
+    assert agent.generate_celebration_message("Exercise: 7-day streak", []) == "Routed response"
+
+    route = route_for("motivator.generate_celebration_message")
+    assert len(sent_bodies) == 1
+    assert (sent_bodies[0]["model"], sent_bodies[0]["max_tokens"], sent_bodies[0]["temperature"]) \
+        == (route.model, route.max_tokens, route.temperature)
+    assert agent.last_usage["model"] == route.model
+
+
+@pytest.mark.parametrize("router_kwargs, samples, expected_rerouted", [
+    ({}, 20.0, True),
+    ({}, 1.0, False),
+    ({"probe_rate": 0.5, "rng": lambda: 0.1}, 20.0, False),
+])
+def test_latency_routing(router_kwargs, samples, expected_rerouted):
+    """
+    Test switching to the fallback model.
+
+    Expected behavior:
+    - A primary p95 above the route's budget moves the call to the fallback.
+    - Within budget, or when the call is drawn as a probe, the primary is kept.
+
+    Preconditions:
+    - tracker.generate_daily_report has a 10 s budget and five samples.
+
+    Postconditions:
+    - Reroutes are counted per method.
+    """
+    key = "tracker.generate_daily_report"
+    router = slow_router(key, samples, **router_kwargs)
+
+    route = router.choose(key)
+
+    assert route.rerouted is expected_rerouted
+    assert route.model == (SMALL_MODEL_NAME if expected_rerouted else MODEL_CONFIG["model"])
+    assert router.stats()[key]["rerouted"] == int(expected_rerouted)
+
+
+def test_latency_routing_needs_budget_and_samples():
+    """
+    Test when latency routing stays off.
+
+    Expected behavior:
+    - A disabled router never reroutes.
+    - Methods without a latency budget are never rerouted.
+    - Too few samples keep the primary model.
+
+    Preconditions:
+    - Slow samples recorded for each case.
+
+    Postconditions:
+    - None.
+    """
+    key = "tracker.generate_daily_report"
+    disabled = slow_router(key, 20.0)
+    disabled.enabled = False
+    assert disabled.choose(key).rerouted is False
+
+    no_budget = "analyzer.generate_insights_report"
+    assert slow_router(no_budget, 300.0).choose(no_budget).rerouted is False
+
+    sparse = ModelRouter(enabled=True, min_samples=5)
+    sparse.record(key, MODEL_CONFIG["model"], 20.0)
+    assert sparse.choose(key).rerouted is False
+
+
+def test_agent_reroutes_slow_method(stub_client, sent_bodies):
+    """
+    Test latency routing through an agent.
+
+    Expected behavior:
+    - With the primary over budget, the call is sent to the fallback model
+      with the method's max_tokens and marked rerouted in usage.
+    - The call's own latency is recorded against the model it used.
+
+    Preconditions:
+    - The process-wide router is replaced by one with slow primary samples.
+
+    Postconditions:
+    - The fallback model has one latency sample.
+    """
+    key = "tracker.generate_daily_report"
+    router = slow_router(key, 20.0)
+    agent = TrackerAgent()
+    agent.mode = "direct"
+    agent.llm_client = stub_client
+
+    with patch("src.llm.routing._router", router):
+        agent.generate_daily_report({"exercise": True})
+
+    assert sent_bodies[0]["model"] == SMALL_MODEL_NAME
+    assert sent_bodies[0]["max_tokens"] == route_for(key).max_tokens
+    assert agent.last_usage["rerouted"] is True
+    assert router.stats()[key]["models"][SMALL_MODEL_NAME]["samples"] == 1
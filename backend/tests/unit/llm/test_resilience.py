@@ -0,0 +1,333 @@
+"""
+Test suite for the LLM tail-latency controls.
+Tests deadlines, retries with backoff, hedged requests and the circuit
+breaker, and how their failures surface from the agent routes.
+
+This suite verifies:
+- Transient errors are retried with jittered backoff, others are not.
+- Calls fail with DeadlineExceeded once their deadline passes.
+- A slow request is hedged after the configured latency quantile.
+- Only direct-mode calls hedge.
+- CrewAI attempts end at their timeout and timed out attempts are retried.
+- Calls refuse to block an event loop.
+- The circuit breaker opens, fails fast and recovers through a trial call.
+- Agent routes answer 504 and 503 for deadline and breaker failures.
+"""
+
+import asyncio
+import threading
+import time
+import litellm
+import pytest
+from unittest.mock import patch
+from crewai import Agent
+from fastapi.testclient import TestClient
+from src.agents.motivator_agent import MotivatorAgent
+from src.api.main import app
+from src.config.ai_config import RESILIENCE_CONFIG
+from src.llm import (
+    CallPolicy, CircuitBreaker, CircuitOpenError, DeadlineExceeded, LLMError, LatencyTracker,
+    RateLimitError, call_with_policy
+)
+
+# conftest replaces it for every test; crew path tests put it back
+REAL_EXECUTE_TASK = Agent.execute_task
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def flaky(failures):
+    """Build an attempt that raises the given errors in turn, then succeeds."""
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+
+    return attempt, calls
+
+
+def test_retries_transient_errors_with_backoff():
+    """
+    Test retries of transient failures.
+
+    Expected behavior:
+    - A 503 and a 429 are retried and the third attempt succeeds.
+    - Backoff delays stay within the jittered bound.
+    - Retry-After from a 429 is honoured.
+    - The attempt count is reported in stats.
+
+    Preconditions:
+    - Sleeping is replaced by a recorder.
+
+    Postconditions:
+    - Each attempt receives the time left until the deadline.
+    """
+    attempt, calls = flaky([LLMError("unavailable", status_code=503),
+                            RateLimitError("slow down", retry_after=3)])
+    delays = []
+    stats = {}
+    policy = CallPolicy(deadline=10, max_retries=2, backoff_base=0.5, backoff_max=8)
+
+    result = call_with_policy(attempt, policy, stats=stats, sleep=delays.append)
+
+    assert result == "ok"
+    assert len(calls) == 3
+    assert all(0 < timeout <= 10 for timeout in calls)
+    assert 0 <= delays[0] <= 0.5
+    assert delays[1] == 3
+    assert stats["attempts"] == 3
+
+
+def test_client_errors_are_not_retried():
+    """
+    Test non-retryable failures.
+
+    Expected behavior:
+    - A 400 response is raised after one attempt.
+
+    Preconditions:
+    - Retries are allowed by the policy.
+
+    Postconditions:
+    - No backoff sleep happened.
+    """
+    attempt, calls = flaky([LLMError("bad request", status_code=400)])
+    delays = []
+
+    with pytest.raises(LLMError):
+        call_with_policy(attempt, CallPolicy(max_retries=3), sleep=delays.append)
+
+    assert len(calls) == 1
+    assert delays == []
+
+
+def test_deadline_exceeded():
+    """
+    Test the per-call deadline.
+
+    Expected behavior:
+    - A request slower than the deadline raises DeadlineExceeded.
+    - The caller returns at the deadline, not when the request finishes.
+
+    Preconditions:
+    - The attempt sleeps longer than the deadline.
+
+    Postconditions:
+    - Elapsed time stays close to the deadline.
+    """
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        call_with_policy(lambda timeout: time.sleep(0.5), CallPolicy(deadline=0.1))
+
+    assert time.monotonic() - start < 0.4
+
+
+def test_hedges_slow_requests():
+    """
+    Test hedged duplicate requests.
+
+    Expected behavior:
+    - Once the first request is slower than the p95 of recent latencies,
+      a duplicate is sent and the faster answer is returned.
+    - The hedge is reported in stats.
+
+    Preconditions:
+    - Twenty recent latencies of 10 ms.
+    - The first request takes 1 s, the duplicate answers at once.
+
+    Postconditions:
+    - The call returns well before the slow request would.
+    """
+    latencies = LatencyTracker()
+    for _ in range(20):
+        latencies.record(0.01)
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            time.sleep(1)
+            return "slow"
+        return "fast"
+
+    stats = {}
+    start = time.monotonic()
+    result = call_with_policy(attempt, CallPolicy(deadline=5, hedge=True, hedge_min_samples=20),
+                              latencies=latencies, stats=stats)
+
+    assert result == "fast"
+    assert stats["hedged"] == 1
+    assert time.monotonic() - start < 0.5
+
+
+def test_only_direct_calls_hedge(mock_agent):
+    """
+    Test which calls may be hedged.
+
+    Expected behavior:
+    - A method configured to hedge does so in direct mode.
+    - In crew mode its policy has hedging turned off.
+
+    Preconditions:
+    - provide_daily_motivation is configured with hedge=True.
+
+    Postconditions:
+    - None.
+    """
+    agent = MotivatorAgent(mock_agent)
+
+    agent.mode = "crew"
+    crew = agent.call_policy("provide_daily_motivation")
+    agent.mode = "direct"
+    direct = agent.call_policy("provide_daily_motivation")
+
+    assert not crew.hedge
+    assert direct.hedge
+
+
+def test_crew_attempts_end_at_their_timeout(monkeypatch):
+    """
+    Test deadlines and retries of calls through the CrewAI agent loop.
+
+    Expected behavior:
+    - Each request gets the time left of its attempt as timeout, and the
+      client does not retry on its own.
+    - A request to a slow provider ends at the deadline, so its pool
+      thread and admission slot are free again right after.
+    - A request that times out early is retried like a direct one.
+
+    Preconditions:
+    - A motivator agent in crew mode with a 0.5 s deadline.
+    - The provider first hangs until the request timeout, then times out
+      at once, then answers.
+
+    Postconditions:
+    - None.
+    """
+    requests = []
+    slow_request_ended = threading.Event()
+
+    def completion(**params):
+        requests.append(params)
+        if len(requests) == 1:
+            time.sleep(params.get("timeout", 2))
+            slow_request_ended.set()
+        if len(requests) <= 2:
+            raise litellm.Timeout("Request timed out", model=params["model"], llm_provider="together_ai")
+        return litellm.ModelResponse(
+            choices=[{"message": {"role": "assistant", "content": "Final Answer: Try a plank challenge"}}])
+
+    monkeypatch.setattr(Agent, "execute_task", REAL_EXECUTE_TASK)
+    monkeypatch.setattr(litellm, "completion", completion)
+    agent = MotivatorAgent()
+    agent.mode = "crew"
+
+    with patch.dict(RESILIENCE_CONFIG["methods"],
+                    {"motivator.suggest_challenges": {"deadline": 0.5, "backoff_base": 0.01}}):
+        with pytest.raises(DeadlineExceeded):
+            agent.execute("Suggest a challenge", method="suggest_challenges")
+        assert slow_request_ended.wait(0.3)
+        result = agent.execute("Suggest a challenge", method="suggest_challenges")
+
+    assert result == "Try a plank challenge"
+    assert agent.last_usage["attempts"] == 2
+    assert all(0 < request["timeout"] <= 0.5 for request in requests)
+    assert all(request["max_retries"] == 0 for request in requests)
+
+
+def test_refuses_to_block_event_loop():
+    """
+    Test calling from a coroutine.
+
+    Expected behavior:
+    - call_with_policy raises RuntimeError without sending anything.
+
+    Preconditions:
+    - The call is made on the thread running an event loop.
+
+    Postconditions:
+    - None.
+    """
+    calls = []
+
+    async def handler():
+        call_with_policy(lambda timeout: calls.append(timeout), CallPolicy())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(handler())
+    assert calls == []
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """
+    Test the circuit breaker state machine.
+
+    Expected behavior:
+    - Two consecutive failures open the circuit.
+    - While open, calls fail with CircuitOpenError without reaching the provider.
+    - After the reset timeout a single trial call is allowed and its success
+      closes the circuit.
+
+    Preconditions:
+    - A fake clock controls the reset timeout.
+
+    Postconditions:
+    - The breaker is closed again.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    attempt, calls = flaky([LLMError("down", status_code=500)] * 2)
+    policy = CallPolicy(max_retries=1)
+
+    with pytest.raises(LLMError):
+        call_with_policy(attempt, policy, breaker=breaker, sleep=lambda delay: None)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        call_with_policy(attempt, policy, breaker=breaker)
+    assert exc_info.value.retry_after == 30
+    assert len(calls) == 2
+
+    clock.now = 30
+    assert breaker.state == "half_open"
+    assert call_with_policy(attempt, policy, breaker=breaker) == "ok"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.parametrize("error, status_code", [
+    (DeadlineExceeded("too slow", deadline=20), 504),
+    (CircuitOpenError("circuit open", retry_after=12), 503),
+    (LLMError("bad gateway", status_code=500), 502),
+])
+def test_agent_routes_map_llm_errors(error, status_code):
+    """
+    Test HTTP status codes for agent failures.
+
+    Expected behavior:
+    - Deadlines answer 504, an open circuit 503 with Retry-After and other
+      provider errors 502.
+
+    Preconditions:
+    - The motivator agent raises the given error.
+
+    Postconditions:
+    - The error message is returned as detail.
+    """
+    with patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.suggest_challenges.side_effect = error
+        response = TestClient(app).post("/api/agents/motivator/suggest-challenges", json={
+            "user_preferences": {}, "current_goals": {}})
+
+    assert response.status_code == status_code
+    assert response.json()["detail"] == str(error)
+    if status_code == 503:
+        assert response.headers["retry-after"] == "12"
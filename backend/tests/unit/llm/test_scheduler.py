@@ -0,0 +1,342 @@
+"""
+Test suite for the LLM admission scheduler.
+Tests rate limiting, priority classes, per-user fairness and the adaptive
+concurrency limit that sit in front of every agent call.
+
+This suite verifies:
+- Token buckets delay requests until capacity is available.
+- Interactive requests are admitted before batch requests.
+- Users within a priority class are served round-robin.
+- The concurrency limit backs off on overload and grows on success.
+- Timeouts back the limit off; other failures leave it unchanged.
+- Requests that wait too long fail with AdmissionTimeout.
+- Worker processes split the provider limits between them.
+- Agent routes schedule calls as interactive for the requesting user.
+- An agent route waiting on its call leaves the event loop free.
+"""
+
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.llm import (
+    AdmissionScheduler, AdmissionTimeout, DeadlineExceeded, LLMError, LLMTimeout,
+    current_priority, current_user
+)
+from src.config.ai_config import SCHEDULER_CONFIG, SERVER_CONFIG
+from src.llm.scheduler import AdaptiveLimit, TokenBucket, get_scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def admission_order(scheduler, requests):
+    """
+    Queue requests behind one in-flight request and record the admission order.
+
+    Args:
+        scheduler (AdmissionScheduler): Scheduler with a concurrency limit of 1
+        requests (list): (label, priority, user) tuples, queued in this order
+
+    Returns:
+        list: Labels in the order they were admitted
+    """
+    order = []
+    blocker = scheduler.acquire(1)
+
+    def run(label, priority, user):
+        ticket = scheduler.acquire(1, priority, user)
+        order.append(label)
+        scheduler.release(ticket)
+
+    threads = []
+    for label, priority, user in requests:
+        thread = threading.Thread(target=run, args=(label, priority, user))
+        thread.start()
+        threads.append(thread)
+        # Wait until the request is queued so the queue order is deterministic
+        while sum(scheduler.stats()["queued"].values()) < len(threads):
+            time.sleep(0.001)
+    scheduler.release(blocker)
+    for thread in threads:
+        thread.join(timeout=5)
+    return order
+
+
+@pytest.fixture
+def serial_scheduler():
+    """
+    Creates a scheduler that admits one request at a time.
+
+    Returns:
+        AdmissionScheduler: No rate limits and a fixed concurrency of 1
+    """
+    return AdmissionScheduler(requests_per_minute=0, tokens_per_minute=0,
+                              min_concurrency=1, initial_concurrency=1, max_concurrency=1)
+
+
+def test_token_bucket_delay():
+    """
+    Test token bucket refill.
+
+    Expected behavior:
+    - A full bucket admits a burst of its capacity.
+    - An empty bucket reports the refill time for the next request.
+    - Requests larger than the capacity are clamped instead of waiting forever.
+
+    Preconditions:
+    - 60 requests per minute, fake clock.
+
+    Postconditions:
+    - Capacity is back after the refill time.
+    """
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    assert bucket.delay(1000) == pytest.approx(60.0)
+
+    clock.now = 1.0
+    assert bucket.delay(1) == 0
+
+
+def test_interactive_before_batch(serial_scheduler):
+    """
+    Test priority classes.
+
+    Expected behavior:
+    - Interactive requests queued after batch requests are admitted first.
+
+    Preconditions:
+    - Two batch requests are queued before two interactive requests.
+
+    Postconditions:
+    - Batch requests run after all interactive ones.
+    """
+    order = admission_order(serial_scheduler, [
+        ("batch-1", "batch", "a"),
+        ("batch-2", "batch", "a"),
+        ("interactive-1", "interactive", "b"),
+        ("interactive-2", "interactive", "c"),
+    ])
+
+    assert order == ["interactive-1", "interactive-2", "batch-1", "batch-2"]
+
+
+def test_users_served_round_robin(serial_scheduler):
+    """
+    Test per-user fair queuing.
+
+    Expected behavior:
+    - A user with a burst of requests does not delay another user's request
+      behind the whole burst.
+
+    Preconditions:
+    - User a queues three requests before user b queues one.
+
+    Postconditions:
+    - User b is admitted second.
+    """
+    order = admission_order(serial_scheduler, [
+        ("a-1", "interactive", "a"),
+        ("a-2", "interactive", "a"),
+        ("a-3", "interactive", "a"),
+        ("b-1", "interactive", "b"),
+    ])
+
+    assert order == ["a-1", "b-1", "a-2", "a-3"]
+
+
+def test_adaptive_limit():
+    """
+    Test the AIMD concurrency limit.
+
+    Expected behavior:
+    - Fast successful calls grow the limit.
+    - A 429 halves it.
+    - Latency well above the baseline also backs off.
+
+    Preconditions:
+    - Initial limit of 4, fake clock.
+
+    Postconditions:
+    - The limit stays within its bounds.
+    """
+    clock = FakeClock()
+    limit = AdaptiveLimit(min_limit=1, max_limit=16, initial=4, clock=clock)
+    for _ in range(8):
+        limit.on_sample(0.1)
+    assert limit.limit > 5
+
+    grown = limit.limit
+    limit.on_sample(None, overloaded=True)
+    assert limit.limit == pytest.approx(grown / 2)
+
+    clock.now = 10
+    halved = limit.limit
+    limit.on_sample(1.0)
+    assert limit.limit == pytest.approx(halved / 2)
+
+
+def test_adaptive_limit_on_failures():
+    """
+    Test the concurrency limit after failed requests.
+
+    Expected behavior:
+    - A request failing with a client error leaves the limit unchanged.
+    - A timed out request or a missed deadline halves it.
+
+    Preconditions:
+    - Initial limit of 8, no rate limits.
+
+    Postconditions:
+    - Nothing is left in flight.
+    """
+    scheduler = AdmissionScheduler(requests_per_minute=0, tokens_per_minute=0,
+                                   initial_concurrency=8, max_concurrency=16)
+
+    def failing(error):
+        def send(timeout):
+            raise error
+        return send
+
+    with pytest.raises(LLMError):
+        scheduler.call(failing(LLMError("Bad request", status_code=400)), 10)
+    unchanged = scheduler.concurrency.limit
+    with pytest.raises(LLMTimeout):
+        scheduler.call(failing(LLMTimeout("Read timed out")), 10)
+    after_timeout = scheduler.concurrency.limit
+    scheduler.concurrency._last_decrease = float("-inf")
+    with pytest.raises(DeadlineExceeded):
+        scheduler.call(failing(DeadlineExceeded("Too slow", 1.0)), 10)
+
+    assert unchanged == 8
+    assert after_timeout == 4
+    assert scheduler.concurrency.limit == 2
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_admission_timeout(serial_scheduler):
+    """
+    Test waiting past the timeout.
+
+    Expected behavior:
+    - A request that cannot be admitted in time raises AdmissionTimeout.
+    - It is removed from the queue and counted.
+
+    Preconditions:
+    - The only slot is held.
+
+    Postconditions:
+    - Nothing is left queued.
+    """
+    blocker = serial_scheduler.acquire(1)
+    with pytest.raises(AdmissionTimeout):
+        serial_scheduler.acquire(1, "batch", timeout=0.05)
+    serial_scheduler.release(blocker)
+
+    stats = serial_scheduler.stats()
+    assert stats["queued"] == {"interactive": 0, "batch": 0}
+    assert stats["timed_out"]["batch"] == 1
+
+
+def test_worker_processes_split_provider_limits(monkeypatch):
+    """
+    Test the process-wide scheduler under the pre-forking launcher.
+
+    Expected behavior:
+    - With four worker processes, each enforces a quarter of the request
+      and token limits.
+
+    Preconditions:
+    - SERVER_CONFIG["processes"] set as the launcher does; no scheduler built.
+
+    Postconditions:
+    - The process-wide scheduler is restored.
+    """
+    monkeypatch.setitem(SERVER_CONFIG, "processes", 4)
+    monkeypatch.setattr("src.llm.scheduler._scheduler", None)
+
+    scheduler = get_scheduler()
+
+    assert scheduler.requests.capacity == SCHEDULER_CONFIG["requests_per_minute"] / 4
+    assert scheduler.tokens.capacity == SCHEDULER_CONFIG["tokens_per_minute"] / 4
+
+
+def test_agent_routes_set_llm_context():
+    """
+    Test the scheduling context of agent routes.
+
+    Expected behavior:
+    - Calls made by agent routes are interactive.
+    - The X-User-ID header identifies the user for fair queuing.
+
+    Preconditions:
+    - The motivator agent records the context it is called in.
+
+    Postconditions:
+    - The context is reset after the request.
+    """
+    seen = {}
+
+    def suggest_challenges(preferences, goals):
+        seen["priority"] = current_priority.get()
+        seen["user"] = current_user.get()
+        return "challenge"
+
+    with patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.suggest_challenges.side_effect = suggest_challenges
+        response = TestClient(app).post(
+            "/api/agents/motivator/suggest-challenges",
+            json={"user_preferences": {}, "current_goals": {}},
+            headers={"X-User-ID": "user-7"})
+
+    assert response.status_code == 200
+    assert seen == {"priority": "interactive", "user": "user-7"}
+
+
+def test_waiting_agent_route_leaves_loop_free():
+    """
+    Test an agent route whose call is held up, e.g. waiting for admission.
+
+    Expected behavior:
+    - A habits request sent meanwhile is answered before the agent route.
+    - The agent route answers once its call returns.
+
+    Preconditions:
+    - The tracker agent blocks until the habits request has finished.
+
+    Postconditions:
+    - None.
+    """
+    released = threading.Event()
+
+    def check_consistency(weekly_data):
+        released.wait(5)
+        return "consistent"
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            agent = asyncio.create_task(client.post("/api/agents/tracker/check-consistency", json=[]))
+            await asyncio.sleep(0.05)
+            habits = await client.get("/api/habits/")
+            answered_first = not agent.done()
+            released.set()
+            return habits, answered_first, await agent
+
+    with patch("src.routes.agents.get_agent") as get_agent:
+        get_agent.return_value.check_consistency.side_effect = check_consistency
+        habits, answered_first, agent = asyncio.run(run())
+
+    assert habits.status_code == 200 and answered_first
+    assert agent.status_code == 200 and agent.json() == "consistent"
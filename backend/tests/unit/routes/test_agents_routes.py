@@ -0,0 +1,59 @@
+"""
+Test suite for the agent API routes.
+Tests that each route calls its agent with the agent's actual interface.
+
+This suite verifies:
+- Every endpoint driven by the load test answers 200 when its agent
+  succeeds, so route and agent signatures agree.
+"""
+
+import pytest
+from unittest.mock import create_autospec, patch
+from fastapi.testclient import TestClient
+from benchmarks.bench_agent_load import ENDPOINTS
+from src.agents import AnalyzerAgent, Lazy, MotivatorAgent, PlannerAgent, TrackerAgent
+from src.api.main import app
+from src.workflows import build_daily_digest
+
+AGENT_TYPES = {"planner": PlannerAgent, "tracker": TrackerAgent,
+               "analyzer": AnalyzerAgent, "motivator": MotivatorAgent}
+
+
+@pytest.fixture
+def agents():
+    """Agents with the real method signatures whose calls all return "ok"."""
+    specs = {}
+    for name, agent_type in AGENT_TYPES.items():
+        agent = create_autospec(agent_type, instance=True)
+        for attribute in dir(agent_type):
+            if not attribute.startswith("_") and callable(getattr(agent_type, attribute)):
+                getattr(agent, attribute).return_value = "ok"
+        specs[name] = agent
+    return specs
+
+
+@pytest.mark.parametrize("endpoint", sorted(ENDPOINTS))
+def test_agent_routes_match_agent_methods(endpoint, agents):
+    """
+    Test the agent endpoints against the agents' methods.
+
+    Expected behavior:
+    - Each endpoint calls an existing agent method with arguments that
+      fit its signature and answers 200.
+
+    Preconditions:
+    - Agents are replaced by autospecs, which reject unknown methods and
+      wrong arguments.
+
+    Postconditions:
+    - No LLM is called.
+    """
+    path, params, body = ENDPOINTS[endpoint]
+    workflow = Lazy(lambda: build_daily_digest(
+        agents["planner"], agents["tracker"], agents["analyzer"], agents["motivator"]))
+
+    with patch("src.routes.agents.get_agent", side_effect=agents.__getitem__), \
+            patch("src.routes.agents.daily_digest_workflow", workflow):
+        response = TestClient(app).post(f"/api/agents{path}", params=params, json=body())
+
+    assert response.status_code == 200, response.text
@@ -0,0 +1,165 @@
+"""
+Test suite for the habit store shared between processes.
+Tests that several HabitService instances on one file, as in uvicorn
+workers, see each other's writes and never lose one.
+
+This suite verifies:
+- A write by one instance is visible to another on its next read.
+- Read-modify-writes of another instance's habit start from its saved state.
+- Concurrent writers in separate processes lose no habit and no completion.
+- Saves replace the file atomically and leave no temporary files behind.
+- A write waiting for another process's lock leaves the event loop free.
+- Without shared mode an instance keeps its own copy.
+"""
+
+import asyncio
+import fcntl
+import json
+import subprocess
+import sys
+from pathlib import Path
+from src.models.habit import HabitCreate, HabitUpdate
+from src.services.habit_service import HabitService, store_reloads
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+WORKER = """
+import asyncio, sys
+from uuid import UUID
+from src.models.habit import HabitCreate
+from src.services.habit_service import HabitService
+
+async def main(path, name, shared_id, rounds):
+    service = HabitService(path, shared=True)
+    for i in range(rounds):
+        await service.create_habit(HabitCreate(name=f"{name}-{i}", frequency="daily"))
+        await service.complete_habit(UUID(shared_id))
+
+asyncio.run(main(sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])))
+"""
+
+
+def test_instances_see_each_others_writes(tmp_path):
+    """
+    Test two instances standing in for two workers.
+
+    Expected behavior:
+    - A habit created through one instance is listed by the other.
+    - Completing it through the other instance keeps the first's update.
+    - The first instance reads the completion; reloads are counted.
+
+    Preconditions:
+    - Two shared-mode instances on an empty file.
+
+    Postconditions:
+    - None.
+    """
+    path = str(tmp_path / "habits.json")
+    first = HabitService(path, shared=True)
+    second = HabitService(path, shared=True)
+    reloads = store_reloads.value()
+
+    async def run():
+        habit = await first.create_habit(HabitCreate(name="Exercise", frequency="daily"))
+        listed = await second.get_all_habits()
+        await first.update_habit(habit.id, HabitUpdate(description="Morning run"))
+        completed = await second.complete_habit(habit.id)
+        return habit, listed, completed, await first.get_habit(habit.id)
+
+    habit, listed, completed, seen = asyncio.run(run())
+
+    assert [h.id for h in listed] == [habit.id]
+    assert completed.description == "Morning run" and completed.streak == 1
+    assert seen.streak == 1
+    assert store_reloads.value() >= reloads + 3
+
+
+def test_concurrent_processes_lose_no_writes(tmp_path):
+    """
+    Test writers in separate processes.
+
+    Expected behavior:
+    - Every habit created by every process is in the file.
+    - A habit completed by all processes counts every completion.
+    - The file is valid JSON and no temporary files are left.
+
+    Preconditions:
+    - One habit in the store; four processes each create 15 habits and
+      complete that habit 15 times.
+
+    Postconditions:
+    - None.
+    """
+    path = tmp_path / "habits.json"
+    shared = asyncio.run(HabitService(str(path), shared=True).create_habit(
+        HabitCreate(name="Shared", frequency="daily")))
+
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, str(path), f"w{n}", str(shared.id), "15"],
+                                cwd=BACKEND_DIR, stderr=subprocess.PIPE, text=True)
+               for n in range(4)]
+    errors = [worker.communicate(timeout=120)[1] for worker in workers]
+
+    assert [worker.returncode for worker in workers] == [0, 0, 0, 0], errors
+    stored = json.loads(path.read_text())
+    assert len(stored) == 1 + 4 * 15
+    assert stored[str(shared.id)]["streak"] == 4 * 15
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["habits.json", "habits.json.lock"]
+
+
+def test_waiting_writer_leaves_loop_free(tmp_path):
+    """
+    Test a write while another process holds the store lock.
+
+    Expected behavior:
+    - The event loop keeps running while the write waits for the lock.
+    - The write completes once the lock is released.
+
+    Preconditions:
+    - The lock file locked through a separate open file, as another
+      worker would.
+
+    Postconditions:
+    - The lock is released.
+    """
+    path = tmp_path / "habits.json"
+    service = HabitService(str(path), shared=True)
+
+    async def run():
+        with open(f"{path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            write = asyncio.create_task(service.create_habit(HabitCreate(name="Exercise", frequency="daily")))
+            ticks = 0
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            waiting = not write.done()
+            fcntl.flock(lock, fcntl.LOCK_UN)
+        return ticks, waiting, await asyncio.wait_for(write, 5)
+
+    ticks, waiting, habit = asyncio.run(run())
+
+    assert ticks == 10 and waiting
+    assert str(habit.id) in json.loads(path.read_text())
+
+
+def test_private_mode_keeps_own_copy(tmp_path):
+    """
+    Test the single-process mode.
+
+    Expected behavior:
+    - An instance not in shared mode does not reload the file on reads.
+
+    Preconditions:
+    - A shared writer and a private reader on one file.
+
+    Postconditions:
+    - None.
+    """
+    path = str(tmp_path / "habits.json")
+    writer = HabitService(path, shared=True)
+    reader = HabitService(path, shared=False)
+
+    asyncio.run(writer.create_habit(HabitCreate(name="Exercise", frequency="daily")))
+
+    assert asyncio.run(reader.get_all_habits()) == []
+    assert len(asyncio.run(HabitService(path, shared=False).get_all_habits())) == 1
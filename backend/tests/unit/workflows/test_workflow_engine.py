@@ -0,0 +1,265 @@
+"""
+Test suite for the workflow engine.
+Tests dependency resolution, concurrent execution and error handling of
+multi-agent workflows, including the daily digest workflow.
+
+This suite verifies:
+- Independent steps run concurrently.
+- Dependent steps wait for their inputs.
+- Invalid workflows are rejected before running.
+- Step failures are reported with the failing step name.
+- Digest steps sharing an agent each get the answer to their own prompt.
+"""
+
+import re
+import threading
+import time
+import pytest
+from crewai import LLM
+from crewai.agent import Agent
+from src.workflows import Step, Workflow, WorkflowError, build_daily_digest
+from src.agents import PlannerAgent, TrackerAgent, AnalyzerAgent, MotivatorAgent
+from src.config.ai_config import MODEL_ROUTES_CONFIG
+
+# Taken before the autouse fixture replaces it with a mock
+REAL_EXECUTE_TASK = Agent.execute_task
+
+
+def _slow(value, delay=0.2):
+    """
+    Builds a blocking step function that sleeps before returning.
+
+    Returns:
+        Callable: A function returning the given value after the delay
+
+    Note:
+        Simulates a blocking LLM call of known latency
+    """
+    def func(**kwargs):
+        time.sleep(delay)
+        return value
+    return func
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently():
+    """
+    Test that independent steps overlap in time.
+
+    Expected behavior:
+    - All steps produce their outputs.
+    - Total latency is close to a single step, not the sum.
+
+    Preconditions:
+    - Four steps with no dependencies, 0.2s each.
+
+    Postconditions:
+    - Workflow completes in well under 0.8s.
+    """
+    workflow = Workflow("parallel", [
+        Step(f"step_{i}", _slow(i)) for i in range(4)
+    ])
+
+    start = time.perf_counter()
+    result = await workflow.run()
+    elapsed = time.perf_counter() - start
+
+    assert result == {"step_0": 0, "step_1": 1, "step_2": 2, "step_3": 3}
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_dependent_steps_follow_chain():
+    """
+    Test that a step waits for the outputs it reads.
+
+    Expected behavior:
+    - Dependent step receives the upstream outputs.
+    - Latency follows the longest chain.
+
+    Preconditions:
+    - Two independent steps feeding a third.
+
+    Postconditions:
+    - Combined output is computed from both inputs.
+    - Critical path length is two steps.
+    """
+    workflow = Workflow("chain", [
+        Step("a", lambda x: x + 1, inputs=("x",)),
+        Step("b", _slow(10)),
+        Step("total", lambda a, b: a + b, inputs=("a", "b")),
+    ], inputs=("x",))
+
+    result = await workflow.run(x=1)
+
+    assert result["total"] == 12
+    assert workflow.critical_path_length() == 2
+
+
+@pytest.mark.asyncio
+async def test_multiple_outputs():
+    """
+    Test a step producing several named values.
+
+    Expected behavior:
+    - Each declared output is stored separately.
+
+    Preconditions:
+    - Step returns a dict keyed by output name.
+
+    Postconditions:
+    - Downstream step can read either output.
+    """
+    workflow = Workflow("split", [
+        Step("split", lambda: {"left": 1, "right": 2}, outputs=("left", "right")),
+        Step("diff", lambda left, right: right - left, inputs=("left", "right")),
+    ])
+
+    result = await workflow.run()
+
+    assert result == {"left": 1, "right": 2, "diff": 1}
+
+
+def test_invalid_workflows_rejected():
+    """
+    Test validation of workflow definitions.
+
+    Expected behavior:
+    - Missing producers raise WorkflowError.
+    - Dependency cycles raise WorkflowError.
+    - Duplicate outputs raise WorkflowError.
+
+    Preconditions:
+    - Steps with broken dependency declarations.
+
+    Postconditions:
+    - No workflow object is created.
+    """
+    with pytest.raises(WorkflowError):
+        Workflow("missing", [Step("a", lambda y: y, inputs=("y",))])
+    with pytest.raises(WorkflowError):
+        Workflow("cycle", [
+            Step("a", lambda b: b, inputs=("b",)),
+            Step("b", lambda a: a, inputs=("a",)),
+        ])
+    with pytest.raises(WorkflowError):
+        Workflow("duplicate", [
+            Step("a", lambda: 1, outputs=("x",)),
+            Step("b", lambda: 2, outputs=("x",)),
+        ])
+
+
+@pytest.mark.asyncio
+async def test_step_failure_reported():
+    """
+    Test handling of a failing step.
+
+    Expected behavior:
+    - WorkflowError names the failing step.
+
+    Preconditions:
+    - One step raises ValueError.
+
+    Postconditions:
+    - Exception chains the original error.
+    """
+    def fail():
+        raise ValueError("boom")
+
+    workflow = Workflow("failing", [Step("ok", lambda: 1), Step("bad", fail)])
+
+    with pytest.raises(WorkflowError) as exc_info:
+        await workflow.run()
+    assert exc_info.value.step == "bad"
+    assert isinstance(exc_info.value.__cause__, ValueError)
+
+
+@pytest.mark.asyncio
+async def test_daily_digest(mock_agent):
+    """
+    Test the daily digest workflow with mocked agents.
+
+    Expected behavior:
+    - Every digest section is returned.
+    - Each section holds the agent response.
+
+    Preconditions:
+    - All agents share a mock CrewAI agent.
+
+    Postconditions:
+    - Digest contains six sections.
+    """
+    workflow = build_daily_digest(
+        PlannerAgent(mock_agent), TrackerAgent(mock_agent),
+        AnalyzerAgent(mock_agent), MotivatorAgent(mock_agent))
+    daily_data = {"exercise": {"completed": True, "duration": 30}}
+
+    result = await workflow.run(
+        preferences={"exercise_goals": "30 minutes daily"},
+        daily_data=daily_data,
+        weekly_data=[daily_data],
+        achievements=["5 day streak"],
+        goals={"exercise": "30 minutes daily"}
+    )
+
+    assert set(result) == {"daily_plan", "daily_report", "consistency",
+                           "weekly_analysis", "motivation", "challenges"}
+    assert all(value == "Mocked agent response" for value in result.values())
+
+
+@pytest.mark.asyncio
+async def test_daily_digest_steps_sharing_an_agent(monkeypatch):
+    """
+    Test concurrent digest steps on one agent through the real CrewAI loop.
+
+    Expected behavior:
+    - Every request to the model carries exactly one task.
+    - Each section holds the answer to its own step's prompt.
+
+    Preconditions:
+    - Crew execution mode with one model route for all methods; the model
+      call is stubbed, takes 0.05s and answers with the first words of the
+      task it received.
+    - Building an agent executor is slowed down, so concurrent calls on one
+      CrewAI agent would pick up each other's executor.
+
+    Postconditions:
+    - None.
+    """
+    tasks_per_request = []
+    lock = threading.Lock()
+    create_executor = Agent.create_agent_executor
+
+    def slow_create_executor(self, *args, **kwargs):
+        create_executor(self, *args, **kwargs)
+        time.sleep(0.05)
+
+    def call(self, messages, *args, **kwargs):
+        tasks = re.findall(r"(?<!Current )Task: (\w+ \w+ \w+)", " ".join(m["content"] for m in messages))
+        with lock:
+            tasks_per_request.append(tasks)
+        time.sleep(0.05)
+        return f"Thought: I know the answer\nFinal Answer: {tasks[0]}"
+
+    monkeypatch.setattr(Agent, "execute_task", REAL_EXECUTE_TASK)
+    monkeypatch.setattr(Agent, "create_agent_executor", slow_create_executor)
+    monkeypatch.setattr(LLM, "call", call)
+    monkeypatch.setitem(MODEL_ROUTES_CONFIG, "methods", {})
+    agents = [PlannerAgent(), TrackerAgent(), AnalyzerAgent(), MotivatorAgent()]
+    for agent in agents:
+        agent.mode = "crew"
+    daily_data = {"exercise": {"completed": True, "duration": 30}}
+
+    result = await build_daily_digest(*agents).run(
+        preferences={"exercise_goals": "30 minutes daily"},
+        daily_data=daily_data,
+        weekly_data=[daily_data],
+        achievements=["5 day streak"],
+        goals={"exercise": "30 minutes daily"}
+    )
+
+    assert [len(tasks) for tasks in tasks_per_request] == [1] * 6, tasks_per_request
+    assert result["daily_report"] == "Generate a detailed"
+    assert result["consistency"] == "Analyze the consistency"
+    assert result["motivation"] == "Provide motivation based"
+    assert result["challenges"] == "Suggest new challenges"